@@ -0,0 +1,663 @@
+"""
+Benchmarks for OSCPack hot paths.
+
+Each benchmark builds a synthetic corpus in a temp folder and times the
+current core.py implementation against the previous one.
+
+Examples:
+  python3 bench.py pagecount
+  python3 bench.py pagecount --large-pages 10000 --small-files 2000
+  python3 bench.py overlay --pages 2000
+  python3 bench.py stampmode --pages 200 --shapes 2000
+  python3 bench.py shard --pages 4000 --workers 4
+  python3 bench.py memory --pages 100 400
+  python3 bench.py incremental --pages 200
+  python3 bench.py combine --docs 20 --pages 25
+  python3 bench.py compact --docs 40 --pages 10
+  python3 bench.py inline --docs 40 --pages 10
+  python3 bench.py convert --images 200 --workers 4
+  python3 bench.py images --images 50
+  python3 bench.py largeimages --megapixels 100
+"""
+import argparse
+import contextlib
+import io
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+
+from PIL import Image
+from pypdf import PdfReader
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfgen import canvas
+
+import core
+
+
+# ---------- Corpus helpers ----------
+
+def make_pdf(path: Path, pages: int, size=core.LETTER_PORTRAIT):
+    """Write a simple vector PDF with `pages` pages."""
+    c = canvas.Canvas(str(path), pagesize=size)
+    for i in range(pages):
+        c.setFont("Helvetica", 10)
+        c.drawString(72, size[1] - 72, f"{path.stem} page {i + 1}")
+        c.rect(36, 36, size[0] - 72, size[1] - 72)
+        c.showPage()
+    c.save()
+
+
+def timed(fn, paths):
+    start = time.perf_counter()
+    total = sum(fn(p) for p in paths)
+    return time.perf_counter() - start, total
+
+
+def report(title: str, rows):
+    print(f"\n{title}")
+    print(f"  {'variant':<28}{'seconds':>10}{'speedup':>10}")
+    base = rows[0][1]
+    for name, seconds in rows:
+        print(f"  {name:<28}{seconds:>10.3f}{base / seconds if seconds else 0:>9.1f}x")
+
+
+# ---------- pagecount ----------
+
+def legacy_pdf_page_count(path: Path) -> int:
+    """Page counting as done before the fast /Count path."""
+    reader = PdfReader(str(path))
+    return len(reader.pages)
+
+
+def bench_pagecount(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        large = []
+        for i in range(args.large_files):
+            p = tmp / f"large_{i}.pdf"
+            make_pdf(p, args.large_pages)
+            large.append(p)
+
+        rng = random.Random(0)
+        small = []
+        for i in range(args.small_files):
+            p = tmp / f"small_{i}.pdf"
+            make_pdf(p, rng.randint(1, 4))
+            small.append(p)
+
+        for label, corpus in (
+            (f"Large: {args.large_files} x {args.large_pages} pages", large),
+            (f"Many small: {args.small_files} files x 1-4 pages", small),
+        ):
+            t_old, n_old = timed(legacy_pdf_page_count, corpus)
+            t_new, n_new = timed(core.get_pdf_page_count, corpus)
+            assert n_old == n_new, (n_old, n_new)
+            report(f"{label} ({n_new} pages)", [
+                ("PdfReader + len(pages)", t_old),
+                ("get_pdf_page_count", t_new),
+            ])
+
+
+# ---------- overlay ----------
+
+def legacy_bates_overlay(label: str, page_width: float, page_height: float):
+    """Per-page reportlab canvas overlay, as done before the cached template."""
+    packet = io.BytesIO()
+    c = canvas.Canvas(packet, pagesize=(page_width, page_height))
+    c.setFont(core.BATES_FONT, core.BATES_FONT_SIZE)
+    text_width = core.stringWidth(label, core.BATES_FONT, core.BATES_FONT_SIZE)
+    c.drawString(page_width - core.BATES_MARGIN_RIGHT - text_width, core.BATES_MARGIN_BOTTOM, label)
+    c.save()
+    packet.seek(0)
+    return PdfReader(packet).pages[0]
+
+
+class LegacyOverlayTemplate:
+    """Stands in for core.bates_overlay_template, building a canvas per page."""
+
+    def __init__(self, page_width, page_height, prefix, font, font_size):
+        self.page_width, self.page_height, self.prefix = page_width, page_height, prefix
+
+    def overlay(self, number_text):
+        return legacy_bates_overlay(f"{self.prefix} {number_text}", self.page_width, self.page_height)
+
+
+def bench_overlay(args):
+    w, h = core.LETTER_PORTRAIT
+    labels = [f"{args.prefix} {n:0{core.DIGITS}d}" for n in range(1, args.pages + 1)]
+
+    def overlays(make):
+        start = time.perf_counter()
+        for label in labels:
+            make(label, w, h)
+        return time.perf_counter() - start
+
+    t_old = overlays(legacy_bates_overlay)
+    t_new = overlays(core.create_bates_overlay)
+    report(f"Overlay only: {args.pages} labels", [
+        ("reportlab canvas per page", t_old),
+        ("cached overlay template", t_new),
+    ])
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src.pdf"
+        make_pdf(src, args.pages)
+        target = tmp / f"{args.prefix} {1:0{core.DIGITS}d}-{args.pages:0{core.DIGITS}d}.pdf"
+
+        core.DRY_RUN = False
+        rows = []
+        current = core.bates_overlay_template
+        for variant, template_fn in (
+            ("reportlab canvas per page", LegacyOverlayTemplate),
+            ("cached overlay template", current),
+        ):
+            target.write_bytes(src.read_bytes())
+            core.bates_overlay_template = template_fn
+            try:
+                start = time.perf_counter()
+                core.apply_bates_to_pdf(target)
+                rows.append((variant, time.perf_counter() - start))
+            finally:
+                core.bates_overlay_template = current
+
+        pages_per_sec = " -> ".join(f"{args.pages / sec:.0f}" for _, sec in rows)
+        report(f"Stamp {args.pages} pages ({pages_per_sec} pages/sec)", rows)
+
+
+# ---------- stampmode ----------
+
+def make_vector_pdf(path: Path, pages: int, shapes: int, size=core.LETTER_PORTRAIT):
+    """Write a PDF whose pages carry `shapes` small vector paths each."""
+    rng = random.Random(0)
+    c = canvas.Canvas(str(path), pagesize=size)
+    for _ in range(pages):
+        for _ in range(shapes):
+            x, y = rng.uniform(0, size[0]), rng.uniform(0, size[1])
+            c.line(x, y, x + rng.uniform(-20, 20), y + rng.uniform(-20, 20))
+        c.showPage()
+    c.save()
+
+
+def bench_stampmode(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src.pdf"
+        make_vector_pdf(src, args.pages, args.shapes, size=(595.28, 841.89))
+        target = tmp / f"CF {1:0{core.DIGITS}d}-{args.pages:0{core.DIGITS}d}.pdf"
+
+        core.DRY_RUN = False
+        rows = []
+        current = core.STAMP_MODE
+        for mode in ("merge", "direct"):
+            target.write_bytes(src.read_bytes())
+            core.STAMP_MODE = mode
+            try:
+                start = time.perf_counter()
+                core.apply_bates_to_pdf(target, to_letter=True)
+                rows.append((f"{mode} (A4 -> Letter)", time.perf_counter() - start))
+            finally:
+                core.STAMP_MODE = current
+
+        report(f"Stamp {args.pages} pages x {args.shapes} paths", rows)
+
+
+# ---------- shard ----------
+
+def bench_shard(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src.pdf"
+        make_vector_pdf(src, args.pages, args.shapes, size=(595.28, 841.89))
+        target = tmp / f"CF {1:0{core.DIGITS}d}-{args.pages:0{core.DIGITS}d}.pdf"
+
+        core.DRY_RUN = False
+        saved = core.STAMP_MODE, core.STAMP_WORKERS, core.SHARD_MIN_PAGES
+        try:
+            core.STAMP_WORKERS = args.workers
+            for mode in args.modes:
+                core.STAMP_MODE = mode
+                rows = []
+                for variant, min_pages in (("whole", args.pages + 1), ("shards", 1)):
+                    target.write_bytes(src.read_bytes())
+                    core.SHARD_MIN_PAGES = min_pages
+                    start = time.perf_counter()
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        manifest = core.TreeManifest.scan(tmp)
+                        outcomes = core._stamp_pdfs_in_processes([target], manifest)
+                    if outcomes[0][1]:
+                        raise RuntimeError(outcomes[0][1])
+                    rows.append((variant, time.perf_counter() - start))
+                report(
+                    f"Stamp one {args.pages}-page PDF ({mode}) on {args.workers} processes, "
+                    f"{os.cpu_count()} CPUs", rows,
+                )
+        finally:
+            core.STAMP_MODE, core.STAMP_WORKERS, core.SHARD_MIN_PAGES = saved
+
+
+# ---------- memory ----------
+
+def make_scanned_pdf(path: Path, pages: int, size=(595.28, 841.89)):
+    """Write an A4 'scan': one distinct noisy grayscale JPEG per page."""
+    c = canvas.Canvas(str(path), pagesize=size)
+    for i in range(pages):
+        img = Image.effect_noise((850, 1100), 40 + i % 20)
+        buf = io.BytesIO()
+        img.save(buf, format="JPEG", quality=85)
+        buf.seek(0)
+        c.drawImage(ImageReader(buf), 0, 0, width=size[0], height=size[1])
+        c.showPage()
+    c.save()
+
+
+# Runs in a fresh interpreter. On Linux ru_maxrss survives exec (it would
+# report the benchmark's own peak), so VmHWM is read instead when available.
+MEMORY_CHILD = textwrap.dedent("""
+    import resource, sys
+    from pathlib import Path
+    sys.path.insert(0, sys.argv[1])
+    import core
+    core.DRY_RUN = False
+    core.DIGITS = 4
+    core.LOW_MEMORY = sys.argv[3] == "low"
+    core.apply_bates_to_pdf(Path(sys.argv[2]), to_letter=True)
+    try:
+        status = Path("/proc/self/status").read_text()
+        print(next(int(line.split()[1]) for line in status.splitlines() if line.startswith("VmHWM:")))
+    except OSError:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(kb // 1024 if sys.platform == "darwin" else kb)
+""")
+
+
+def peak_rss_mb(pdf: Path, mode: str) -> float:
+    """Stamp `pdf` in a fresh interpreter and return its peak RSS in MB."""
+    out = subprocess.run(
+        [sys.executable, "-c", MEMORY_CHILD, str(Path(__file__).resolve().parent), str(pdf), mode],
+        check=True, capture_output=True, text=True,
+    ).stdout.split()[-1]
+    return int(out) / 1024
+
+
+def bench_memory(args):
+    print(f"\nPeak RSS while stamping a scanned A4 exhibit (batch = {core.LOW_MEMORY_BATCH_PAGES} pages)")
+    print(f"  {'pages':>6}{'file MB':>10}{'in-memory MB':>15}{'low-memory MB':>16}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        for pages in args.pages:
+            src = tmp / f"src_{pages}.pdf"
+            make_scanned_pdf(src, pages)
+            rss = {}
+            for mode in ("normal", "low"):
+                target = tmp / f"CF {1:0{core.DIGITS}d}-{pages:0{core.DIGITS}d}.pdf"
+                target.write_bytes(src.read_bytes())
+                rss[mode] = peak_rss_mb(target, mode)
+                target.unlink()
+            size_mb = src.stat().st_size / 2**20
+            print(f"  {pages:>6}{size_mb:>10.0f}{rss['normal']:>15.0f}{rss['low']:>16.0f}")
+
+
+# ---------- incremental ----------
+
+def bench_incremental(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src.pdf"
+        make_scanned_pdf(src, args.pages)
+        src_size = src.stat().st_size
+        target = tmp / f"CF {1:0{core.DIGITS}d}-{args.pages:0{core.DIGITS}d}.pdf"
+
+        core.DRY_RUN = False
+        rows, written = [], []
+        current = core.STAMP_MODE
+        for mode in ("direct", "incremental"):
+            target.write_bytes(src.read_bytes())
+            core.STAMP_MODE = mode
+            try:
+                start = time.perf_counter()
+                core.apply_bates_to_pdf(target, to_letter=True)
+                rows.append((mode, time.perf_counter() - start))
+            finally:
+                core.STAMP_MODE = current
+            size = target.stat().st_size
+            written.append(size if mode == "direct" else size - src_size)
+
+        mb = " vs ".join(f"{n / 2**20:.2f}" for n in written)
+        report(f"Stamp a {src_size / 2**20:.0f} MB, {args.pages}-page scan (MB written: {mb})", rows)
+
+
+# ---------- combine ----------
+
+# Runs in a fresh interpreter, like MEMORY_CHILD. "legacy" adds every page
+# to one PdfWriter before writing, as create_combined_final_pdf used to.
+COMBINE_CHILD = textwrap.dedent("""
+    import resource, sys
+    from pathlib import Path
+    sys.path.insert(0, sys.argv[1])
+    import core
+    from pypdf import PdfReader, PdfWriter
+    core.DRY_RUN = False
+    core.PREFIX, core.DIGITS = "CF", 4
+    root = Path(sys.argv[2])
+    if sys.argv[3] == "legacy":
+        writer = PdfWriter()
+        for path in sorted(root.glob("CF *.pdf")):
+            for page in PdfReader(str(path)).pages:
+                writer.add_page(page)
+        with open(root / "combined.pdf", "wb") as f:
+            writer.write(f)
+    else:
+        core.create_combined_final_pdf(root)
+    try:
+        status = Path("/proc/self/status").read_text()
+        print(next(int(line.split()[1]) for line in status.splitlines() if line.startswith("VmHWM:")))
+    except OSError:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        print(kb // 1024 if sys.platform == "darwin" else kb)
+""")
+
+
+def bench_combine(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        src = root / "src.pdf"
+        make_scanned_pdf(src, args.pages)
+        for d in range(args.docs):
+            first = d * args.pages + 1
+            (root / f"CF {first:04d}-{first + args.pages - 1:04d}.pdf").write_bytes(src.read_bytes())
+        src.unlink()
+        size_mb = args.docs * (root / f"CF {1:04d}-{args.pages:04d}.pdf").stat().st_size / 2**20
+
+        print(f"\nCombine {args.docs} docs x {args.pages} scanned pages ({size_mb:.0f} MB)")
+        print(f"  {'variant':<28}{'seconds':>10}{'peak MB':>10}")
+        for variant, mode in (("one PdfWriter", "legacy"), ("streamed", "streamed")):
+            start = time.perf_counter()
+            out = subprocess.run(
+                [sys.executable, "-c", COMBINE_CHILD, str(Path(__file__).resolve().parent), str(root), mode],
+                check=True, capture_output=True, text=True,
+            ).stdout.split()[-1]
+            print(f"  {variant:<28}{time.perf_counter() - start:>10.3f}{int(out) / 1024:>10.0f}")
+
+
+# ---------- compact ----------
+
+def make_letterhead_pdf(path: Path, pages: int, logo: bytes):
+    """Write a PDF whose pages all carry the same letterhead logo (as every exhibit from one sender would)."""
+    c = canvas.Canvas(str(path), pagesize=core.LETTER_PORTRAIT)
+    for i in range(pages):
+        c.drawImage(ImageReader(io.BytesIO(logo)), 72, 640, width=200, height=100)
+        c.setFont("Helvetica", 10)
+        c.drawString(72, 600, f"{path.stem} page {i + 1}")
+        c.showPage()
+    c.save()
+
+
+def bench_compact(args):
+    buf = io.BytesIO()
+    Image.effect_noise((400, 200), 50).save(buf, format="PNG")
+    logo = buf.getvalue()
+
+    print(f"\nStamp and combine {args.docs} docs x {args.pages} pages sharing one logo")
+    print(f"  {'variant':<28}{'seconds':>10}{'stamped MB':>12}{'combined MB':>13}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src"
+        src.mkdir()
+        for d in range(args.docs):
+            make_letterhead_pdf(src / f"doc {d:03d}.pdf", args.pages, logo)
+
+        for variant, compact in (("plain xref, no dedup", False), ("compact", True)):
+            root = tmp / variant
+            root.mkdir()
+            for pdf in src.iterdir():
+                (root / pdf.name).write_bytes(pdf.read_bytes())
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                summary = core.run_pipeline(
+                    root_folder=str(root), prefix="CF", digits=4, dry_run=False,
+                    backup_before_bates=False, combine_final=True, use_scan_index=False,
+                    compact_output=compact,
+                )
+            seconds = time.perf_counter() - start
+            combined = Path(summary["renamed"][-1][1])
+            stamped = sum(p.stat().st_size for p in root.glob("*.pdf") if p != combined)
+            print(f"  {variant:<28}{seconds:>10.3f}{stamped / 2**20:>12.2f}{combined.stat().st_size / 2**20:>13.2f}")
+
+
+# ---------- inline ----------
+
+def bench_inline(args):
+    buf = io.BytesIO()
+    Image.effect_noise((400, 200), 50).save(buf, format="PNG")
+    logo = buf.getvalue()
+
+    print(f"\nStamp and combine {args.docs} docs x {args.pages} pages")
+    print(f"  {'variant':<28}{'seconds':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src"
+        src.mkdir()
+        for d in range(args.docs):
+            make_letterhead_pdf(src / f"doc {d:03d}.pdf", args.pages, logo)
+
+        plan = core.CombinedPdfBuilder.plan
+        for variant, inline in (("stamp, then re-read", False), ("combine while stamping", True)):
+            root = tmp / variant
+            root.mkdir()
+            for pdf in src.iterdir():
+                (root / pdf.name).write_bytes(pdf.read_bytes())
+            # Without a builder run_pipeline falls back to create_combined_final_pdf
+            core.CombinedPdfBuilder.plan = plan if inline else classmethod(lambda cls, root, manifest: None)
+            start = time.perf_counter()
+            try:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    core.run_pipeline(
+                        root_folder=str(root), prefix="CF", digits=4, dry_run=False,
+                        backup_before_bates=False, combine_final=True, use_scan_index=False,
+                    )
+            finally:
+                core.CombinedPdfBuilder.plan = plan
+            print(f"  {variant:<28}{time.perf_counter() - start:>10.3f}")
+
+
+# ---------- convert ----------
+
+def bench_convert(args):
+    print(f"\nConvert {args.images} photos ({args.size}x{args.size // 4 * 3} px) to PDF")
+    print(f"  {'variant':<28}{'seconds':>10}")
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        src = tmp / "src"
+        src.mkdir()
+        rng = random.Random(0)
+        base = Image.effect_noise((args.size, args.size // 4 * 3), 60).convert("RGB")
+        for i in range(args.images):
+            base.rotate(rng.randint(0, 359)).save(src / f"IMG_{i:05d}.jpg", quality=90)
+
+        for variant, workers in (("one at a time", 1), (f"{args.workers} processes", args.workers)):
+            root = tmp / f"w{workers}"
+            shutil.copytree(src, root)
+            core.DRY_RUN = False
+            core.CONVERT_WORKERS = workers
+            start = time.perf_counter()
+            with contextlib.redirect_stdout(io.StringIO()):
+                conversions, errors = core.convert_images_in_tree(root, delete_original=True)
+            assert len(conversions) == args.images and not errors
+            print(f"  {variant:<28}{time.perf_counter() - start:>10.3f}")
+
+
+# ---------- images ----------
+
+def legacy_image_to_pdf(image_path: Path, pdf_path: Path):
+    """Image -> PDF before: decode, convert to RGB, let Pillow re-encode."""
+    with Image.open(image_path) as img:
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img.save(pdf_path, "PDF")
+
+
+def bench_images(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        photo = Image.effect_noise((args.size, args.size // 4 * 3), 60).convert("RGB")
+        fax = Image.effect_noise((1728, 2200), 90).point(lambda v: 255 if v > 160 else 0).convert("1")
+        corpora = {
+            "JPEG photos": [],
+            "G4 fax TIFFs (3 pages)": [],
+        }
+        for i in range(args.images):
+            path = tmp / f"IMG_{i:04d}.jpg"
+            photo.rotate(i).save(path, quality=90)
+            corpora["JPEG photos"].append(path)
+            path = tmp / f"FAX_{i:04d}.tif"
+            fax.save(path, compression="group4", save_all=True, append_images=[fax.rotate(180), fax])
+            corpora["G4 fax TIFFs (3 pages)"].append(path)
+
+        for title, paths in corpora.items():
+            print(f"\n{len(paths)} {title}")
+            print(f"  {'variant':<28}{'seconds':>10}{'MB':>10}{'pages':>8}")
+            for variant, convert in (("Pillow re-encode", legacy_image_to_pdf), ("passthrough", core.convert_image_to_pdf)):
+                outs = [p.with_name(f"{p.stem}.{variant[:4]}.pdf") for p in paths]
+                start = time.perf_counter()
+                for path, out in zip(paths, outs):
+                    convert(path, out)
+                seconds = time.perf_counter() - start
+                size = sum(out.stat().st_size for out in outs) / 2**20
+                pages = sum(len(PdfReader(str(out)).pages) for out in outs)
+                print(f"  {variant:<28}{seconds:>10.3f}{size:>10.2f}{pages:>8}")
+
+
+IMAGE_CHILD = textwrap.dedent("""
+    import resource, sys, time, warnings
+    from pathlib import Path
+    sys.path.insert(0, sys.argv[1])
+    import core
+    warnings.simplefilter("ignore")
+    core.IMAGE_MAX_DPI = int(sys.argv[4]) or None
+    start = time.perf_counter()
+    core.convert_image_to_pdf(Path(sys.argv[2]), Path(sys.argv[3]))
+    seconds = time.perf_counter() - start
+    try:
+        status = Path("/proc/self/status").read_text()
+        kb = next(int(line.split()[1]) for line in status.splitlines() if line.startswith("VmHWM:"))
+    except OSError:
+        kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        kb = kb // 1024 if sys.platform == "darwin" else kb
+    print(seconds, kb)
+""")
+
+
+def bench_largeimages(args):
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        height = int((args.megapixels * 10**6 * 3 / 4) ** 0.5)
+        width = height * 4 // 3
+        photo = Image.linear_gradient("L").resize((width, height))
+        photo = Image.merge("RGB", (photo, photo.transpose(Image.Transpose.ROTATE_180), photo.point(lambda v: v // 2)))
+        images = {
+            "JPEG": tmp / "drone.jpg",
+            "uncompressed TIFF": tmp / "plan_raw.tif",
+            "LZW TIFF": tmp / "plan_lzw.tif",
+            "PNG": tmp / "plan.png",
+        }
+        photo.save(images["JPEG"], quality=90)
+        photo.save(images["uncompressed TIFF"])
+        photo.save(images["LZW TIFF"], compression="tiff_lzw")
+        photo.save(images["PNG"], compress_level=1)
+        del photo
+
+        print(f"\n{width} x {height} images ({args.megapixels} MP), each converted in a fresh interpreter")
+        print(f"  {'image':<20}{'full s':>8}{'full MB':>9}{f'{args.dpi} dpi s':>10}{f'{args.dpi} dpi MB':>11}")
+        for title, path in images.items():
+            cells = []
+            for dpi in (0, args.dpi):
+                seconds, kb = subprocess.run(
+                    [sys.executable, "-c", IMAGE_CHILD, str(Path(__file__).resolve().parent),
+                     str(path), str(path.with_suffix(f".{dpi}.pdf")), str(dpi)],
+                    check=True, capture_output=True, text=True,
+                ).stdout.split()[-2:]
+                cells += [float(seconds), int(kb) / 1024]
+            print(f"  {title:<20}{cells[0]:>8.2f}{cells[1]:>9.0f}{cells[2]:>10.2f}{cells[3]:>11.0f}")
+
+
+# ---------- CLI ----------
+
+def main():
+    parser = argparse.ArgumentParser(description="OSCPack benchmarks")
+    sub = parser.add_subparsers(dest="bench", required=True)
+
+    p = sub.add_parser("pagecount", help="Fast /Count page counting vs full parse")
+    p.add_argument("--large-files", type=int, default=3)
+    p.add_argument("--large-pages", type=int, default=5000)
+    p.add_argument("--small-files", type=int, default=500)
+    p.set_defaults(func=bench_pagecount)
+
+    p = sub.add_parser("overlay", help="Cached Bates overlay template vs reportlab canvas per page")
+    p.add_argument("--pages", type=int, default=2000)
+    p.add_argument("--prefix", default="CF")
+    p.set_defaults(func=bench_overlay)
+
+    p = sub.add_parser("stampmode", help="Direct content wrapping vs pypdf page merging")
+    p.add_argument("--pages", type=int, default=200)
+    p.add_argument("--shapes", type=int, default=2000)
+    p.set_defaults(func=bench_stampmode)
+
+    p = sub.add_parser("shard", help="One large PDF stamped whole vs in page-range shards on a pool")
+    p.add_argument("--pages", type=int, default=4000)
+    p.add_argument("--shapes", type=int, default=200)
+    p.add_argument("--workers", type=int, default=4)
+    p.add_argument("--modes", nargs="+", choices=core.STAMP_MODES[:2], default=["direct"])
+    p.set_defaults(func=bench_shard)
+
+    p = sub.add_parser("memory", help="Peak memory of in-memory vs low-memory stamping")
+    p.add_argument("--pages", type=int, nargs="+", default=[100, 400])
+    p.set_defaults(func=bench_memory)
+
+    p = sub.add_parser("incremental", help="Incremental-update stamping vs rewriting the file")
+    p.add_argument("--pages", type=int, default=200)
+    p.set_defaults(func=bench_incremental)
+
+    p = sub.add_parser("combine", help="Peak memory of the streamed combined PDF vs one PdfWriter")
+    p.add_argument("--docs", type=int, default=20)
+    p.add_argument("--pages", type=int, default=25)
+    p.set_defaults(func=bench_combine)
+
+    p = sub.add_parser("compact", help="Output size with and without dedup/object streams")
+    p.add_argument("--docs", type=int, default=40)
+    p.add_argument("--pages", type=int, default=10)
+    p.set_defaults(func=bench_compact)
+
+    p = sub.add_parser("inline", help="Combined PDF written during stamping vs re-read afterwards")
+    p.add_argument("--docs", type=int, default=40)
+    p.add_argument("--pages", type=int, default=10)
+    p.set_defaults(func=bench_inline)
+
+    p = sub.add_parser("convert", help="Image conversion on a process pool vs one at a time")
+    p.add_argument("--images", type=int, default=200)
+    p.add_argument("--size", type=int, default=2000)
+    p.add_argument("--workers", type=int, default=4)
+    p.set_defaults(func=bench_convert)
+
+    p = sub.add_parser("images", help="Image conversion with JPEG/G4 passthrough vs Pillow re-encoding")
+    p.add_argument("--images", type=int, default=50)
+    p.add_argument("--size", type=int, default=2000)
+    p.set_defaults(func=bench_images)
+
+    p = sub.add_parser("largeimages", help="Peak memory converting very large images at full size vs capped dpi")
+    p.add_argument("--megapixels", type=int, default=100)
+    p.add_argument("--dpi", type=int, default=core.IMAGE_MAX_DPI)
+    p.set_defaults(func=bench_largeimages)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,21 +2,51 @@ import os
 import re
 import io
 import uuid
+import json
 import shutil
+import hashlib
+import gc
+import sqlite3
+import struct
+import threading
 import argparse
 import textwrap
+import contextlib
+import zlib
+import math
+import multiprocessing
+import queue
+import subprocess
+import sys
+import tempfile
+import time
+from collections import deque
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
 from pathlib import Path
-
-from PIL import Image
-from pypdf import PdfReader, PdfWriter, Transformation
+from typing import NamedTuple
+
+from PIL import Image, JpegImagePlugin
+from pypdf import PageObject, PdfReader, PdfWriter, Transformation
+from pypdf.generic import (
+    ArrayObject,
+    BooleanObject,
+    DecodedStreamObject,
+    DictionaryObject,
+    EncodedStreamObject,
+    IndirectObject,
+    NameObject,
+    NullObject,
+    NumberObject,
+    RectangleObject,
+    StreamObject,
+    TextStringObject,
+)
 
 try:
     from docx2pdf import convert as docx2pdf_convert
 except ImportError:
-    raise SystemExit(
-        "docx2pdf is required for DOCX → PDF conversion.\n"
-        "Install it with:\n    pip install docx2pdf"
-    )
+    docx2pdf_convert = None
 
 try:
     from reportlab.pdfgen import canvas
@@ -33,6 +63,13 @@ try:
 except ImportError:
     BeautifulSoup = None
 
+try:
+    # LibreOffice's Python bridge (bundled with LibreOffice, or python3-uno)
+    import uno
+    from com.sun.star.connection import NoConnectException
+except ImportError:
+    uno = None
+
 # ======================================================
 # Application Version (used by build.sh and GUI updater)
 # ======================================================
@@ -74,12 +111,105 @@ COMBINE_FINAL = False
 # Toggle 6: conversion-only mode (no renaming, no Bates, just convert + letter-format)
 CONVERSION_ONLY = False
 
+# Threads used to list directories during the scan (1 = one directory at a time).
+# Listing several folders at once hides the round trip per folder on SMB/NFS shares.
+SCAN_WORKERS = 4
+
+# Threads used to count PDF pages while planning (1 = sequential). Dry runs
+# read the page count stored in each PDF; real runs count the page tree, as
+# stamping does, so a wrong stored count cannot number files it then rejects.
+PAGE_COUNT_WORKERS = 4
+
+# Processes used to Bates-stamp PDFs (1 = stamp in this process, one file at a time)
+STAMP_WORKERS = 1
+
+# Processes used to convert images, HTML and TXT files to PDF (1 = one at a time,
+# in this process). DOCX files are converted by DOCX_BACKEND instead.
+CONVERT_WORKERS = 4
+
+# How DOCX files are converted to PDF (see DOCX_CONVERTERS):
+#   "auto"        - Microsoft Word through docx2pdf on macOS/Windows when it is
+#                   installed, LibreOffice otherwise
+#   "docx2pdf"    - Microsoft Word through docx2pdf, one file at a time
+#   "libreoffice" - headless LibreOffice on DOCX_WORKERS workers. With
+#                   LibreOffice's Python bridge (uno) importable, each worker's
+#                   soffice is started once and kept running for the whole
+#                   batch; without it every file starts its own
+#                   `soffice --convert-to` (on the worker's already set-up
+#                   profile), so there is no warm pool
+# DOCX_WORKERS only applies to LibreOffice; docx2pdf converts one file at a time.
+# Tests can also set DOCX_BACKEND = "fake" (see FakeDocxConverter); it is not
+# offered to users, as it never produces the real document.
+DOCX_BACKEND = "auto"
+DOCX_BACKENDS = ("auto", "docx2pdf", "libreoffice")
+DOCX_WORKERS = 2
+
+# LibreOffice executable (None = search PATH and the usual install locations)
+# and the seconds to wait for it to start and for each document to convert;
+# a conversion that takes longer kills its soffice, which is started again.
+SOFFICE_PATH = None
+SOFFICE_TIMEOUT = 300
+
+# Images are stored at no more than IMAGE_MAX_DPI at Letter size (None = keep
+# every pixel); larger ones are scaled down by a whole factor, JPEGs while
+# they are decoded. Group 4 fax images are always kept as they are.
+IMAGE_MAX_DPI = 600
+
+# Decoded image data the conversion processes may hold at once, in bytes
+# (None = no limit). An image needing more than the whole budget waits until
+# no other process is decoding one, then converts alone.
+IMAGE_MEMORY_BUDGET = 1024 * 2**20
+
+# Low-memory mode: read PDFs from disk on demand and write the output
+# LOW_MEMORY_BATCH_PAGES pages at a time instead of building the whole
+# document in memory first. Slower, but peak memory no longer grows with
+# the page count of the largest exhibit.
+LOW_MEMORY = False
+LOW_MEMORY_BATCH_PAGES = 50
+
+# Compact output: stamped and combined PDFs store identical resources (fonts,
+# images, ICC profiles) once, and pack their other objects into compressed
+# object streams with a compressed xref stream (PDF 1.5+ readers).
+COMPACT_OUTPUT = True
+
+# With STAMP_WORKERS > 1, PDFs of at least SHARD_MIN_PAGES pages are stamped
+# as page-range shards on several processes and then joined without being
+# parsed again (not in "incremental" mode, which appends to the file in
+# place). Every shard reads the whole page tree, so a file gets at most
+# STAMP_WORKERS shards of at least SHARD_PAGES pages. See
+# `python3 bench.py shard` for one file whole vs in shards.
+SHARD_MIN_PAGES = 2000
+SHARD_PAGES = 1000
+
+# Combined output split into volumes, cut between documents, so that none
+# has more than VOLUME_MAX_PAGES pages or VOLUME_MAX_BYTES bytes of stamped
+# PDFs (None = no limit). A normal run writes them one after another while
+# stamping; only a resumed run that rebuilds them afterwards writes volumes
+# on STAMP_WORKERS processes.
+VOLUME_MAX_PAGES = None
+VOLUME_MAX_BYTES = None
+
+# Persistent page-count index, one SQLite file per root folder (keyed by its
+# resolved path) in SCAN_INDEX_DIR (None = the per-user cache directory), so
+# runs, dry runs included, never write into the matter folder.
+USE_SCAN_INDEX = True
+SCAN_INDEX_DIR = None
+
+# Real runs append each finished step (conversions, rename plan, stamped
+# files) to this journal in ROOT_FOLDER. With RESUME, a run that was
+# interrupted continues from its journal instead of starting over.
+RESUME = False
+JOURNAL_NAME = ".oscpack_journal.jsonl"
+
 # File type groups
 PDF_EXT = ".pdf"
 WORD_EXTS = {".docx"}  # .doc is blocked
 EXCEL_EXTS = {".xls", ".xlsx", ".xlsm", ".xlsb"}
 VIDEO_EXTS = {".mp4", ".mov", ".m4v", ".avi", ".mkv", ".wmv", ".flv"}
 IMAGE_EXTS = {".jpg", ".jpeg", ".png", ".tif", ".tiff", ".bmp", ".gif"}
+
+# Image formats converted with one PDF page per frame (multi-page fax TIFFs, GIFs)
+MULTI_FRAME_IMAGE_FORMATS = {"TIFF", "GIF"}
 HTML_EXTS = {".html", ".htm"}
 TEXT_EXTS = {".txt"}
 
@@ -97,6 +227,29 @@ BATES_MARGIN_BOTTOM = 0.5 * inch
 BATES_MARGIN_RIGHT = 1.0 * inch
 BATES_FOOTER_BAND = 0.75 * inch
 
+# How the page and its label are put together when stamping:
+#   "direct" - keep the original content streams byte-for-byte and wrap them
+#              in a small transform/clip prefix and label suffix (fast)
+#   "merge"  - pypdf merge_transformed_page/merge_page, which re-encodes the
+#              page content (always used for pages with annotations)
+#   "incremental" - like "direct", but appended to the original file as a PDF
+#              incremental update (new page dictionaries, two small streams per
+#              page and an xref section) instead of rewriting the whole file.
+#              Files it cannot handle are rewritten as in "direct".
+STAMP_MODE = "direct"
+STAMP_MODES = ("direct", "merge", "incremental")
+
+# Stamped PDFs record their label and the SHA-256 of the file they were
+# stamped from in the document Info dictionary, so a re-run can tell an
+# already-stamped file from a new one and leave it alone.
+BATES_MARKER_KEY = "/OSCPackBates"
+BATES_SOURCE_KEY = "/OSCPackSourceSHA256"
+
+# Pages made from images are laid out on Letter with the footer band left
+# free; this page dictionary key tells the stamping stage the content is
+# already where it would move it.
+FOOTER_BAND_KEY = "/OSCPackFooterBand"
+
 # Parse names like:
 #   "CF 0001"
 #   "CF 0001-0008"
@@ -105,63 +258,309 @@ BATES_NAME_PATTERN = re.compile(
     r"^(?P<prefix>[A-Za-z0-9]+)\s+"
     r"(?P<start>\d+)"
     r"(?:-(?P<end>\d+))?"
-    r"(?:\s*-\s*.+)?$"
+    r"(?:\s*-\s*(?P<name>.+))?$"
 )
 
+# Combined PDF / volume names: "CF 0001- CF 0244"
+COMBINED_NAME_PATTERN = re.compile(r"^(?P<prefix>[A-Za-z0-9]+) (?P<start>\d+)- (?P=prefix) (?P<end>\d+)$")
+
+# Temporary names used while renaming and stamping (left behind if a run is interrupted)
+RENAME_TEMP_PATTERN = re.compile(r"^__tmp__[0-9a-f]{32}__(?P<name>.+)$")
+BATES_TEMP_PATTERN = re.compile(r"^__bates__[0-9a-f]{32}__")
+
+# Natural sort splits names into text and digit runs
+NATURAL_SPLIT_PATTERN = re.compile(r"(\d+)")
+
+# An indirect reference "n 0 R" in serialized PDF objects (group 1), or a
+# string, skipped so text that looks like a reference is left alone. pypdf
+# escapes parentheses inside literal strings, so they never nest.
+PDF_REFERENCE_PATTERN = re.compile(rb"\((?:[^()\\]|\\.)*\)|<[0-9A-Fa-f\s]*>|\b(\d+) 0 R\b", re.DOTALL)
+
+# System junk never included in the walk
+JUNK_FILE_NAMES = {"Thumbs.db", "desktop.ini"}
+
 # =======================================================
 
 
+def natural_name_key(name: str):
+    """Finder-like natural sort key for a single file or folder name."""
+    parts = NATURAL_SPLIT_PATTERN.split(name)
+    return [int(p) if p.isdigit() else p.lower() for p in parts]
+
+
 def natural_key(path: Path):
     """Finder-like natural sort with numeric awareness."""
-    parts = re.split(r"(\d+)", path.name)
-    return [int(p) if p.isdigit() else p.lower() for p in parts]
+    return natural_name_key(path.name)
 
 
-def iter_finder_order_files(root: Path):
+class FileRecord(NamedTuple):
+    """A file found by the walker, with the stat data captured during the scan."""
+    path: Path
+    size: int
+    mtime: float
+
+
+def _is_skipped_name(name: str) -> bool:
+    # Hidden / temp / junk, plus the backup folder wherever it appears
+    return (
+        name.startswith(".")
+        or name.startswith("~")
+        or name in JUNK_FILE_NAMES
+        or name == BACKUP_FOLDER_NAME
+    )
+
+
+def _scan_dir_sorted(folder: Path):
+    """
+    List one directory with os.scandir.
+
+    Returns (files, subdirs) in natural order, where files are FileRecords
+    built from the DirEntry stat data and subdirs are Paths.
     """
-    Depth-first traversal in natural order.
+    with os.scandir(folder) as it:
+        entries = [e for e in it if not _is_skipped_name(e.name)]
+    entries.sort(key=lambda e: natural_name_key(e.name))
+
+    ordered = []
+    for entry in entries:
+        try:
+            if entry.is_dir():
+                ordered.append(Path(entry.path))
+            elif entry.is_file():
+                st = entry.stat()
+                ordered.append(FileRecord(Path(entry.path), st.st_size, st.st_mtime))
+        except OSError:
+            # Vanished or unreadable entry (e.g. broken network path)
+            continue
+    return ordered
+
+
+def scan_finder_order(root: Path, workers: int = 1):
+    """
+    Depth-first traversal in natural order, yielding FileRecords.
 
     Skips:
       - Hidden files/folders starting with '.' or '~'
       - Common system junk (Thumbs.db, desktop.ini)
-      - Backup folder tree
-    """
-    entries = sorted(root.iterdir(), key=natural_key)
-    for entry in entries:
-        name = entry.name
+      - Backup folder tree (pruned as a directory, never descended into)
 
-        if BACKUP_FOLDER_NAME in entry.parts:
-            continue
+    With workers > 1, directories are listed concurrently on a bounded
+    thread pool; the records are still yielded in exactly the same order.
+    """
+    if BACKUP_FOLDER_NAME in root.parts:
+        return
 
-        # Skip hidden / temp / junk
-        if name.startswith(".") or name.startswith("~"):
-            continue
-        if name in {"Thumbs.db", "desktop.ini"}:
-            continue
+    if workers > 1:
+        yield from _scan_finder_order_parallel(root, workers)
+        return
 
-        if entry.is_dir():
-            yield from iter_finder_order_files(entry)
-        else:
+    for entry in _scan_dir_sorted(root):
+        if isinstance(entry, FileRecord):
             yield entry
+        else:
+            yield from scan_finder_order(entry)
 
 
-def find_blocking_files(root: Path):
+def _scan_finder_order_parallel(root: Path, workers: int):
+    """
+    List every directory under `root` on a thread pool, then replay the
+    listings depth-first so the output order matches the sequential walk.
+    """
+    listings = {}
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_scan_dir_sorted, root): root}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                folder = pending.pop(future)
+                entries = future.result()
+                listings[folder] = entries
+                for entry in entries:
+                    if not isinstance(entry, FileRecord):
+                        pending[pool.submit(_scan_dir_sorted, entry)] = entry
+
+    def replay(folder: Path):
+        for entry in listings[folder]:
+            if isinstance(entry, FileRecord):
+                yield entry
+            else:
+                yield from replay(entry)
+
+    yield from replay(root)
+
+
+def iter_finder_order_files(root: Path):
+    """Depth-first traversal in natural order, yielding file paths."""
+    for record in scan_finder_order(root):
+        yield record.path
+
+
+# ---------- Tree manifest ----------
+
+class TreeManifest:
+    """
+    In-memory list of the files under `root`, kept in Finder order.
+
+    Built by a single walk at the start of a run and updated in place as
+    stages convert, rename and create files, so no stage has to walk the
+    tree again. Only files the walker would yield are tracked (hidden,
+    junk and backup entries are never included).
+    """
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._files = {}    # Path -> FileRecord
+        self._dirs = set()
+        self._ordered = None
+
+    @classmethod
+    def scan(cls, root: Path):
+        """Walk `root` once and return a manifest of everything found."""
+        manifest = cls(root)
+        ordered = []
+        for record in scan_finder_order(root, workers=SCAN_WORKERS):
+            manifest._track(record)
+            ordered.append(record.path)
+        # The walk already yields Finder order, so no initial sort is needed
+        manifest._ordered = ordered
+        return manifest
+
+    def _sort_key(self, path: Path):
+        return [natural_name_key(part) for part in path.relative_to(self.root).parts]
+
+    def _track(self, record: FileRecord):
+        self._files[record.path] = record
+        parent = record.path.parent
+        while parent != self.root and parent not in self._dirs:
+            self._dirs.add(parent)
+            parent = parent.parent
+        self._ordered = None
+
+    def files(self):
+        """Return all tracked files in Finder (depth-first, natural) order."""
+        if self._ordered is None:
+            self._ordered = sorted(self._files, key=self._sort_key)
+        return self._ordered
+
+    def records(self):
+        """Return FileRecords (path, size, mtime) in Finder order."""
+        return [self._files[p] for p in self.files()]
+
+    def record(self, path: Path):
+        return self._files.get(path)
+
+    def __iter__(self):
+        return iter(self.files())
+
+    def __len__(self):
+        return len(self._files)
+
+    def __contains__(self, path):
+        return path in self._files
+
+    def exists(self, path: Path) -> bool:
+        """Manifest-only equivalent of path.exists() for paths under root."""
+        return path in self._files or path in self._dirs
+
+    def add(self, path: Path):
+        """Track a file a stage just created (stats it once)."""
+        st = path.stat()
+        self._track(FileRecord(path, st.st_size, st.st_mtime))
+
+    def refresh(self, path: Path):
+        """Re-stat a tracked file after a stage rewrote it in place."""
+        if path in self._files:
+            self.add(path)
+
+    def remove(self, path: Path):
+        self._files.pop(path, None)
+        self._ordered = None
+
+    def replace(self, old: Path, new: Path):
+        """Record that `old` was converted to the new file `new`."""
+        self.remove(old)
+        self.add(new)
+
+    def rename(self, old: Path, new: Path):
+        """Record a file rename; size and mtime carry over unchanged."""
+        record = self._files.pop(old, None)
+        if record is None:
+            return
+        self._track(record._replace(path=new))
+
+    def rename_folder(self, old: Path, new: Path):
+        """Re-root every tracked path under folder `old` to `new`."""
+        def moved(p: Path) -> Path:
+            return new / p.relative_to(old)
+
+        files = {}
+        for p, record in self._files.items():
+            if old in p.parents:
+                record = record._replace(path=moved(p))
+            files[record.path] = record
+        self._files = files
+        self._dirs = {moved(d) if d == old or old in d.parents else d for d in self._dirs}
+        self._ordered = None
+
+
+def find_blocking_files(root: Path, manifest=None):
     """
     Return list of disallowed files:
       - .doc
       - .eml
       - .msg
     """
+    if manifest is None:
+        manifest = TreeManifest.scan(root)
+
     blocking = []
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
+    for path in manifest.files():
         if path.suffix.lower() in BLOCKED_OTHER_EXTS:
             blocking.append(path)
     return blocking
 
 
-def get_pdf_page_count(path: Path) -> int:
+def fast_pdf_page_count(path: Path):
+    """
+    Read the page count from the trailer's /Root /Pages /Count entry.
+
+    Opens the file handle in strict mode, so pypdf only reads the xref
+    table/stream and the few objects needed, never the page tree or page
+    content. Returns None when the file is damaged, encrypted or the count
+    looks inconsistent; callers then fall back to the full parse.
+    """
+    try:
+        with open(path, "rb") as f:
+            reader = PdfReader(f, strict=True)
+            if reader.is_encrypted:
+                return None
+            pages_root = reader.trailer["/Root"].get_object()["/Pages"].get_object()
+            if pages_root.get("/Type") != "/Pages":
+                return None
+            count = pages_root["/Count"].get_object()
+            kids = pages_root["/Kids"].get_object()
+            num_objects = sum(len(v) for v in reader.xref.values()) + len(reader.xref_objStm)
+    except Exception:
+        return None
+
+    if isinstance(count, bool) or not isinstance(count, int):
+        return None
+    # Every page needs its own object, and each kid holds at least one page
+    if count <= 0 or count > num_objects or not 0 < len(kids) <= count:
+        return None
+    return count
+
+
+def get_pdf_page_count(path: Path, verify: bool = False) -> int:
+    """
+    Page count of a PDF, 0 if unreadable. With verify=True the page tree is
+    always walked (as stamping does) instead of trusting its stored /Count.
+    """
+    count = None if verify else fast_pdf_page_count(path)
+    if count is not None:
+        return count
+
     try:
         reader = PdfReader(str(path))
         return len(reader.pages)
@@ -170,66 +569,1006 @@ def get_pdf_page_count(path: Path) -> int:
         return 0
 
 
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+# ---------- Scan index ----------
+
+def scan_index_path(root: Path) -> Path:
+    """Where the scan index for `root` lives: SCAN_INDEX_DIR or the per-user cache directory."""
+    if SCAN_INDEX_DIR is not None:
+        folder = Path(SCAN_INDEX_DIR)
+    elif sys.platform == "win32":
+        folder = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local") / "OSCPack"
+    elif sys.platform == "darwin":
+        folder = Path.home() / "Library" / "Caches" / "OSCPack"
+    else:
+        folder = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "oscpack"
+    key = hashlib.sha256(str(root.resolve()).encode("utf-8")).hexdigest()[:16]
+    return folder / f"index-{key}.sqlite3"
+
+
+class ScanIndex:
+    """
+    Persistent per-matter cache of PDF page counts, stored as SQLite outside
+    the root folder (see scan_index_path).
+
+    Rows are keyed by path relative to root and are only trusted while the
+    file's size and mtime still match, so unchanged files are never re-opened
+    on later dry runs or real runs. Each row also says whether its count came
+    from the page tree (verified) or from the stored /Count; real runs only
+    take verified rows.
+    """
+
+    def __init__(self, root: Path, db_path: Path):
+        self.root = root
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS page_counts ("
+            " rel_path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime REAL NOT NULL,"
+            " page_count INTEGER NOT NULL,"
+            " verified INTEGER NOT NULL DEFAULT 0)"
+        )
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(page_counts)")}
+        if "verified" not in columns:
+            # index written before counts were marked verified
+            self._conn.execute("ALTER TABLE page_counts ADD COLUMN verified INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def open(cls, root: Path):
+        """Open (or create) the index for `root`; returns None if unavailable."""
+        db_path = scan_index_path(root)
+        try:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            return cls(root, db_path)
+        except (OSError, sqlite3.Error) as e:
+            print(f"⚠️  Scan index unavailable ({db_path}): {e}")
+            return None
+
+    def _key(self, record: FileRecord) -> str:
+        return record.path.relative_to(self.root).as_posix()
+
+    def lookup(self, record: FileRecord, verified: bool = False):
+        """Return the cached page count if size and mtime still match (and, if asked, it is verified), else None."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT page_count FROM page_counts"
+                " WHERE rel_path = ? AND size = ? AND mtime = ? AND verified >= ?",
+                (self._key(record), record.size, record.mtime, int(verified)),
+            ).fetchone()
+        return None if row is None else row[0]
+
+    def store(self, record: FileRecord, page_count: int, verified: bool = False):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_counts (rel_path, size, mtime, page_count, verified)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (self._key(record), record.size, record.mtime, page_count, int(verified)),
+            )
+
+    def page_count(self, record: FileRecord, verify: bool = False) -> int:
+        """Cached equivalent of get_pdf_page_count()."""
+        cached = self.lookup(record, verify)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        self.misses += 1
+        pages = None if verify else fast_pdf_page_count(record.path)
+        verified = pages is None
+        if pages is None:
+            try:
+                pages = len(PdfReader(str(record.path)).pages)
+            except Exception as e:
+                print(f"⚠️  Skipping unreadable PDF {record.path}: {e}")
+                return 0
+        self.store(record, pages, verified)
+        return pages
+
+    def close(self):
+        with self._lock:
+            self._conn.commit()
+            self._conn.close()
+
+
+def count_pdf_pages(path: Path, manifest=None, index=None, verify: bool = False) -> int:
+    """Page count for a PDF, served from the scan index when possible."""
+    if index is not None and manifest is not None:
+        record = manifest.record(path)
+        if record is not None:
+            return index.page_count(record, verify)
+    return get_pdf_page_count(path, verify)
+
+
+# ---------- Run journal ----------
+
+class RunJournal:
+    """
+    Append-only log of the finished steps of a real run, one JSON object
+    per line in ROOT_FOLDER/JOURNAL_NAME.
+
+    Every entry is flushed and fsynced as soon as its step is done, so after
+    a crash the journal says which conversions, renames and stamped files
+    are complete. Paths are stored relative to root.
+    """
+
+    def __init__(self, root: Path, entries=(), resumed: bool = False):
+        self.root = root
+        self.path = root / JOURNAL_NAME
+        self.resumed = resumed
+        self._last = {}         # step -> latest entry
+        self._converting = {}   # (kind, rel src) -> rel dst, conversion started
+        self._converted = {}    # (kind, rel src) -> rel dst, conversion finished
+        self._stamped = {}      # rel path -> "stamp" entry
+        self._stamping = {}     # rel path -> "stamp_start" entry
+        for entry in entries:
+            self._index(entry)
+
+    @classmethod
+    def load(cls, root: Path):
+        """Read the journal in `root`, or None if there is none."""
+        try:
+            data = (root / JOURNAL_NAME).read_bytes()
+        except FileNotFoundError:
+            return None
+        entries = []
+        # A crash mid-write can leave a torn last line; only whole lines count
+        for line in data[: data.rfind(b"\n") + 1].splitlines():
+            try:
+                entries.append(json.loads(line))
+            except ValueError:
+                continue
+        return cls(root, entries)
+
+    @classmethod
+    def open(cls, root: Path, settings: dict, resume: bool):
+        """
+        Journal for a real run: with `resume`, continue the one in `root`
+        (its numbering settings must match); otherwise start a new one.
+        """
+        previous = cls.load(root)
+        if resume and previous is not None and previous.done("run"):
+            recorded = previous.last("run")["settings"]
+            changed = [k for k in settings if recorded.get(k) != settings[k]]
+            if changed:
+                raise ValueError(
+                    f"Cannot resume: the interrupted run used different settings ({', '.join(changed)})."
+                )
+            with open(previous.path, "r+b") as f:
+                data = f.read()
+                f.truncate(data.rfind(b"\n") + 1)
+            previous.resumed = True
+            if not previous.finished():
+                print(f"⏩ Resuming the interrupted run recorded in {JOURNAL_NAME}")
+            return previous
+
+        if resume:
+            print("ℹ️  No run journal found; starting a new run.")
+        elif previous is not None and previous.done("run") and not previous.finished():
+            print("⚠️  The previous run did not finish; starting over (use --resume to continue it).")
+
+        journal = cls(root)
+        journal.path.write_bytes(b"")
+        journal.record("run", settings=settings)
+        return journal
+
+    def _index(self, entry: dict):
+        step = entry.get("step")
+        self._last[step] = entry
+        if step == "convert_start":
+            self._converting[(entry["kind"], entry["src"])] = entry["dst"]
+        elif step == "convert":
+            self._converted[(entry["kind"], entry["src"])] = entry["dst"]
+        elif step == "stamp":
+            self._stamped[entry["path"]] = entry
+        elif step == "stamp_start":
+            self._stamping[entry["path"]] = entry
+
+    def _write(self, entries):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+            f.flush()
+            os.fsync(f.fileno())
+        for entry in entries:
+            self._index(entry)
+
+    def _rel(self, path: Path) -> str:
+        return path.relative_to(self.root).as_posix()
+
+    def record(self, step: str, **fields):
+        self._write([{"step": step, **fields}])
+
+    def done(self, step: str) -> bool:
+        return step in self._last
+
+    def last(self, step: str):
+        return self._last.get(step)
+
+    def finished(self) -> bool:
+        return self.done("done")
+
+    def finish(self, summary: dict):
+        self.record("done", summary=summary)
+
+    def discard(self):
+        """Delete the journal of a run that stopped before it had anything to resume."""
+        self.path.unlink(missing_ok=True)
+
+    def summary(self) -> dict:
+        """The summary dict recorded when the run finished."""
+        summary = dict(self.last("done")["summary"])
+        summary["renamed"] = [tuple(pair) for pair in summary["renamed"]]
+        return summary
+
+    # Conversions
+
+    def start_conversion(self, kind: str, src: Path, dst: Path):
+        self.record("convert_start", kind=kind, src=self._rel(src), dst=self._rel(dst))
+
+    def start_conversions(self, jobs):
+        """start_conversion for each (kind, src, dst) in `jobs`, in one write."""
+        entries = [
+            {"step": "convert_start", "kind": kind, "src": self._rel(src), "dst": self._rel(dst)}
+            for kind, src, dst in jobs
+        ]
+        if entries:
+            self._write(entries)
+
+    def record_conversion(self, kind: str, src: Path, dst: Path):
+        self.record("convert", kind=kind, src=self._rel(src), dst=self._rel(dst))
+
+    def conversions(self, kind: str):
+        """(src, dst) strings for the recorded conversions of this kind."""
+        return [
+            (str(self.root / src), str(self.root / dst))
+            for (k, src), dst in self._converted.items() if k == kind
+        ]
+
+    def finish_conversion(self, kind: str, path: Path, delete_original: bool, manifest) -> bool:
+        """
+        If `path` was already converted (the run stopped before the original
+        was deleted), finish that conversion instead of repeating it and
+        return True. A conversion that never finished has its partial output
+        removed, so the file is converted again under the same name.
+        """
+        rel = self._rel(path)
+        dst = self._converted.get((kind, rel))
+        if dst is not None and (self.root / dst).exists():
+            if delete_original:
+                path.unlink(missing_ok=True)
+                manifest.remove(path)
+            return True
+        started = self._converting.get((kind, rel))
+        if started is not None and started != rel:
+            (self.root / started).unlink(missing_ok=True)
+            manifest.remove(self.root / started)
+        return False
+
+    # Rename plan
+
+    def record_plan(self, operations, total_files: int):
+        self.record(
+            "plan",
+            operations=[[self._rel(src), self._rel(dst)] for src, dst in operations],
+            total_files=total_files,
+        )
+
+    def plan(self):
+        """(operations, total_files) as recorded by record_plan."""
+        entry = self.last("plan")
+        operations = [(self.root / src, self.root / dst) for src, dst in entry["operations"]]
+        return operations, entry["total_files"]
+
+    # Stamping
+
+    def stamping(self, pdfs, manifest):
+        """Note the size and mtime of each PDF about to be stamped."""
+        entries = []
+        for pdf in pdfs:
+            record = manifest.record(pdf)
+            if record is not None:
+                entries.append({
+                    "step": "stamp_start", "path": self._rel(pdf),
+                    "size": record.size, "mtime": record.mtime,
+                })
+        if entries:
+            self._write(entries)
+
+    def stamped(self, pdf: Path, pages: int, skipped: int):
+        st = pdf.stat()
+        self.record(
+            "stamp", path=self._rel(pdf), pages=pages, skipped=skipped,
+            size=st.st_size, mtime=st.st_mtime, sha256=file_sha256(pdf),
+        )
+
+    def stamp_state(self, pdf: Path):
+        """
+        Where `pdf` stands in this run, as (state, result):
+          ("done", (pages, skipped)) - stamped and unchanged since (hash checked if touched)
+          ("changed", None)          - stamped, but modified afterwards
+          ("interrupted", None)      - modified by a stamp that never finished
+          (None, None)               - not stamped yet
+        """
+        rel = self._rel(pdf)
+        st = pdf.stat()
+        entry = self._stamped.get(rel)
+        if entry is not None:
+            if (st.st_size, st.st_mtime) == (entry["size"], entry["mtime"]) or file_sha256(pdf) == entry["sha256"]:
+                return "done", (entry["pages"], entry["skipped"])
+            return "changed", None
+        start = self._stamping.get(rel)
+        if start is not None and (st.st_size, st.st_mtime) != (start["size"], start["mtime"]):
+            return "interrupted", None
+        return None, None
+
+
 # ---------- Image → PDF ----------
 
+class DecodeBudget:
+    """
+    IMAGE_MEMORY_BUDGET shared by the conversion processes: bytes of
+    decoded image data that may be held at once. A hold larger than the
+    whole budget waits until nothing else is held, so one oversized image
+    still converts, on its own.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._held = multiprocessing.RawValue("q", 0)
+        self._changed = multiprocessing.Condition()
+
+    @contextlib.contextmanager
+    def hold(self, nbytes: int):
+        nbytes = min(nbytes, self.limit)
+        if not nbytes:
+            yield
+            return
+        with self._changed:
+            self._changed.wait_for(lambda: self._held.value + nbytes <= self.limit)
+            self._held.value += nbytes
+        try:
+            yield
+        finally:
+            with self._changed:
+                self._held.value -= nbytes
+                self._changed.notify_all()
+
+
+# Set in conversion pool workers (see _convert_in_processes); None = no limit
+_decode_budget = None
+
+
 def convert_image_to_pdf(image_path: Path, pdf_path: Path):
-    """Convert a single image to a single-page PDF."""
-    with Image.open(image_path) as img:
-        if img.mode not in ("RGB", "L"):
-            img = img.convert("RGB")
+    """
+    Convert an image to a PDF with one page per frame (every frame of a
+    TIFF or GIF, see MULTI_FRAME_IMAGE_FORMATS), each a US Letter page with
+    the image placed as image_page_layout says, so neither the Letter
+    reformat nor the stamping stage has to move it again.
+
+    Image data is kept as it is wherever a PDF can hold it: JPEG files are
+    embedded byte for byte and CCITT Group 4 TIFF frames keep their fax
+    encoding (one image per TIFF strip). Other bitonal frames are stored at
+    1 bit per pixel and everything else losslessly with Flate. Frames are
+    decoded and written one at a time (see StreamingPdfWriter).
+
+    Images over IMAGE_MAX_DPI are scaled down (see image_downsample_factor),
+    and decoding waits for its share of IMAGE_MEMORY_BUDGET, estimated from
+    the first frame (see image_decode_cost).
+    """
+    with Image.open(image_path) as img, open(image_path, "rb") as src:
         pdf_path.parent.mkdir(parents=True, exist_ok=True)
-        img.save(pdf_path, "PDF")
+        budget = contextlib.nullcontext()
+        if _decode_budget is not None:
+            budget = _decode_budget.hold(image_decode_cost(img, image_downsample_factor(img.width, img.height)))
+        try:
+            with budget, open(pdf_path, "wb") as f:
+                out = StreamingPdfWriter(f)
+                for _ in image_frames(img):
+                    # Laid out from the full pixel size, before a JPEG draft shrinks img.size
+                    layout = image_page_layout(img.width, img.height)
+                    factor = image_downsample_factor(img.width, img.height)
+                    batch = PdfWriter()
+                    _add_image_page(batch, *layout, image_xobjects(img, src, factor))
+                    out.add_pages(batch)
+                out.close()
+        except BaseException:
+            pdf_path.unlink(missing_ok=True)
+            raise
+
+
+def _frame_count(img) -> int:
+    return getattr(img, "n_frames", 1) if img.format in MULTI_FRAME_IMAGE_FORMATS else 1
+
+
+def image_frames(img):
+    """Seek `img` to each frame that becomes a page, yielding the frame index."""
+    for i in range(_frame_count(img)):
+        if i:
+            img.seek(i)
+        yield i
+
+
+def image_page_count(image_path: Path) -> int:
+    """Pages convert_image_to_pdf makes from `image_path`."""
+    with Image.open(image_path) as img:
+        return _frame_count(img)
+
+
+JPEG_COLOR_SPACES = {"L": "/DeviceGray", "RGB": "/DeviceRGB", "CMYK": "/DeviceCMYK"}
+
+# Pillow names JPEGs that carry MPF data (gain maps, depth maps, stereo pairs
+# from phone cameras) "MPO"; their first image is an ordinary JPEG.
+JPEG_FORMATS = {"JPEG", "MPO"}
+MPF_ENTRIES = 0xB002
+FLATE_COLOR_SPACES = {"1": "/DeviceGray", **JPEG_COLOR_SPACES}
+
+TIFF_PHOTOMETRIC = 262
+TIFF_FILL_ORDER = 266
+TIFF_STRIP_OFFSETS = 273
+TIFF_ROWS_PER_STRIP = 278
+TIFF_STRIP_BYTE_COUNTS = 279
+
+# Bits per pixel of the uncompressed ("raw") layouts read in bands of rows
+RAW_BITS = {
+    "1": 1, "1;I": 1, "L": 8, "L;I": 8, "RGB": 24, "BGR": 24,
+    "RGBX": 32, "BGRX": 32, "RGBA": 32, "BGRA": 32, "CMYK": 32,
+}
+
+# Uncompressed image data decoded, converted and compressed per band of rows
+IMAGE_BAND_BYTES = 8 * 2**20
+
+
+def image_downsample_factor(width: int, height: int) -> int:
+    """
+    Whole factor to divide a width x height pixel image by so that it is at
+    most IMAGE_MAX_DPI when fitted to Letter (1 = keep every pixel).
+    """
+    if not IMAGE_MAX_DPI:
+        return 1
+    _, _, scale, _, _ = letter_transform(width, height)
+    return max(1, math.ceil(72 / scale / IMAGE_MAX_DPI - 1e-9))
 
 
-def convert_images_in_tree(root: Path, delete_original: bool):
+def image_decode_cost(img, factor: int) -> int:
+    """
+    Estimated bytes of decoded pixels image_xobjects holds at once for the
+    current frame of `img` downsampled by `factor` (0 when it copies the
+    encoded data as is).
+    """
+    jpeg = img.format in JPEG_FORMATS and img.mode in JPEG_COLOR_SPACES
+    if _group4_strips(img) is not None or (jpeg and factor == 1):
+        return 0
+    pixel = 1 if img.mode in ("1", "L", "P") else 4      # Pillow keeps RGB as 4 bytes
+    if jpeg:
+        # Pillow's draft decodes at 1/2, 1/4 or 1/8 scale
+        draft = 1
+        while draft < 8 and draft * 2 <= factor:
+            draft *= 2
+        reduced = -(-img.width // factor) * -(-img.height // factor) * pixel
+        return -(-img.width // draft) * -(-img.height // draft) * pixel + reduced
+    if _raw_tile(img) is not None:
+        return 3 * IMAGE_BAND_BYTES
+    return img.width * img.height * pixel + 3 * IMAGE_BAND_BYTES
+
+
+def image_xobjects(img, src, factor: int = 1):
+    """
+    Image XObjects showing the current frame of `img`, as [(image, rows)]
+    from the top down; `src` is the image file, open for reading, for the
+    encodings copied without decoding.
+
+    With `factor` > 1 the frame is stored that many times smaller each way
+    (Group 4 frames excepted): JPEGs are decoded at reduced scale (Pillow
+    draft) and re-encoded with their own quantization tables, uncompressed
+    TIFF and BMP frames are read from `src` a band of rows at a time (see
+    _raw_bands), and anything else is decoded whole and then reduced a band
+    at a time.
+    """
+    def new_image(size, data, filter_name, color_space, bits):
+        image = EncodedStreamObject()
+        image._data = data
+        image[NameObject("/Type")] = NameObject("/XObject")
+        image[NameObject("/Subtype")] = NameObject("/Image")
+        image[NameObject("/Width")] = NumberObject(size[0])
+        image[NameObject("/Height")] = NumberObject(size[1])
+        image[NameObject("/Filter")] = NameObject(filter_name)
+        image[NameObject("/ColorSpace")] = NameObject(color_space)
+        image[NameObject("/BitsPerComponent")] = NumberObject(bits)
+        return image
+
+    strips = _group4_strips(img)
+    if strips is not None:
+        images = []
+        for offset, length, rows in strips:
+            src.seek(offset)
+            image = new_image((img.width, rows), src.read(length), "/CCITTFaxDecode", "/DeviceGray", 1)
+            parms = DictionaryObject({
+                NameObject("/K"): NumberObject(-1),
+                NameObject("/Columns"): NumberObject(img.width),
+                NameObject("/Rows"): NumberObject(rows),
+            })
+            if img.tag_v2.get(TIFF_PHOTOMETRIC) == 1:
+                # BlackIsZero: the fax "black" runs are shown white
+                parms[NameObject("/BlackIs1")] = BooleanObject(True)
+            image[NameObject("/DecodeParms")] = parms
+            images.append((image, rows))
+        return images
+
+    size = (-(-img.width // factor), -(-img.height // factor))
+    if img.format in JPEG_FORMATS and img.mode in JPEG_COLOR_SPACES:
+        if factor == 1:
+            data, adobe = _primary_jpeg(img, src), "adobe" in img.info
+        else:
+            data = _downsampled_jpeg(img, size)
+            with Image.open(io.BytesIO(data)) as encoded:
+                adobe = "adobe" in encoded.info
+        image = new_image(size, data, "/DCTDecode", JPEG_COLOR_SPACES[img.mode], 8)
+        if img.mode == "CMYK" and adobe:
+            # Adobe CMYK JPEGs store inverted ink values
+            image[NameObject("/Decode")] = ArrayObject([NumberObject(1), NumberObject(0)] * 4)
+        return [(image, size[1])]
+
+    # Mode "1" rows are packed 8 pixels to a byte, 1 = white, as DeviceGray expects;
+    # scaled down, bitonal frames become grayscale
+    mode = img.mode if img.mode in FLATE_COLOR_SPACES else "RGB"
+    if factor > 1 and mode == "1":
+        mode = "L"
+    bands = _raw_bands(img, src, factor, mode)
+    if bands is None:
+        bands = _row_bands(img, factor, mode)
+    compressor = zlib.compressobj()
+    data = b"".join(compressor.compress(band.tobytes()) for band in bands) + compressor.flush()
+    image = new_image(size, data, "/FlateDecode", FLATE_COLOR_SPACES[mode], 1 if mode == "1" else 8)
+    return [(image, size[1])]
+
+
+def _primary_jpeg(img, src) -> bytes:
+    """
+    The JPEG data of `img`: the whole file, or for an MPO only its primary
+    image (the first MPF entry), so the gain map and other images are left out.
+    """
+    src.seek(0)
+    if img.format == "MPO":
+        entries = (getattr(img, "mpinfo", None) or {}).get(MPF_ENTRIES)
+        if entries and entries[0].get("Size"):
+            data = src.read(entries[0]["Size"])
+            if data.startswith(b"\xff\xd8") and data.endswith(b"\xff\xd9"):
+                return data
+            src.seek(0)
+    return src.read()
+
+
+def _downsampled_jpeg(img, size) -> bytes:
+    """The JPEG `img` decoded at reduced scale, brought down to `size` and encoded again."""
+    quantization = img.quantization
+    sampling = JpegImagePlugin.get_sampling(img)
+    img.draft(img.mode, size)
+    frame = img if img.size == size else img.resize(size, Image.Resampling.LANCZOS, reducing_gap=3.0)
+    options = {"qtables": quantization}
+    if sampling != -1:
+        options["subsampling"] = sampling
+    out = io.BytesIO()
+    frame.save(out, "JPEG", **options)
+    return out.getvalue()
+
+
+def _row_bands(frame, factor: int, mode: str):
+    """
+    `frame` in bands of about IMAGE_BAND_BYTES, top down, each converted to
+    `mode` and reduced by `factor`.
+    """
+    rows = max(factor, IMAGE_BAND_BYTES // (frame.width * 4) // factor * factor)
+    for top in range(0, frame.height, rows):
+        band = frame.crop((0, top, frame.width, min(top + rows, frame.height)))
+        if band.mode != mode:
+            band = band.convert(mode)
+        yield band.reduce(factor) if factor > 1 else band
+
+
+def _raw_tile(img):
+    """
+    (offset, rawmode, stride, orientation) of the current frame when it is
+    stored uncompressed in one run of rows Pillow can read (uncompressed
+    TIFF, BMP), else None.
+    """
+    if img.mode not in ("1", "L", "RGB", "RGBA", "CMYK") or len(img.tile) != 1:
+        return None
+    codec, extents, offset, args = img.tile[0]
+    if codec != "raw" or tuple(extents) != (0, 0, img.width, img.height):
+        return None
+    if not isinstance(args, tuple) or len(args) != 3:
+        return None
+    rawmode, stride, orientation = args
+    if rawmode not in RAW_BITS or orientation not in (1, -1):
+        return None
+    return offset, rawmode, stride or -(-img.width * RAW_BITS[rawmode] // 8), orientation
+
+
+def _raw_bands(img, src, factor: int, mode: str):
+    """
+    The current frame of `img` read from `src` in bands of rows, top down,
+    each converted to `mode` and reduced by `factor`, without decoding the
+    rest of the frame; None unless _raw_tile can locate its rows.
+    """
+    tile = _raw_tile(img)
+    if tile is None:
+        return None
+    offset, rawmode, stride, orientation = tile
+    rows = max(factor, IMAGE_BAND_BYTES // (img.width * 4) // factor * factor)
+
+    def bands():
+        for top in range(0, img.height, rows):
+            count = min(rows, img.height - top)
+            # Bottom-up files (orientation -1) store the last row first
+            first = top if orientation == 1 else img.height - top - count
+            src.seek(offset + first * stride)
+            band = Image.frombytes(
+                img.mode, (img.width, count), src.read(count * stride), "raw", rawmode, stride, orientation
+            )
+            if band.mode != mode:
+                band = band.convert(mode)
+            yield band.reduce(factor) if factor > 1 else band
+
+    return bands()
+
+
+def _group4_strips(img):
+    """
+    [(offset, length, rows), ...] of the current TIFF frame's Group 4
+    strips, or None unless it is a Group 4 frame a PDF can show as is.
+    """
+    if img.format != "TIFF" or img.mode != "1" or img.info.get("compression") != "group4":
+        return None
+    tags = img.tag_v2
+    offsets = tags.get(TIFF_STRIP_OFFSETS)
+    counts = tags.get(TIFF_STRIP_BYTE_COUNTS)
+    if not offsets or not counts or len(offsets) != len(counts):
+        return None
+    if tags.get(TIFF_FILL_ORDER, 1) != 1 or tags.get(TIFF_PHOTOMETRIC) not in (0, 1):
+        return None
+    rows_per_strip = min(tags.get(TIFF_ROWS_PER_STRIP, img.height), img.height)
+    if len(offsets) != -(-img.height // rows_per_strip):
+        return None
+    return [
+        (offset, count, min(rows_per_strip, img.height - k * rows_per_strip))
+        for k, (offset, count) in enumerate(zip(offsets, counts))
+    ]
+
+
+def image_page_layout(width: float, height: float):
+    """
+    Page for an image of width x height points (its pixels at 72 dpi), as
+    (page_width, page_height, (x, y, w, h) where the image goes, footer).
+
+    The page is Letter in the orientation choose_letter_size picks, and the
+    image lands exactly where letter_transform and then footer_transform
+    would move it. Outside CONVERSION_ONLY the footer band is left free and
+    the page carries FOOTER_BAND_KEY; conversion-only output has no band,
+    as its Letter reformat never made one.
+    """
+    page_w, page_h, scale, tx, ty = letter_transform(width, height)
+    footer = not CONVERSION_ONLY
+    band_scale, band_tx, band_ty = footer_transform(page_w, page_h) if footer else (1.0, 0.0, 0.0)
+    rect = (
+        band_tx + band_scale * tx,
+        band_ty + band_scale * ty,
+        band_scale * scale * width,
+        band_scale * scale * height,
+    )
+    return page_w, page_h, rect, footer
+
+
+def _add_image_page(writer: PdfWriter, page_w: float, page_h: float, rect, footer: bool, images):
+    """Add a page_w x page_h page showing `images` ([(image, rows)], top down) in rect (x, y, w, h)."""
+    page = writer.add_blank_page(width=page_w, height=page_h)
+    x, y, width, height = rect
+    xobjects = DictionaryObject()
+    commands = []
+    total_rows = sum(rows for _, rows in images)
+    top = y + height
+    for k, (image, rows) in enumerate(images):
+        name = f"/Im{k}"
+        xobjects[NameObject(name)] = writer._add_object(image)
+        strip_height = height * rows / total_rows
+        top -= strip_height
+        commands.append(b"q %s 0 0 %s %s %s cm %s Do Q" % (
+            _pdf_number(width), _pdf_number(strip_height), _pdf_number(x), _pdf_number(top), name.encode("ascii"),
+        ))
+    page[NameObject("/Resources")] = DictionaryObject({NameObject("/XObject"): xobjects})
+    content = DecodedStreamObject()
+    content.set_data(b"\n".join(commands))
+    page[NameObject("/Contents")] = writer._add_object(content)
+    if footer:
+        page[NameObject(FOOTER_BAND_KEY)] = BooleanObject(True)
+
+
+def convert_images_in_tree(root: Path, delete_original: bool, manifest=None, journal=None):
     """
     Recursively convert images under `root` to PDFs.
 
     - Honors DRY_RUN via delete_original flag and convert logic.
     - Avoids overwriting existing PDFs.
+    - With a journal, records each conversion and skips ones already recorded.
+
+    See convert_tree, which runs this together with the other conversions.
     """
-    conversions = []
-    errors = []
+    return convert_tree(root, ("image",), delete_original, manifest, journal)["image"]
 
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
 
-        ext = path.suffix.lower()
-        if ext not in IMAGE_EXTS:
-            continue
+def _convert_image_job(image_path: Path, pdf_path: Path):
+    if DRY_RUN:
+        print(f"(DRY RUN) Would convert image to PDF: {image_path} -> {pdf_path}")
+    else:
+        convert_image_to_pdf(image_path, pdf_path)
+    return pdf_path
 
-        pdf_path = path.with_suffix(".pdf")
-        counter = 1
-        while pdf_path.exists():
-            pdf_path = path.with_name(f"{path.stem}_{counter}.pdf")
-            counter += 1
 
-        if DRY_RUN:
-            print(f"(DRY RUN) Would convert image to PDF: {path} -> {pdf_path}")
-            conversions.append((str(path), str(pdf_path)))
-            continue
+# ---------- DOCX → PDF (delete original) ----------
+
+class DocxConverter:
+    """
+    A DOCX → PDF backend (see DOCX_BACKEND and DOCX_CONVERTERS). convert()
+    may be called from `workers` threads at once; close() ends whatever the
+    backend started. Backends whose PDF does not stand for the document set
+    keeps_original, so convert_word_to_pdf leaves the .docx in place.
+    """
+
+    name = ""
+    workers = 1
+    keeps_original = False
+
+    def convert(self, word_path: Path, pdf_path: Path):
+        """Write `pdf_path` from `word_path`, raising on failure."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Docx2PdfConverter(DocxConverter):
+    """Microsoft Word through docx2pdf (macOS and Windows), one file at a time."""
+
+    name = "docx2pdf"
+
+    def __init__(self, workers: int = 1):
+        if docx2pdf_convert is None:
+            raise RuntimeError("docx2pdf is not installed (pip install docx2pdf)")
+        if sys.platform not in ("darwin", "win32"):
+            raise RuntimeError("docx2pdf needs Microsoft Word on macOS or Windows; use the libreoffice backend")
+        if workers > 1:
+            print(f"ℹ️  docx2pdf drives a single Word: converting DOCX files one at a time, not {workers} side by side")
+
+    def convert(self, word_path: Path, pdf_path: Path):
+        docx2pdf_convert(str(word_path), str(pdf_path))
+
+
+# Where LibreOffice installs soffice when it is not on PATH
+SOFFICE_LOCATIONS = (
+    "/Applications/LibreOffice.app/Contents/MacOS/soffice",
+    r"C:\Program Files\LibreOffice\program\soffice.exe",
+)
 
+
+def find_soffice():
+    """SOFFICE_PATH, or the soffice found on PATH or in SOFFICE_LOCATIONS, or None."""
+    if SOFFICE_PATH:
+        return SOFFICE_PATH
+    for name in ("soffice", "libreoffice"):
+        found = shutil.which(name)
+        if found:
+            return found
+    return next((path for path in SOFFICE_LOCATIONS if Path(path).exists()), None)
+
+
+class LibreOfficeConverter(DocxConverter):
+    """
+    Headless LibreOffice on `workers` workers, each with a profile of its own.
+
+    With UNO (LibreOffice's Python bridge) a worker's soffice is started on
+    first use and kept until close(), so startup is paid once per worker
+    instead of once per document. Without it there is no warm process: each
+    document is a separate `soffice --convert-to` run.
+    """
+
+    name = "libreoffice"
+
+    def __init__(self, workers: int = 1):
+        soffice = find_soffice()
+        if soffice is None:
+            raise RuntimeError("LibreOffice (soffice) not found; install it or set SOFFICE_PATH")
+        if uno is None:
+            print("ℹ️  LibreOffice's Python bridge (uno) is not importable: "
+                  "starting soffice once per DOCX file instead of keeping it running")
+        self.workers = max(1, workers)
+        self._workers = [_SofficeWorker(soffice) for _ in range(self.workers)]
+        self._idle = queue.Queue()
+        for worker in self._workers:
+            self._idle.put(worker)
+
+    def convert(self, word_path: Path, pdf_path: Path):
+        worker = self._idle.get()
         try:
-            convert_image_to_pdf(path, pdf_path)
-            conversions.append((str(path), str(pdf_path)))
-            if delete_original:
-                path.unlink(missing_ok=True)
+            worker.convert(word_path, pdf_path)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
+
+
+class _SofficeWorker:
+    """One soffice process of a LibreOfficeConverter and its profile directory."""
+
+    def __init__(self, soffice: str):
+        self.soffice = soffice
+        self.profile = Path(tempfile.mkdtemp(prefix="oscpack-soffice-"))
+        self.pipe = f"oscpack-{uuid.uuid4().hex}"
+        self.process = None
+        self.desktop = None
+
+    def _command(self, *args):
+        return [
+            self.soffice, f"-env:UserInstallation={self.profile.as_uri()}",
+            "--headless", "--invisible", "--nologo", "--norestore", "--nolockcheck", *args,
+        ]
+
+    def start(self):
+        self.process = subprocess.Popen(
+            self._command(f"--accept=pipe,name={self.pipe};urp;"),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        local = uno.getComponentContext()
+        resolver = local.ServiceManager.createInstanceWithContext("com.sun.star.bridge.UnoUrlResolver", local)
+        deadline = time.monotonic() + SOFFICE_TIMEOUT
+        while True:
+            try:
+                context = resolver.resolve(f"uno:pipe,name={self.pipe};urp;StarOffice.ComponentContext")
+                break
+            except NoConnectException:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.stop()
+                    raise RuntimeError("LibreOffice did not start")
+                time.sleep(0.2)
+        self.desktop = context.ServiceManager.createInstanceWithContext("com.sun.star.frame.Desktop", context)
+
+    def convert(self, word_path: Path, pdf_path: Path):
+        if uno is None:
+            self._convert_with_command(word_path, pdf_path)
+            return
+        if self.desktop is None:
+            self.start()
+        timed_out = threading.Event()
+
+        def kill():
+            timed_out.set()
+            self.process.kill()
+
+        watchdog = threading.Timer(SOFFICE_TIMEOUT, kill)
+        watchdog.start()
+        try:
+            doc = self.desktop.loadComponentFromURL(
+                word_path.resolve().as_uri(), "_blank", 0, _uno_properties(Hidden=True, ReadOnly=True)
+            )
+            if doc is None:
+                raise RuntimeError("LibreOffice could not open the document")
+            try:
+                doc.storeToURL(pdf_path.resolve().as_uri(), _uno_properties(FilterName="writer_pdf_Export"))
+            finally:
+                doc.close(True)
         except Exception as e:
-            msg = f"{path}: {e}"
-            print(f"⚠️  Image→PDF conversion failed: {msg}")
-            errors.append(msg)
+            # A crashed or killed soffice is started again for the next document
+            if self.process.poll() is not None:
+                self.stop()
+            if timed_out.is_set():
+                raise RuntimeError(f"LibreOffice took more than {SOFFICE_TIMEOUT} s") from e
+            raise
+        finally:
+            watchdog.cancel()
+
+    def _convert_with_command(self, word_path: Path, pdf_path: Path):
+        """Without UNO: one `soffice --convert-to` run on this worker's profile, set up by the first run."""
+        out_dir = self.profile / "out"
+        subprocess.run(
+            self._command("--convert-to", "pdf", "--outdir", str(out_dir), str(word_path)),
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, timeout=SOFFICE_TIMEOUT, check=True,
+        )
+        written = out_dir / f"{word_path.stem}.pdf"
+        if not written.exists():
+            raise RuntimeError("LibreOffice did not write a PDF")
+        shutil.move(str(written), str(pdf_path))
+
+    def stop(self):
+        if self.desktop is not None:
+            with contextlib.suppress(Exception):
+                self.desktop.terminate()
+            self.desktop = None
+        if self.process is not None:
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+            self.process = None
 
-    return conversions, errors
+    def close(self):
+        self.stop()
+        shutil.rmtree(self.profile, ignore_errors=True)
 
 
-# ---------- DOCX → PDF (delete original) ----------
+def _uno_properties(**values):
+    """UNO PropertyValue tuple for the keyword arguments."""
+    properties = []
+    for name, value in values.items():
+        prop = uno.createUnoStruct("com.sun.star.beans.PropertyValue")
+        prop.Name, prop.Value = name, value
+        properties.append(prop)
+    return tuple(properties)
+
+
+class FakeDocxConverter(DocxConverter):
+    """Writes a one-page placeholder PDF naming the document, for tests; the .docx is kept."""
+
+    name = "fake"
+    keeps_original = True
+
+    def __init__(self, workers: int = 1):
+        self.workers = max(1, workers)
+
+    def convert(self, word_path: Path, pdf_path: Path):
+        write_text_pdf(pdf_path, word_path.name, "Placeholder written by the fake DOCX converter.")
+
+
+# DOCX_BACKEND -> DocxConverter class ("auto" is resolved by docx_converter;
+# "fake" is registered for tests but left out of DOCX_BACKENDS)
+DOCX_CONVERTERS = {
+    "docx2pdf": Docx2PdfConverter,
+    "libreoffice": LibreOfficeConverter,
+    "fake": FakeDocxConverter,
+}
 
-def convert_word_to_pdf(word_path: Path):
+
+def docx_converter(backend: str = None, workers: int = None) -> DocxConverter:
+    """
+    Start the DOCX converter for `backend` (default DOCX_BACKEND) with
+    `workers` workers (default DOCX_WORKERS). "auto" means docx2pdf where
+    it can drive Word, LibreOffice anywhere else. Raises RuntimeError when
+    the backend cannot run on this machine.
+    """
+    backend = backend or DOCX_BACKEND
+    if backend == "auto":
+        word = docx2pdf_convert is not None and sys.platform in ("darwin", "win32")
+        backend = "docx2pdf" if word else "libreoffice"
+    if backend not in DOCX_CONVERTERS:
+        raise ValueError(f"Unknown DOCX backend: {backend} (expected one of {', '.join(DOCX_BACKENDS)})")
+    return DOCX_CONVERTERS[backend](workers or DOCX_WORKERS)
+
+
+def convert_word_to_pdf(word_path: Path, converter: DocxConverter = None):
     """
-    Convert .docx to .pdf via docx2pdf.
+    Convert .docx to .pdf next to it with `converter` (default: a
+    docx_converter started for this file alone).
     - In DRY_RUN: log only, return None.
-    - On success: delete original .docx, return pdf_path.
+    - On success: delete original .docx (unless the converter keeps
+      originals, see DocxConverter), return pdf_path.
     """
     pdf_path = word_path.with_suffix(".pdf")
 
@@ -238,45 +1577,56 @@ def convert_word_to_pdf(word_path: Path):
         return None
 
     try:
-        docx2pdf_convert(str(word_path), str(pdf_path))
+        with contextlib.nullcontext(converter) if converter is not None else docx_converter() as active:
+            active.convert(word_path, pdf_path)
         if pdf_path.exists():
-            try:
-                word_path.unlink()
-            except FileNotFoundError:
-                pass
+            if not active.keeps_original:
+                try:
+                    word_path.unlink()
+                except FileNotFoundError:
+                    pass
             return pdf_path
-        print(f"⚠️  docx2pdf did not create expected file: {pdf_path}")
+        print(f"⚠️  DOCX converter did not create expected file: {pdf_path}")
     except Exception as e:
         print(f"⚠️  Failed DOCX→PDF conversion for {word_path}: {e}")
     return None
 
 
-def convert_docx_in_tree(root: Path):
+def convert_docx_in_tree(root: Path, manifest=None, journal=None):
     """Convert all .docx in tree to PDFs, deleting originals on real run."""
-    conversions = []
-    errors = []
-
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() not in WORD_EXTS:
-            continue
+    return convert_tree(root, ("docx",), True, manifest, journal)["docx"]
 
-        pdf_path = path.with_suffix(".pdf")
 
-        if DRY_RUN:
-            print(f"(DRY RUN) Would convert DOCX to PDF (and delete DOCX): {path} -> {pdf_path}")
-            conversions.append((str(path), str(pdf_path)))
-            continue
+def _convert_docx_job(word_path: Path, pdf_path: Path, converter: DocxConverter = None):
+    if DRY_RUN:
+        print(f"(DRY RUN) Would convert DOCX to PDF (and delete DOCX): {word_path} -> {pdf_path}")
+        return pdf_path
+    return convert_word_to_pdf(word_path, converter)
 
-        result = convert_word_to_pdf(path)
-        if result:
-            conversions.append((str(path), str(result)))
-        else:
-            msg = f"{path}: failed to convert DOCX to PDF"
-            errors.append(msg)
 
-    return conversions, errors
+def _convert_docx_files(jobs, on_done):
+    """
+    Convert the DOCX `jobs` with one docx_converter, on as many threads as
+    it has workers; on_done(i, outcome) as each one finishes. If no
+    converter can start, every job fails with the reason.
+    """
+    try:
+        converter = docx_converter()
+    except Exception as e:
+        print(f"⚠️  DOCX conversion unavailable: {e}")
+        for i, (_, src, _) in enumerate(jobs):
+            on_done(i, (None, f"{src}: {e}", ""))
+        return
+    with converter:
+        workers = min(converter.workers, len(jobs))
+        print(f"Converting {len(jobs)} DOCX file(s) with {converter.name} on {workers} worker(s)")
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            pending = {
+                pool.submit(_outcome, _convert_docx_job, src, dst, converter): i
+                for i, (_, src, dst) in enumerate(jobs)
+            }
+            for future in as_completed(pending):
+                on_done(pending[future], future.result())
 
 
 # ---------- HTML → PDF ----------
@@ -344,35 +1694,8 @@ def convert_html_to_pdf(html_path: Path, pdf_path: Path):
         return None
 
 
-def convert_htmls_in_tree(root: Path, delete_original: bool):
-    conversions = []
-    errors = []
-
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
-
-        if path.suffix.lower() not in HTML_EXTS:
-            continue
-
-        pdf_path = path.with_suffix(".pdf")
-        counter = 1
-        while pdf_path.exists():
-            pdf_path = path.with_name(f"{path.stem}_html_{counter}.pdf")
-            counter += 1
-
-        try:
-            result = convert_html_to_pdf(path, pdf_path)
-            if result:
-                conversions.append((str(path), str(pdf_path)))
-                if not DRY_RUN and delete_original:
-                    path.unlink(missing_ok=True)
-        except Exception as e:
-            msg = f"{path}: {e}"
-            print(f"⚠️  HTML→PDF conversion failed: {msg}")
-            errors.append(msg)
-
-    return conversions, errors
+def convert_htmls_in_tree(root: Path, delete_original: bool, manifest=None, journal=None):
+    return convert_tree(root, ("html",), delete_original, manifest, journal)["html"]
 
 
 # ---------- TXT → PDF ----------
@@ -393,40 +1716,167 @@ def convert_txt_to_pdf(txt_path: Path, pdf_path: Path):
     return pdf_path
 
 
-def convert_txts_in_tree(root: Path, delete_original: bool):
-    conversions = []
-    errors = []
+def convert_txts_in_tree(root: Path, delete_original: bool, manifest=None, journal=None):
+    return convert_tree(root, ("txt",), delete_original, manifest, journal)["txt"]
 
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
 
-        if path.suffix.lower() not in TEXT_EXTS:
-            continue
+# ---------- Conversion stage ----------
+
+# kind -> (extensions, tag before the collision counter, job, label).
+# Kinds are named in this order, so a PDF name taken by an image conversion
+# is not reused for an HTML or TXT file with the same stem. DOCX output goes
+# next to the original (no counter), see convert_word_to_pdf.
+CONVERSION_KINDS = {
+    "image": (IMAGE_EXTS, "_", _convert_image_job, "Image→PDF"),
+    "html": (HTML_EXTS, "_html_", convert_html_to_pdf, "HTML→PDF"),
+    "txt": (TEXT_EXTS, "_txt_", convert_txt_to_pdf, "TXT→PDF"),
+    "docx": (WORD_EXTS, None, _convert_docx_job, "DOCX→PDF"),
+}
+
 
-        pdf_path = path.with_suffix(".pdf")
-        counter = 1
-        while pdf_path.exists():
-            pdf_path = path.with_name(f"{path.stem}_txt_{counter}.pdf")
-            counter += 1
+def plan_conversions(kinds, delete_original: bool, manifest, journal=None):
+    """
+    Find the files to convert for each of `kinds` in one pass over the
+    manifest and pick each output name. Returns [(kind, src, dst), ...].
+    Conversions the journal shows as finished are completed instead.
+    """
+    found = {kind: [] for kind in kinds}
+    by_ext = {ext: kind for kind in kinds for ext in CONVERSION_KINDS[kind][0]}
+    for path in manifest.files():
+        kind = by_ext.get(path.suffix.lower())
+        if kind is not None:
+            found[kind].append(path)
+
+    jobs = []
+    taken = set()
+    for kind in CONVERSION_KINDS:
+        tag = CONVERSION_KINDS[kind][1]
+        for path in found.get(kind, ()):
+            if tag is None:
+                jobs.append((kind, path, path.with_suffix(".pdf")))
+                continue
+            if journal is not None and journal.finish_conversion(kind, path, delete_original, manifest):
+                continue
 
+            pdf_path = path.with_suffix(".pdf")
+            counter = 1
+            while manifest.exists(pdf_path) or pdf_path in taken:
+                pdf_path = path.with_name(f"{path.stem}{tag}{counter}.pdf")
+                counter += 1
+            taken.add(pdf_path)
+            jobs.append((kind, path, pdf_path))
+    return jobs
+
+
+def _convert_in_processes(jobs, on_done):
+    """
+    Run `jobs` on CONVERT_WORKERS processes; on_done(i, outcome) as each one
+    finishes. The processes share one DecodeBudget for their images.
+    """
+    workers = min(CONVERT_WORKERS, len(jobs))
+    print(f"Converting {len(jobs)} file(s) on {workers} processes")
+    config = _worker_config()
+    if IMAGE_MEMORY_BUDGET and any(kind == "image" for kind, _, _ in jobs):
+        config["_decode_budget"] = DecodeBudget(IMAGE_MEMORY_BUDGET)
+    with ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_stamp_worker, initargs=(config,)
+    ) as pool:
+        pending = {
+            pool.submit(_outcome, CONVERSION_KINDS[kind][2], src, dst, capture=True): i
+            for i, (kind, src, dst) in enumerate(jobs)
+        }
         try:
-            result = convert_txt_to_pdf(path, pdf_path)
-            if result:
-                conversions.append((str(path), str(pdf_path)))
-                if not DRY_RUN and delete_original:
-                    path.unlink(missing_ok=True)
-        except Exception as e:
-            msg = f"{path}: {e}"
-            print(f"⚠️  TXT→PDF conversion failed: {msg}")
-            errors.append(msg)
+            for future in as_completed(pending):
+                on_done(pending[future], future.result())
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+
+
+def convert_tree(root: Path, kinds, delete_original: bool, manifest=None, journal=None):
+    """
+    Convert every image, HTML, TXT and/or DOCX file under `root` (as picked
+    by `kinds`, see CONVERSION_KINDS) to PDF.
+
+    All files are found in one pass and named up front (see
+    plan_conversions); with CONVERT_WORKERS > 1 the image, HTML and TXT
+    conversions then run on a process pool while this process records each
+    finished one, updates the manifest and deletes the original. DOCX files
+    then go to one docx_converter, DOCX_WORKERS at a time (see
+    _convert_docx_files). Each conversion's messages are printed as soon as
+    it finishes; the returned lists keep walk order. If a PDF was written
+    but the original cannot be removed (or the conversion recorded), the
+    file is listed as converted and the failure as an error, and the run
+    goes on.
+
+    Returns {kind: (conversions, errors)} with the same lists the per-kind
+    convert_*_in_tree functions return.
+    """
+    if manifest is None:
+        manifest = TreeManifest.scan(root)
+
+    results = {}
+    for kind in kinds:
+        conversions = journal.conversions(kind) if journal is not None else []
+        results[kind] = (conversions, [])
+
+    jobs = plan_conversions(kinds, delete_original, manifest, journal)
+    if journal is not None:
+        journal.start_conversions([job for job in jobs if job[0] != "docx"])
+
+    outcomes = [None] * len(jobs)
+
+    def finished(i, outcome):
+        kind, src, dst = jobs[i]
+        result, error, log = outcome
+        if log:
+            print(log, end="")
+        if not error and result and not DRY_RUN:
+            try:
+                record(kind, src, dst, result)
+            except Exception as e:
+                error = f"{src}: {e}"
+        if error:
+            print(f"⚠️  {CONVERSION_KINDS[kind][3]} conversion failed: {error}")
+        outcomes[i] = (result, error)
+
+    def record(kind, src, dst, result):
+        if kind == "docx":
+            # The DOCX converter's output replaces the original (see convert_word_to_pdf)
+            manifest.replace(src, result)
+        else:
+            manifest.add(dst)
+        if journal is not None:
+            journal.record_conversion(kind, src, result)
+        if kind != "docx" and delete_original:
+            src.unlink(missing_ok=True)
+            manifest.remove(src)
+
+    pooled = [i for i, job in enumerate(jobs) if job[0] != "docx"]
+    if CONVERT_WORKERS > 1 and len(pooled) > 1 and not DRY_RUN:
+        _convert_in_processes([jobs[i] for i in pooled], lambda k, outcome: finished(pooled[k], outcome))
+    docx = [i for i, job in enumerate(jobs) if job[0] == "docx"]
+    if docx and not DRY_RUN:
+        _convert_docx_files([jobs[i] for i in docx], lambda k, outcome: finished(docx[k], outcome))
+    for i, (kind, src, dst) in enumerate(jobs):
+        if outcomes[i] is None:
+            finished(i, _outcome(CONVERSION_KINDS[kind][2], src, dst))
+
+    for (kind, src, dst), (result, error) in zip(jobs, outcomes):
+        conversions, errors = results[kind]
+        if error:
+            errors.append(error)
+        if result:
+            conversions.append((str(src), str(result)))
+        elif not error and kind == "docx":
+            errors.append(f"{src}: failed to convert DOCX to PDF")
 
-    return conversions, errors
+    return results
 
 
 # ---------- Planning ----------
 
-def plan_items(root: Path):
+def plan_items(root: Path, manifest=None, index=None, planned_images=None, verify: bool = False):
     """
     Build logical items in final processing order.
 
@@ -434,28 +1884,53 @@ def plan_items(root: Path):
       - kind: 'pdf', 'word_no_pdf', 'excel', 'video'
       - pages: int (# Bates slots)
       - paths: dict of paths
+
+    PDF page counts are gathered after the walk on a pool of
+    PAGE_COUNT_WORKERS threads; the items keep their walk order. With
+    verify=True (a real run, which renames and stamps by these counts) they
+    come from the page tree rather than each file's stored /Count.
+
+    `planned_images` ({image path: PDF path}) lists the conversions a dry
+    run only planned; each such image stands in for its PDF, with one page
+    per frame (see convert_image_to_pdf).
+
+    DOCX files are converted first, all by one docx_converter (see
+    _convert_docx_files); those that fail become 'word_no_pdf' items.
     """
-    items = []
+    if manifest is None:
+        manifest = TreeManifest.scan(root)
 
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
-        if BACKUP_FOLDER_NAME in path.parts:
-            continue
+    converted_words = {}
+    words = [path for path in manifest.files() if path.suffix.lower() in WORD_EXTS]
+    if words and not DRY_RUN:
+        def converted(k, outcome):
+            converted_words[words[k]] = outcome[0]
 
+        _convert_docx_files([("docx", path, path.with_suffix(".pdf")) for path in words], converted)
+
+    items = []
+
+    for path in manifest.files():
         suffix = path.suffix.lower()
 
         if suffix == PDF_EXT:
-            pages = get_pdf_page_count(path)
-            if pages > 0:
-                items.append({"kind": "pdf", "pages": pages, "paths": {"pdf": path}})
+            if is_combined_pdf(root, path):
+                print(f"ℹ️  Skipping combined PDF from an earlier run: {path.name}")
+                continue
+            # Unreadable PDFs (0 pages) are dropped once counts are in
+            items.append({"kind": "pdf", "pages": None, "paths": {"pdf": path}})
 
         elif suffix in WORD_EXTS:
             # For normal pipeline, we still convert here
-            pdf_path = convert_word_to_pdf(path)
+            pdf_path = converted_words[path] if path in converted_words else convert_word_to_pdf(path)
             if pdf_path:
-                pages = get_pdf_page_count(pdf_path) or 1
-                items.append({"kind": "pdf", "pages": pages, "paths": {"pdf": pdf_path}})
+                manifest.replace(path, pdf_path)
+                items.append({
+                    "kind": "pdf",
+                    "pages": None,
+                    "min_pages": 1,
+                    "paths": {"pdf": pdf_path},
+                })
             else:
                 items.append({
                     "kind": "word_no_pdf",
@@ -463,6 +1938,13 @@ def plan_items(root: Path):
                     "paths": {"word": path},
                 })
 
+        elif suffix in IMAGE_EXTS and planned_images and path in planned_images:
+            try:
+                pages = image_page_count(path)
+            except Exception:
+                continue    # the real conversion fails too
+            items.append({"kind": "pdf", "pages": pages, "paths": {"pdf": planned_images[path]}})
+
         elif suffix in EXCEL_EXTS:
             items.append({
                 "kind": "excel",
@@ -477,7 +1959,22 @@ def plan_items(root: Path):
                 "paths": {"video": path},
             })
 
-    return items
+    # Count all PDF pages concurrently (I/O-bound), then fill in the items
+    to_count = [it for it in items if it["pages"] is None]
+
+    def count(item):
+        return count_pdf_pages(item["paths"]["pdf"], manifest, index, verify)
+
+    if PAGE_COUNT_WORKERS > 1 and len(to_count) > 1:
+        with ThreadPoolExecutor(max_workers=PAGE_COUNT_WORKERS) as pool:
+            counts = list(pool.map(count, to_count))
+    else:
+        counts = [count(it) for it in to_count]
+
+    for item, pages in zip(to_count, counts):
+        item["pages"] = max(pages, item.pop("min_pages", 0))
+
+    return [it for it in items if it["pages"] > 0]
 
 
 def reorder_items_for_videos(items):
@@ -489,14 +1986,26 @@ def reorder_items_for_videos(items):
     return non_video + videos
 
 
+def strip_bates_label(name: str) -> str:
+    """`name` without a leading PREFIX label ('CF 0001-0008 - '), which may leave it empty."""
+    m = BATES_NAME_PATTERN.match(name)
+    if m and m.group("prefix") == PREFIX:
+        return m.group("name") or ""
+    return name
+
+
 def make_bates_filename(base: str, path: Path) -> str:
     """
     Build output filename according to KEEP_ORIGINAL_NAME:
       True:  '<base> - <original_stem><ext>'
       False: '<base><ext>'
+
+    A name that already starts with a PREFIX label (from an earlier run)
+    has that label replaced rather than kept as part of the original name.
     """
-    if KEEP_ORIGINAL_NAME:
-        return f"{base} - {path.stem}{path.suffix}"
+    stem = strip_bates_label(path.stem)
+    if KEEP_ORIGINAL_NAME and stem:
+        return f"{base} - {stem}{path.suffix}"
     else:
         return f"{base}{path.suffix}"
 
@@ -554,9 +2063,32 @@ def build_renames(items):
     return operations, excel_placeholders
 
 
+def find_renumbered_stamped_pdfs(operations):
+    """
+    PDFs stamped by an earlier run that this plan would give a different
+    range, as [(path, stamped label, planned label)]. Only files already
+    named with a PREFIX label are opened.
+    """
+    conflicts = []
+    for src, dst in operations:
+        if src.suffix.lower() != PDF_EXT:
+            continue
+        current = parse_bates_name(src)
+        if current is None or current[0] != PREFIX:
+            continue
+        stamped = read_bates_marker(src)
+        if stamped is None:
+            continue
+        _, start, pages = parse_bates_name(dst)
+        planned = bates_label(PREFIX, start, pages)
+        if stamped != planned:
+            conflicts.append((src, stamped, planned))
+    return conflicts
+
+
 # ---------- Renames ----------
 
-def apply_renames(operations):
+def apply_renames(operations, manifest=None):
     """Safely apply renames using temp names. Honors DRY_RUN."""
     print("\n--- RENAME PLAN ---")
     for src, dst in operations:
@@ -581,248 +2113,1502 @@ def apply_renames(operations):
     for (src, dst), tmp in temp_map.items():
         dst.parent.mkdir(parents=True, exist_ok=True)
         os.rename(tmp, dst)
+        if manifest is not None:
+            manifest.rename(src, dst)
+
+    print("✅ Renaming complete.")
+
+
+def recover_interrupted_files(root: Path, manifest):
+    """
+    Clean up after an interrupted run before resuming it: files parked
+    under a temporary name mid-rename get their name back, and partly
+    written stamping/Letter outputs are deleted.
+    """
+    for path in list(manifest.files()):
+        m = RENAME_TEMP_PATTERN.match(path.name)
+        if m:
+            original = path.with_name(m.group("name"))
+            if not original.exists():
+                os.rename(path, original)
+                manifest.rename(path, original)
+                print(f"↩️  Restored interrupted rename: {original}")
+            continue
+
+        partial_letter = path.name.endswith(".tmp.pdf") and manifest.exists(path.with_name(path.name[:-8] + ".pdf"))
+        if BATES_TEMP_PATTERN.match(path.name) or partial_letter:
+            path.unlink(missing_ok=True)
+            manifest.remove(path)
+            print(f"🧹 Removed partial output: {path}")
+
+
+# ---------- Low-memory PDF writing ----------
+
+class BatchPdfWriter(PdfWriter):
+    """
+    The PdfWriter a batch of pages is built in. It remembers which source
+    object each object cloned into it came from (add_page, clone_into), so
+    StreamingPdfWriter.add_pages can write an object shared by pages of
+    several batches (a font, a logo) once.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.origins = {}   # id(reader) -> {number here: number in the reader}
+
+    def add_page(self, page, excluded_keys=()):
+        added = super().add_page(page, excluded_keys)
+        self.record_clone(page, added)
+        return added
+
+    def record_clone(self, source, copy):
+        """
+        Note the source number of `copy` (a clone of `source` in this writer)
+        and of everything it references, by walking both side by side.
+        """
+        seen = set()
+        pairs = [(source, copy)]
+        while pairs:
+            src, dst = pairs.pop()
+            src_ref = src if isinstance(src, IndirectObject) else getattr(src, "indirect_reference", None)
+            dst_ref = dst if isinstance(dst, IndirectObject) else getattr(dst, "indirect_reference", None)
+            src, dst = src.get_object(), dst.get_object()
+            if type(src) is not type(dst):
+                continue
+            if src_ref is not None and dst_ref is not None:
+                if src_ref.pdf is self or dst_ref.pdf is not self or (id(src_ref.pdf), src_ref.idnum) in seen:
+                    continue
+                seen.add((id(src_ref.pdf), src_ref.idnum))
+                numbers = self.origins.setdefault(id(src_ref.pdf), {})
+                if numbers.get(dst_ref.idnum) == src_ref.idnum:
+                    continue    # walked for an earlier page of this batch
+                numbers[dst_ref.idnum] = src_ref.idnum
+            if isinstance(src, DictionaryObject):
+                pairs.extend((src.raw_get(k), dst.raw_get(k)) for k in dst if k in src and k != "/Parent")
+            elif isinstance(src, ArrayObject) and len(src) == len(dst):
+                pairs.extend(zip(src, dst))
+
+
+def clone_into(writer: PdfWriter, obj):
+    """obj.clone(writer); a BatchPdfWriter also records where the copy came from."""
+    copy = obj.clone(writer)
+    if isinstance(writer, BatchPdfWriter):
+        writer.record_clone(obj, copy)
+    return copy
+
+
+def merge_source_page(writer: PdfWriter, new_page, page, transform):
+    """
+    new_page.merge_transformed_page(page, transform). The merge clones the
+    page's resources into `writer` itself; cloning them through clone_into
+    first makes it reuse those copies, whose sources are then recorded.
+    """
+    if isinstance(writer, BatchPdfWriter) and "/Resources" in page:
+        clone_into(writer, page.raw_get("/Resources"))
+    new_page.merge_transformed_page(page, transform)
+
+
+class StreamingPdfWriter:
+    """
+    Write a PDF to `stream` a batch of pages at a time.
+
+    Pages are built as usual in a small PdfWriter (one per batch), then
+    add_pages() copies them and everything they reference straight to the
+    output, after which the batch writer can be dropped. Objects cloned from
+    the same source reader (shared fonts, logos) are written once across
+    batches. Only object offsets and page numbers are kept until close().
+
+    With `compact`, objects under a page's /Resources (fonts, images, ICC
+    profiles, forms) are also matched by content, so one identical to a
+    resource already written, from any source, reuses it; the other
+    non-stream objects are packed into compressed object streams and the
+    xref table is written as a compressed xref stream.
+    """
+
+    CATALOG = 1
+    PAGES = 2
+    OBJECTS_PER_STREAM = 100
+    HEADER = b"%PDF-1.7\n%\xe2\xe3\xcf\xd3\n"
+
+    def __init__(self, stream, compact: bool = None):
+        self.stream = stream
+        self.compact = COMPACT_OUTPUT if compact is None else compact
+        self.offsets = [None, None, None]    # index = object number -> offset, or (object stream, index)
+        self.page_numbers = []
+        self.source_numbers = {}             # id(reader) -> (reader, {source number: output number})
+        self.shared_numbers = {}             # resource content digest -> output number
+        self.shared_bytes = 0                # bytes of repeated resources not written again
+        self._packed = []                    # (number, bytes) waiting for the next object stream
+        stream.write(self.HEADER)
+
+    def _allocate(self) -> int:
+        self.offsets.append(None)
+        return len(self.offsets) - 1
+
+    def add_pages(self, writer: PdfWriter, source=None):
+        """Write all pages of `writer` (whose objects were cloned from `source`)."""
+        # A BatchPdfWriter knows which source object each clone came from; this
+        # is what lets a font or image shared by every page be written only
+        # once. From any other writer each batch simply writes its own copy.
+        origins = writer.origins if isinstance(writer, BatchPdfWriter) else {}
+        origin = origins.get(id(source), {}) if source is not None else {}
+        source_numbers = self.source_numbers.setdefault(id(source), (source, {}))[1]
+
+        batch_pages = {}
+        for page in writer.pages:
+            batch_pages[page.indirect_reference.idnum] = self._allocate()
+        batch_numbers = {}
+        queue = deque()
+        in_progress = {}    # resource being serialized -> number reserved if it refers to itself
+
+        def number_for(ref, shared):
+            if ref.idnum in batch_pages:
+                return batch_pages[ref.idnum]
+            key = origin.get(ref.idnum)
+            known = source_numbers if key is not None else batch_numbers
+            key = key if key is not None else ref.idnum
+            if key in known:
+                return known[key]
+            obj = ref.get_object()
+            if isinstance(obj, DictionaryObject) and obj.get("/Type") == "/Page":
+                return None     # a page outside this batch; do not pull in its tree
+            if not shared:
+                known[key] = self._allocate()
+                queue.append((known[key], obj))
+                return known[key]
+
+            # Resources are written depth-first, so their content (with the
+            # numbers of what they reference) is known before they get a number
+            token = (id(known), key)
+            if token in in_progress:
+                if in_progress[token] is None:
+                    in_progress[token] = self._allocate()
+                return in_progress[token]
+            in_progress[token] = None
+            body, data = serialize(obj, True)
+            reserved = in_progress.pop(token)
+            if reserved is not None:
+                self._emit(reserved, body, data)
+                known[key] = reserved
+            else:
+                known[key] = self._emit_shared(body, data)
+            return known[key]
+
+        def remap(obj, shared):
+            if isinstance(obj, IndirectObject):
+                number = number_for(obj, shared)
+                return NullObject() if number is None else IndirectObject(number, 0, None)
+            if isinstance(obj, StreamObject):
+                if shared:
+                    return IndirectObject(self._emit_shared(*serialize(obj, True)), 0, None)
+                number = self._allocate()
+                queue.append((number, obj))
+                return IndirectObject(number, 0, None)
+            if isinstance(obj, DictionaryObject):
+                return DictionaryObject({
+                    NameObject(k): remap(v, shared or (self.compact and k == "/Resources")) for k, v in obj.items()
+                })
+            if isinstance(obj, ArrayObject):
+                return ArrayObject(remap(v, shared) for v in obj)
+            return obj
+
+        def serialize(obj, shared):
+            if not isinstance(obj, StreamObject):
+                return _pdf_bytes(remap(obj, shared)), None
+            # encoded streams are copied as they are, never decompressed
+            data = obj._data if isinstance(obj, EncodedStreamObject) else obj.get_data()
+            header = DictionaryObject({NameObject(k): remap(v, shared) for k, v in obj.items() if k != "/Length"})
+            header[NameObject("/Length")] = NumberObject(len(data))
+            return _pdf_bytes(header), data
+
+        for page in writer.pages:
+            number = batch_pages[page.indirect_reference.idnum]
+            page_dict = DictionaryObject({
+                NameObject(k): remap(v, self.compact and k == "/Resources") for k, v in page.items() if k != "/Parent"
+            })
+            page_dict[NameObject("/Parent")] = IndirectObject(self.PAGES, 0, None)
+            self._emit(number, _pdf_bytes(page_dict))
+            self.page_numbers.append(number)
+
+        while queue:
+            number, obj = queue.popleft()
+            self._emit(number, *serialize(obj, False))
+
+    def forget(self, source):
+        """
+        Drop what is remembered about objects cloned from `source`, once no
+        later batch will clone from it, so the reader can be freed.
+        """
+        self.source_numbers.pop(id(source), None)
+
+    def _emit_shared(self, body: bytes, data: bytes = None) -> int:
+        """Write a resource unless an identical one was written; return its number."""
+        digest = hashlib.sha256(body + (b"\nstream\n" + data if data is not None else b"")).digest()
+        number = self.shared_numbers.get(digest)
+        if number is not None:
+            self.shared_bytes += len(body) + len(data or b"")
+            return number
+        number = self._allocate()
+        self._emit(number, body, data, shared=True)
+        self.shared_numbers[digest] = number
+        return number
+
+    def _emit(self, number: int, body: bytes, stream_data: bytes = None, shared: bool = False):
+        """
+        Write object `number` (packed into an object stream if compact and
+        not a stream); `shared` marks a resource from _emit_shared.
+        """
+        if stream_data is None and self.compact:
+            self._packed.append((number, body))
+            if len(self._packed) >= self.OBJECTS_PER_STREAM:
+                self._flush_packed()
+            return
+        self.offsets[number] = self.stream.tell()
+        self.stream.write(f"{number} 0 obj\n".encode("ascii"))
+        self.stream.write(body)
+        if stream_data is not None:
+            self.stream.write(b"\nstream\n")
+            self.stream.write(stream_data)
+            self.stream.write(b"\nendstream")
+        self.stream.write(b"\nendobj\n")
+
+    def _flush_packed(self):
+        """Write the waiting objects as one compressed object stream."""
+        if not self._packed:
+            return
+        packed, self._packed = self._packed, []
+        number = self._allocate()
+        index, offset = [], 0
+        for i, (n, body) in enumerate(packed):
+            index.append(f"{n} {offset}")
+            offset += len(body) + 1
+            self.offsets[n] = (number, i)
+        first = " ".join(index).encode("ascii") + b"\n"
+        data = zlib.compress(first + b"\n".join(body for _, body in packed) + b"\n")
+        self._emit(number, _pdf_bytes(DictionaryObject({
+            NameObject("/Type"): NameObject("/ObjStm"),
+            NameObject("/N"): NumberObject(len(packed)),
+            NameObject("/First"): NumberObject(len(first)),
+            NameObject("/Filter"): NameObject("/FlateDecode"),
+            NameObject("/Length"): NumberObject(len(data)),
+        })), data)
+
+    def add_fragment(self, path: Path, page_numbers):
+        """
+        Copy the objects of a PdfFragmentWriter file at `path`, renumbered
+        into this output, and append its pages (`page_numbers`, as numbered
+        in the fragment). Nothing is parsed: references are renumbered in
+        the serialized bytes and stream data is copied as it is.
+        """
+        numbers = {self.PAGES: self.PAGES}
+
+        def number(local):
+            if local not in numbers:
+                numbers[local] = self._allocate()
+            return numbers[local]
+
+        def renumber(m):
+            return m.group(0) if m.group(1) is None else b"%d 0 R" % number(int(m.group(1)))
+
+        with open(path, "rb") as f:
+            while True:
+                record = f.read(PdfFragmentWriter.RECORD.size)
+                if not record:
+                    break
+                local, shared, body_size, data_size = PdfFragmentWriter.RECORD.unpack(record)
+                body = PDF_REFERENCE_PATTERN.sub(renumber, f.read(body_size))
+                data = f.read(data_size) if data_size >= 0 else None
+                if shared and local not in numbers:
+                    numbers[local] = self._emit_shared(body, data)
+                else:
+                    self._emit(number(local), body, data)
+        self.page_numbers.extend(numbers[n] for n in page_numbers)
+
+    def close(self, metadata=None):
+        """Write the page tree, catalog, xref and trailer (with an Info dict from `metadata`)."""
+        info = None
+        if metadata:
+            info = self._allocate()
+            self._emit(info, _pdf_bytes(DictionaryObject({
+                NameObject(k): TextStringObject(v) for k, v in metadata.items()
+            })))
+        self._emit(self.PAGES, _pdf_bytes(DictionaryObject({
+            NameObject("/Type"): NameObject("/Pages"),
+            NameObject("/Kids"): ArrayObject(IndirectObject(n, 0, None) for n in self.page_numbers),
+            NameObject("/Count"): NumberObject(len(self.page_numbers)),
+        })))
+        self._emit(self.CATALOG, _pdf_bytes(DictionaryObject({
+            NameObject("/Type"): NameObject("/Catalog"),
+            NameObject("/Pages"): IndirectObject(self.PAGES, 0, None),
+        })))
+
+        if self.compact:
+            self._flush_packed()
+            self._write_xref_stream(info)
+            return
+
+        xref_offset = self.stream.tell()
+        lines = [f"xref\n0 {len(self.offsets)}\n", "0000000000 65535 f \n"]
+        for offset in self.offsets[1:]:
+            # numbers reserved for pages outside a batch never get written
+            lines.append(f"{offset:010d} 00000 n \n" if offset is not None else "0000000000 65535 f \n")
+        info_entry = f" /Info {info} 0 R" if info is not None else ""
+        lines.append(
+            f"trailer\n<< /Size {len(self.offsets)} /Root {self.CATALOG} 0 R{info_entry} >>\n"
+            f"startxref\n{xref_offset}\n%%EOF\n"
+        )
+        self.stream.write("".join(lines).encode("ascii"))
+
+    def _write_xref_stream(self, info):
+        number = self._allocate()
+        xref_offset = self.stream.tell()
+        self.offsets[number] = xref_offset
+        width = max(4, (xref_offset.bit_length() + 7) // 8)
+        rows = []
+        for offset in self.offsets:
+            if offset is None:
+                # object 0, and numbers reserved for pages outside a batch
+                rows.append(b"\x00" + bytes(width) + b"\xff\xff")
+            elif isinstance(offset, tuple):
+                rows.append(b"\x02" + offset[0].to_bytes(width, "big") + offset[1].to_bytes(2, "big"))
+            else:
+                rows.append(b"\x01" + offset.to_bytes(width, "big") + b"\x00\x00")
+        data = zlib.compress(b"".join(rows))
+        header = DictionaryObject({
+            NameObject("/Type"): NameObject("/XRef"),
+            NameObject("/Size"): NumberObject(len(self.offsets)),
+            NameObject("/W"): ArrayObject([NumberObject(1), NumberObject(width), NumberObject(2)]),
+            NameObject("/Root"): IndirectObject(self.CATALOG, 0, None),
+            NameObject("/Filter"): NameObject("/FlateDecode"),
+            NameObject("/Length"): NumberObject(len(data)),
+        })
+        if info is not None:
+            header[NameObject("/Info")] = IndirectObject(info, 0, None)
+        self._emit(number, _pdf_bytes(header), data)
+        self.stream.write(f"startxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+
+
+class PdfFragmentWriter(StreamingPdfWriter):
+    """
+    StreamingPdfWriter for part of a document (a shard, see stamp_pdf_shard):
+    instead of a PDF it writes each object as a RECORD header (number,
+    shared, body size, stream size or -1) followed by its bytes, and is
+    never closed. StreamingPdfWriter.add_fragment() copies the objects into
+    the real output without parsing them again.
+
+    Resources are always marked shared, so those repeated across fragments
+    are written once whether or not the output is compact.
+    """
+
+    HEADER = b""
+    RECORD = struct.Struct("<IBIq")
+
+    def __init__(self, stream):
+        super().__init__(stream, compact=True)
+
+    def _emit(self, number: int, body: bytes, stream_data: bytes = None, shared: bool = False):
+        size = -1 if stream_data is None else len(stream_data)
+        self.stream.write(self.RECORD.pack(number, shared, len(body), size))
+        self.stream.write(body)
+        if stream_data is not None:
+            self.stream.write(stream_data)
+
+
+def _pdf_bytes(obj) -> bytes:
+    buf = io.BytesIO()
+    obj.write_to_stream(buf)
+    return buf.getvalue()
+
+
+def open_pdf_reader(pdf_path: Path, stack: contextlib.ExitStack) -> PdfReader:
+    """
+    PdfReader for `pdf_path`. In LOW_MEMORY mode it reads objects from the
+    open file as they are needed instead of loading the whole file first.
+    """
+    if LOW_MEMORY:
+        return PdfReader(stack.enter_context(open(pdf_path, "rb")))
+    return PdfReader(str(pdf_path))
+
+
+def write_pdf_pages(out_path: Path, parts, metadata=None, also=None):
+    """
+    Build and write a PDF from `parts`, a list of (reader, fill, first, stop):
+    fill(writer, first, stop) adds pages [first, stop) from `reader` to
+    `writer` and returns a count. Returns the sum of those counts.
+    `metadata` ({"/Key": "text"}) becomes the document Info dictionary.
+
+    Normally all pages go into one PdfWriter (written through
+    StreamingPdfWriter when COMPACT_OUTPUT). In LOW_MEMORY mode each range
+    is filled LOW_MEMORY_BATCH_PAGES pages at a time, streamed out, and the
+    reader's object cache is cleared before the next batch.
+
+    `also`, a second StreamingPdfWriter (the combined PDF), gets a copy of
+    the same pages as they are written.
+    """
+    total = 0
+    with open(out_path, "wb") as f:
+        if not LOW_MEMORY:
+            writer = PdfWriter()
+            for reader, fill, first, stop in parts:
+                total += fill(writer, first, stop)
+            if also is not None:
+                also.add_pages(writer)
+            if COMPACT_OUTPUT:
+                out = StreamingPdfWriter(f)
+                out.add_pages(writer)
+                out.close(metadata)
+                return total
+            if metadata:
+                writer.add_metadata(metadata)
+            writer.write(f)
+            return total
+
+        out = StreamingPdfWriter(f)
+        for reader, fill, first, stop in parts:
+            total += stream_pdf_pages(out, reader, fill, first, stop, also)
+        out.close(metadata)
+    if also is not None:
+        for reader, _, _, _ in parts:
+            also.forget(reader)
+    return total
+
+
+def stream_pdf_pages(out: StreamingPdfWriter, reader, fill, first: int, stop: int, also=None) -> int:
+    """
+    Fill pages [first, stop) of `reader` into `out` (and `also`, if given)
+    LOW_MEMORY_BATCH_PAGES at a time (see write_pdf_pages), clearing the
+    reader's object cache after each batch. Returns the sum of fill's counts.
+    """
+    total = 0
+    for batch_first in range(first, stop, LOW_MEMORY_BATCH_PAGES):
+        batch = BatchPdfWriter()
+        total += fill(batch, batch_first, min(batch_first + LOW_MEMORY_BATCH_PAGES, stop))
+        out.add_pages(batch, source=reader)
+        if also is not None:
+            also.add_pages(batch, source=reader)
+        # pypdf object graphs are cyclic (pages <-> page tree), so the
+        # batch's stream data is only freed by a collection, and the
+        # few objects allocated per batch rarely trigger one on their own
+        del batch
+        reader.resolved_objects.clear()
+        gc.collect()
+    return total
+
+
+def copy_pdf_pages(reader):
+    """A write_pdf_pages fill that copies pages from `reader` unchanged."""
+    def fill(writer, first, stop):
+        for i in range(first, stop):
+            writer.add_page(reader.pages[i])
+        return 0
+    return fill
+
+
+# ---------- Letter Reformat ----------
+
+def choose_letter_size(orig_width: float, orig_height: float):
+    """Choose Letter portrait or landscape based on orientation."""
+    return LETTER_LANDSCAPE if orig_width >= orig_height else LETTER_PORTRAIT
+
+
+def letter_transform(orig_w: float, orig_h: float):
+    """
+    Fit a page onto Letter (same orientation), centered.
+
+    Returns (target_w, target_h, scale, tx, ty).
+    """
+    target_w, target_h = choose_letter_size(orig_w, orig_h)
+    scale = min(target_w / orig_w, target_h / orig_h)
+    new_w, new_h = orig_w * scale, orig_h * scale
+
+    tx = (target_w - new_w) / 2.0
+    ty = (target_h - new_h) / 2.0
+    return target_w, target_h, scale, tx, ty
+
+
+def is_letter_page(page) -> bool:
+    """
+    True if reformatting `page` to Letter would leave it unchanged:
+    Letter-sized in its own orientation, media box at the origin, no crop
+    box narrower than the media box, and no /Rotate.
+    """
+    box = page.mediabox
+    if float(box.left) != 0 or float(box.bottom) != 0:
+        return False
+    if page.rotation % 360:
+        return False
+    crop = page.cropbox
+    if [float(v) for v in crop] != [float(v) for v in box]:
+        return False
+    w, h = float(box.width), float(box.height)
+    target_w, target_h = choose_letter_size(w, h)
+    return abs(w - target_w) < 0.01 and abs(h - target_h) < 0.01
+
+
+def reformat_pdf_to_letter_in_place(pdf_path: Path):
+    """
+    Reformat one PDF to Letter, preserving orientation, overwriting original.
+
+    Pages that are already Letter are passed through untouched; a file whose
+    pages are all Letter is not rewritten at all.
+
+    Returns (num_pages, pages_already_letter).
+    """
+    with contextlib.ExitStack() as stack:
+        reader = open_pdf_reader(pdf_path, stack)
+        num_pages = len(reader.pages)
+        skipped = sum(1 for page in reader.pages if is_letter_page(page))
+
+        if skipped == num_pages:
+            print(f"ℹ️  Already US Letter, left untouched: {pdf_path}")
+            return num_pages, skipped
+
+        def fill(writer, first, stop):
+            for page in (reader.pages[i] for i in range(first, stop)):
+                if is_letter_page(page):
+                    writer.add_page(page)
+                    continue
+
+                orig_w = float(page.mediabox.width)
+                orig_h = float(page.mediabox.height)
+
+                target_w, target_h, scale, tx, ty = letter_transform(orig_w, orig_h)
+
+                new_page = writer.add_blank_page(width=target_w, height=target_h)
+                transform = Transformation().scale(scale).translate(tx, ty)
+                merge_source_page(writer, new_page, page, transform)
+            return stop - first
+
+        temp_path = pdf_path.with_suffix(".tmp.pdf")
+        write_pdf_pages(temp_path, [(reader, fill, 0, num_pages)])
+
+    os.replace(temp_path, pdf_path)
+    print(f"✅ Reformatted to Letter: {pdf_path}")
+    return num_pages, skipped
+
+
+# ---------- Backup originals ----------
+
+def backup_originals(root: Path, manifest=None):
+    """
+    Backup ALL original files (any type) to ROOT/_bates_backups/,
+    preserving relative paths and original names.
+
+    Runs ONCE at the very start, before any conversion, renaming, or Bates.
+    """
+    if manifest is None:
+        manifest = TreeManifest.scan(root)
+
+    backup_root = root / BACKUP_FOLDER_NAME
+    print("\n--- BACKUP ORIGINAL TREE ---")
+
+    if DRY_RUN:
+        for path in manifest.files():
+            rel = path.relative_to(root)
+            dest = backup_root / rel
+            print(f"(DRY RUN) Would backup: {path} -> {dest}")
+        return
+
+    for path in manifest.files():
+        rel = path.relative_to(root)
+        dest = backup_root / rel
+        if dest.exists():
+            continue
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(path, dest)
+
+    print("✅ Original tree backup complete.")
+
+
+# ---------- Bates stamping ----------
+
+def pdf_literal(text: str) -> bytes:
+    """Encode text as a PDF literal string for a WinAnsi-encoded font."""
+    escaped = text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return b"(" + escaped.encode("cp1252", errors="replace") + b")"
+
+
+class BatesOverlayTemplate:
+    """
+    Everything about a Bates label that does not change from page to page.
+
+    The font resource, right-aligned anchor and the width of "<prefix> " are
+    computed once per (page size, font, prefix); each page then only needs
+    its number turned into a few bytes of content stream.
+    """
+
+    FONT_RESOURCE_NAME = "/F1"
+
+    def __init__(self, page_width: float, page_height: float, prefix: str, font: str, font_size: float):
+        self.page_width = page_width
+        self.page_height = page_height
+        self.prefix = prefix
+        self.font = font
+        self.font_size = font_size
+
+        self.font_dict = DictionaryObject({
+            NameObject("/Type"): NameObject("/Font"),
+            NameObject("/Subtype"): NameObject("/Type1"),
+            NameObject("/BaseFont"): NameObject("/" + font),
+            NameObject("/Encoding"): NameObject("/WinAnsiEncoding"),
+        })
+        self.resources = DictionaryObject({
+            NameObject("/Font"): DictionaryObject({
+                NameObject(self.FONT_RESOURCE_NAME): self.font_dict,
+            }),
+        })
+
+        self.x_right = page_width - BATES_MARGIN_RIGHT
+        self.y = BATES_MARGIN_BOTTOM
+        self.prefix_width = stringWidth(f"{prefix} ", font, font_size)
+        self.digit_widths = {d: stringWidth(d, font, font_size) for d in "0123456789"}
+
+    def label_width(self, number_text: str) -> float:
+        try:
+            return self.prefix_width + sum(self.digit_widths[d] for d in number_text)
+        except KeyError:
+            return stringWidth(f"{self.prefix} {number_text}", self.font, self.font_size)
+
+    def content(self, number_text: str, font_name: str = FONT_RESOURCE_NAME) -> bytes:
+        """Content stream that draws '<prefix> <number_text>' in the footer band."""
+        x = self.x_right - self.label_width(number_text)
+        return b"BT %s %g Tf 1 0 0 1 %.4f %.4f Tm %s Tj ET" % (
+            font_name.encode("ascii"),
+            self.font_size,
+            x,
+            self.y,
+            pdf_literal(f"{self.prefix} {number_text}"),
+        )
+
+    def overlay(self, number_text: str):
+        """One-page overlay (a PageObject) carrying just the label."""
+        page = PageObject.create_blank_page(width=self.page_width, height=self.page_height)
+        stream = DecodedStreamObject()
+        stream.set_data(self.content(number_text))
+        page[NameObject("/Resources")] = self.resources
+        page[NameObject("/Contents")] = stream
+        return page
+
+
+@lru_cache(maxsize=256)
+def bates_overlay_template(page_width: float, page_height: float, prefix: str, font: str, font_size: float):
+    return BatesOverlayTemplate(page_width, page_height, prefix, font, font_size)
+
+
+def create_bates_overlay(label: str, page_width: float, page_height: float):
+    """Create a one-page overlay with Bates label in footer band."""
+    prefix, _, number_text = label.rpartition(" ")
+    template = bates_overlay_template(page_width, page_height, prefix, BATES_FONT, BATES_FONT_SIZE)
+    return template.overlay(number_text)
+
+
+def footer_transform(pw: float, ph: float):
+    """
+    Shrink page content so it sits above the Bates footer band.
+
+    Returns (scale, tx, ty) for a page of size pw x ph.
+    """
+    reserved = min(BATES_FOOTER_BAND, ph / 3)
+    scale = min((ph - reserved) / ph, 1.0)
+
+    scaled_w = pw * scale
+    scaled_h = ph * scale
+
+    tx = (pw - scaled_w) / 2.0
+    ty = reserved + (ph - reserved - scaled_h) / 2.0
+    return scale, tx, ty
+
+
+def _clip_to_letter_page(page, scale: float, tx: float, ty: float, target_w: float, target_h: float):
+    """
+    Narrow `page`'s crop box to what would be visible on the Letter page.
+
+    The two-pass pipeline clipped twice: once to the original crop box, and
+    again to the intermediate Letter page. Folding the second clip into the
+    crop box keeps the single-pass output identical.
+    """
+    box = page.cropbox
+    left = max(float(box.left), -tx / scale)
+    bottom = max(float(box.bottom), -ty / scale)
+    right = min(float(box.right), (target_w - tx) / scale)
+    top = min(float(box.top), (target_h - ty) / scale)
+    if (left, bottom, right, top) != (float(box.left), float(box.bottom), float(box.right), float(box.top)):
+        page.cropbox = RectangleObject([left, bottom, right, top])
+
+
+def _pdf_number(value: float) -> bytes:
+    text = f"{value:.6f}".rstrip("0").rstrip(".")
+    return (text if text not in ("", "-0") else "0").encode("ascii")
+
+
+def _unused_resource_name(names, base: str) -> str:
+    name, n = base, 0
+    while name in names:
+        n += 1
+        name = f"{base}{n}"
+    return name
+
+
+def _stamp_page_direct(writer: PdfWriter, original_page, ctm, page_width: float, page_height: float,
+                       template: BatesOverlayTemplate, number_text: str, font=None):
+    """
+    Add a stamped page to `writer` without decoding the original content.
+
+    Draws the same thing as merge_transformed_page + merge_page: the original
+    content under `ctm`, clipped to its crop box, then the label. The
+    original content streams are copied as they are; only two small streams
+    are added around them, and the label font gets a name not already used
+    by the page. `font` is the label font already added to `writer`, shared
+    by every page; without it each page gets its own copy.
+    """
+    new_page = writer.add_blank_page(width=page_width, height=page_height)
+
+    resources = DictionaryObject()
+    source_resources = original_page.get("/Resources")
+    if source_resources is not None:
+        for key, value in source_resources.get_object().items():
+            resources[NameObject(key)] = clone_into(writer, value)
+    font_name = _add_label_font(resources, font if font is not None else template.font_dict.clone(writer))
+    new_page[NameObject("/Resources")] = resources
+
+    prologue_data, epilogue_data = _direct_wrapper(original_page, ctm, template, number_text, font_name)
+    prologue = DecodedStreamObject()
+    prologue.set_data(prologue_data)
+    epilogue = DecodedStreamObject()
+    epilogue.set_data(epilogue_data)
+
+    contents = ArrayObject([prologue])
+    contents.extend(clone_into(writer, ref).get_object() for ref in _content_stream_refs(original_page))
+    contents.append(epilogue)
+    new_page.replace_contents(contents)
+    return new_page
+
+
+def _add_label_font(resources: DictionaryObject, font_dict) -> str:
+    """Add the label font to a copy of resources' /Font under an unused name; return the name."""
+    fonts = DictionaryObject(resources["/Font"]) if "/Font" in resources else DictionaryObject()
+    font_name = _unused_resource_name(fonts, "/OSCBates")
+    fonts[NameObject(font_name)] = font_dict
+    resources[NameObject("/Font")] = fonts
+    return font_name
+
+
+def _direct_wrapper(original_page, ctm, template: BatesOverlayTemplate, number_text: str, font_name: str):
+    """Content bytes that go before and after the original content streams."""
+    crop = original_page.cropbox
+    prologue = (
+        b"q " + b" ".join(_pdf_number(v) for v in ctm) + b" cm "
+        + b" ".join(_pdf_number(float(v)) for v in (crop.left, crop.bottom, crop.width, crop.height))
+        + b" re W n\n"
+    )
+    epilogue = b"\nQ q " + template.content(number_text, font_name) + b" Q\n"
+    return prologue, epilogue
+
+
+def _content_stream_refs(page):
+    """Indirect references to the page's content streams, in order."""
+    contents = page.get("/Contents")
+    if contents is None:
+        return []
+    contents = contents.get_object()
+    if isinstance(contents, ArrayObject):
+        return list(contents)
+    return [contents.indirect_reference]
+
+
+def parse_bates_name(pdf_path: Path):
+    """(prefix, start, expected_pages) from a Bates file name, or None."""
+    m = BATES_NAME_PATTERN.match(pdf_path.stem)
+    if not m:
+        return None
+    start = int(m.group("start"))
+    end_str = m.group("end")
+    expected = (int(end_str) - start + 1) if end_str else 1
+    return m.group("prefix"), start, expected
+
+
+def bates_label(prefix: str, start: int, num_pages: int) -> str:
+    """Full range label recorded in a stamped file, e.g. 'CF 0001-0008'."""
+    return f"{prefix} {start:0{DIGITS}d}-{start + num_pages - 1:0{DIGITS}d}"
+
+
+def bates_marker(pdf_path: Path, prefix: str, start: int, num_pages: int) -> dict:
+    """Info-dictionary entries for stamping `pdf_path` (hashed before it is rewritten)."""
+    return {
+        BATES_MARKER_KEY: bates_label(prefix, start, num_pages),
+        BATES_SOURCE_KEY: file_sha256(pdf_path),
+    }
+
+
+def read_bates_marker(pdf_path: Path):
+    """The label an earlier run stamped `pdf_path` with, or None."""
+    try:
+        with open(pdf_path, "rb") as f:
+            info = PdfReader(f).trailer.get("/Info")
+            label = info.get_object().get(BATES_MARKER_KEY) if info is not None else None
+    except Exception:
+        return None
+    return str(label) if label is not None else None
+
+
+def _already_stamped(pdf_path: Path, prefix: str, start: int, expected: int) -> bool:
+    """
+    True if `pdf_path` already carries the range it is about to be stamped
+    with. A file stamped with a different range cannot be stamped again
+    without doubling the labels, so that raises instead.
+    """
+    stamped = read_bates_marker(pdf_path)
+    if stamped is None:
+        return False
+    label = bates_label(prefix, start, expected)
+    if stamped != label:
+        raise ValueError(
+            f"already Bates-stamped as {stamped}, not {label}; "
+            f"restore the original from {BACKUP_FOLDER_NAME} to renumber it"
+        )
+    print(f"⏭️  Already Bates-stamped, skipped: {pdf_path.name}")
+    return True
+
+
+def _stamp_page_range(reader, writer, prefix: str, start: int, first: int, stop: int, to_letter: bool):
+    """
+    Stamp reader.pages[first:stop] into `writer`, page i getting number
+    start + i. Returns how many of those pages were already Letter.
+    """
+    skipped = 0
+    fonts = {}      # template -> the label font, added to `writer` once
+    for original_page, pw, ph, transform, template, number_text, is_letter in _page_stamps(
+        reader, prefix, start, first, stop, to_letter
+    ):
+        skipped += is_letter
+
+        if STAMP_MODE != "merge" and not original_page.get("/Annots"):
+            if template not in fonts:
+                fonts[template] = writer._add_object(template.font_dict.clone(writer))
+            _stamp_page_direct(writer, original_page, transform.ctm, pw, ph, template, number_text, fonts[template])
+            continue
+
+        new_page = writer.add_blank_page(width=pw, height=ph)
+        merge_source_page(writer, new_page, original_page, transform)
+        new_page.merge_page(template.overlay(number_text))
+    return skipped
 
-    print("✅ Renaming complete.")
 
+def _page_stamps(reader, prefix: str, start: int, first: int, stop: int, to_letter: bool):
+    """
+    For each page in [first, stop): (page, width, height, transform,
+    template, number_text, already_letter) describing its stamped version.
+    """
+    for i in range(first, stop):
+        original_page = reader.pages[i]
+        current_num = start + i
 
-# ---------- Letter Reformat ----------
+        pw = float(original_page.mediabox.width)
+        ph = float(original_page.mediabox.height)
+        transform = Transformation()
 
-def choose_letter_size(orig_width: float, orig_height: float):
-    """Choose Letter portrait or landscape based on orientation."""
-    return LETTER_LANDSCAPE if orig_width >= orig_height else LETTER_PORTRAIT
+        is_letter = to_letter and is_letter_page(original_page)
+        if to_letter and not is_letter:
+            pw, ph, letter_scale, letter_tx, letter_ty = letter_transform(pw, ph)
+            _clip_to_letter_page(original_page, letter_scale, letter_tx, letter_ty, pw, ph)
+            transform = transform.scale(letter_scale).translate(letter_tx, letter_ty)
 
+        if not (is_letter and original_page.get(FOOTER_BAND_KEY)):
+            # (pages converted from images already leave the band free)
+            scale, tx, ty = footer_transform(pw, ph)
+            transform = transform.scale(scale).translate(tx, ty)
+        template = bates_overlay_template(pw, ph, prefix, BATES_FONT, BATES_FONT_SIZE)
+        yield original_page, pw, ph, transform, template, f"{current_num:0{DIGITS}d}", is_letter
 
-def reformat_pdf_to_letter_in_place(pdf_path: Path):
-    """Reformat one PDF to Letter, preserving orientation, overwriting original."""
-    reader = PdfReader(str(pdf_path))
-    writer = PdfWriter()
 
-    for page in reader.pages:
-        orig_w = float(page.mediabox.width)
-        orig_h = float(page.mediabox.height)
+def _last_startxref(f) -> int:
+    """Offset given by the last 'startxref' in the file, or None."""
+    f.seek(0, os.SEEK_END)
+    size = f.tell()
+    f.seek(max(0, size - 2048))
+    found = re.findall(rb"startxref\s+(\d+)", f.read())
+    return int(found[-1]) if found else None
 
-        target_w, target_h = choose_letter_size(orig_w, orig_h)
-        scale = min(target_w / orig_w, target_h / orig_h)
-        new_w, new_h = orig_w * scale, orig_h * scale
 
-        tx = (target_w - new_w) / 2.0
-        ty = (target_h - new_h) / 2.0
+def append_bates_incremental(pdf_path: Path, prefix: str, start: int, expected: int, to_letter: bool,
+                             metadata=None):
+    """
+    Stamp `pdf_path` by appending a PDF incremental update: each page object
+    is rewritten under its own number with the wrapped contents, the label
+    font and (for to_letter) the Letter media box; the original content
+    streams, images and fonts are not touched or copied. `metadata` is
+    merged into a new version of the document Info dictionary.
+
+    Returns (num_pages, pages_already_letter), or None when the file cannot
+    be updated this way (encrypted, cross-reference streams, annotations);
+    the caller then rewrites it instead.
+    """
+    with open(pdf_path, "r+b") as f:
+        reader = PdfReader(f)
+        num_pages = len(reader.pages)
+        _check_bates_page_count(pdf_path, expected, num_pages)
+
+        prev = _last_startxref(f)
+        reason = None
+        if reader.is_encrypted:
+            reason = "encrypted"
+        elif prev is None or "/XRefStm" in reader.trailer:
+            reason = "unsupported cross-reference table"
+        else:
+            f.seek(prev)
+            if f.read(4) != b"xref":
+                reason = "cross-reference stream"
+            elif any(page.get("/Annots") for page in reader.pages):
+                reason = "has annotations"
+        if reason:
+            print(f"ℹ️  Incremental update not possible ({reason}), rewriting: {pdf_path.name}")
+            return None
+
+        next_number = int(reader.trailer["/Size"])
+        updates = []    # (number, generation, object, stream bytes or None)
+        fonts = {}      # template -> reference to its label font, written once
+        skipped = 0
+        for page, pw, ph, transform, template, number_text, is_letter in _page_stamps(
+            reader, prefix, start, 0, num_pages, to_letter
+        ):
+            skipped += is_letter
+            page_dict = DictionaryObject({
+                NameObject(k): v for k, v in page.items()
+                if k not in ("/BleedBox", "/TrimBox", "/ArtBox", "/UserUnit", FOOTER_BAND_KEY)
+            })
+            resources = DictionaryObject(page["/Resources"]) if "/Resources" in page else DictionaryObject()
+            if template not in fonts:
+                updates.append((next_number, 0, DictionaryObject(template.font_dict), None))
+                fonts[template] = IndirectObject(next_number, 0, None)
+                next_number += 1
+            font_name = _add_label_font(resources, fonts[template])
+            prologue, epilogue = _direct_wrapper(page, transform.ctm, template, number_text, font_name)
+
+            # explicit boxes and rotation so nothing is inherited from the page tree
+            box = RectangleObject([0, 0, pw, ph])
+            page_dict[NameObject("/MediaBox")] = box
+            page_dict[NameObject("/CropBox")] = box
+            page_dict[NameObject("/Rotate")] = NumberObject(0)
+            page_dict[NameObject("/Resources")] = resources
+            page_dict[NameObject("/Contents")] = ArrayObject(
+                [IndirectObject(next_number, 0, None)]
+                + _content_stream_refs(page)
+                + [IndirectObject(next_number + 1, 0, None)]
+            )
+            ref = page.indirect_reference
+            updates.append((ref.idnum, ref.generation, page_dict, None))
+            updates.append((next_number, 0, DictionaryObject(), prologue))
+            updates.append((next_number + 1, 0, DictionaryObject(), epilogue))
+            next_number += 2
+
+        info_ref = reader.trailer.raw_get("/Info") if "/Info" in reader.trailer else None
+        if metadata:
+            info = DictionaryObject(reader.trailer["/Info"].get_object()) if info_ref is not None else DictionaryObject()
+            info.update({NameObject(k): TextStringObject(v) for k, v in metadata.items()})
+            updates.append((next_number, 0, info, None))
+            info_ref = IndirectObject(next_number, 0, None)
+            next_number += 1
+
+        trailer = DictionaryObject({
+            NameObject("/Size"): NumberObject(next_number),
+            NameObject("/Root"): reader.trailer.raw_get("/Root"),
+            NameObject("/Prev"): NumberObject(prev),
+        })
+        if info_ref is not None:
+            trailer[NameObject("/Info")] = info_ref
+        if "/ID" in reader.trailer:
+            trailer[NameObject("/ID")] = reader.trailer.raw_get("/ID")
+
+        # the original bytes end here; on any failure the update is cut off
+        # again so the file is left exactly as it was
+        end = f.seek(0, os.SEEK_END)
+        try:
+            f.write(b"\n")
+            offsets = {}
+            for number, generation, obj, data in updates:
+                offsets[number] = (f.tell(), generation)
+                f.write(f"{number} {generation} obj\n".encode("ascii"))
+                if data is not None:
+                    obj[NameObject("/Length")] = NumberObject(len(data))
+                obj.write_to_stream(f)
+                if data is not None:
+                    f.write(b"\nstream\n" + data + b"\nendstream")
+                f.write(b"\nendobj\n")
+
+            xref_offset = f.tell()
+            lines = ["xref\n"]
+            numbers = sorted(offsets)
+            run_start = 0
+            for k in range(1, len(numbers) + 1):
+                if k == len(numbers) or numbers[k] != numbers[k - 1] + 1:
+                    run = numbers[run_start:k]
+                    lines.append(f"{run[0]} {len(run)}\n")
+                    lines.extend(f"{offsets[n][0]:010d} {offsets[n][1]:05d} n \n" for n in run)
+                    run_start = k
+            f.write("".join(lines).encode("ascii"))
+            f.write(b"trailer\n")
+            trailer.write_to_stream(f)
+            f.write(f"\nstartxref\n{xref_offset}\n%%EOF\n".encode("ascii"))
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.truncate(end)
+            f.flush()
+            os.fsync(f.fileno())
+            raise
+
+    return num_pages, skipped
+
+
+def _check_bates_page_count(pdf_path: Path, expected: int, num_pages: int):
+    if expected != num_pages:
+        raise SystemExit(
+            f"❌ Bates mismatch for {pdf_path.name}: "
+            f"filename implies {expected} page(s), PDF has {num_pages}."
+        )
 
-        new_page = writer.add_blank_page(width=target_w, height=target_h)
-        transform = Transformation().scale(scale).translate(tx, ty)
-        new_page.merge_transformed_page(page, transform)
 
-    temp_path = pdf_path.with_suffix(".tmp.pdf")
-    with open(temp_path, "wb") as f_out:
-        writer.write(f_out)
+def _bates_temp_path(pdf_path: Path, tag: str = "") -> Path:
+    return pdf_path.with_name(f"__bates__{uuid.uuid4().hex}__{tag}{pdf_path.name}")
 
-    os.replace(temp_path, pdf_path)
-    print(f"✅ Reformatted to Letter: {pdf_path}")
 
+def _print_stamped(pdf_path: Path, to_letter: bool):
+    if to_letter:
+        print(f"✅ Reformatted to Letter + Bates-stamped: {pdf_path.name}")
+    else:
+        print(f"✅ Bates-stamped: {pdf_path.name}")
 
-# ---------- Backup originals ----------
 
-def backup_originals(root: Path):
+def apply_bates_to_pdf(pdf_path: Path, to_letter: bool = False, combined=None):
     """
-    Backup ALL original files (any type) to ROOT/_bates_backups/,
-    preserving relative paths and original names.
+    Bates-stamp a single PDF based on filename:
+      - 'CF 0001.pdf'
+      - 'CF 0001-0008.pdf'
+      - 'CF 0001-0008 - Original Name.pdf'
 
-    Runs ONCE at the very start, before any conversion, renaming, or Bates.
-    """
-    backup_root = root / BACKUP_FOLDER_NAME
-    print("\n--- BACKUP ORIGINAL TREE ---")
+    With to_letter=True, each page is also reformatted to Letter in the same
+    pass: the Letter fit and the footer-band scaling are composed into one
+    transformation, and the file is parsed and written once. Pages that are
+    already Letter skip the Letter step.
 
-    if DRY_RUN:
-        for path in iter_finder_order_files(root):
-            if not path.is_file():
-                continue
-            rel = path.relative_to(root)
-            dest = backup_root / rel
-            print(f"(DRY RUN) Would backup: {path} -> {dest}")
-        return
+    Returns (num_pages, pages_already_letter), or None if the name does not
+    carry a Bates range.
 
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
-        rel = path.relative_to(root)
-        dest = backup_root / rel
-        if dest.exists():
-            continue
-        dest.parent.mkdir(parents=True, exist_ok=True)
-        shutil.copy2(path, dest)
+    The output records its label and the source file's hash (see
+    bates_marker); a file that already carries this range is skipped, and
+    returns (num_pages, None) as it was neither stamped nor reformatted.
 
-    print("✅ Original tree backup complete.")
+    STAMP_MODE picks how each page is assembled (see _stamp_page_direct);
+    pages with annotations always go through the merge path so their
+    rectangles are moved along with the content.
 
+    `combined` (a StreamingPdfWriter) also receives the stamped pages as
+    they are written; incremental updates and skipped files do not feed it.
+    """
+    parsed = parse_bates_name(pdf_path)
+    if parsed is None:
+        print(f"ℹ️  Skipping Bates (name pattern mismatch): {pdf_path.name}")
+        return None
+    prefix, start, expected = parsed
+    if _already_stamped(pdf_path, prefix, start, expected):
+        return expected, None
+
+    metadata = bates_marker(pdf_path, prefix, start, expected) if not DRY_RUN else None
+    if STAMP_MODE == "incremental" and not DRY_RUN:
+        result = append_bates_incremental(pdf_path, prefix, start, expected, to_letter, metadata)
+        if result is not None:
+            _print_stamped(pdf_path, to_letter)
+            return result
+
+    with contextlib.ExitStack() as stack:
+        reader = open_pdf_reader(pdf_path, stack)
+        num_pages = len(reader.pages)
+        _check_bates_page_count(pdf_path, expected, num_pages)
 
-# ---------- Bates stamping ----------
+        if DRY_RUN:
+            skipped = sum(1 for page in reader.pages if to_letter and is_letter_page(page))
+            last_num = start + num_pages - 1
+            print(
+                f"(DRY RUN) Would Bates-stamp {pdf_path.name} "
+                f"from {prefix} {start:0{DIGITS}d} to {prefix} {last_num:0{DIGITS}d}"
+            )
+            return num_pages, skipped
 
-def create_bates_overlay(label: str, page_width: float, page_height: float):
-    """Create a one-page overlay with Bates label in footer band."""
-    packet = io.BytesIO()
-    c = canvas.Canvas(packet, pagesize=(page_width, page_height))
+        def fill(writer, first, stop):
+            return _stamp_page_range(reader, writer, prefix, start, first, stop, to_letter)
+
+        tmp = _bates_temp_path(pdf_path)
+        skipped = write_pdf_pages(tmp, [(reader, fill, 0, num_pages)], metadata, also=combined)
 
-    c.setFont(BATES_FONT, BATES_FONT_SIZE)
-    text_width = stringWidth(label, BATES_FONT, BATES_FONT_SIZE)
+    os.replace(tmp, pdf_path)
 
-    x_right = page_width - BATES_MARGIN_RIGHT
-    x = x_right - text_width
-    y = BATES_MARGIN_BOTTOM
+    _print_stamped(pdf_path, to_letter)
+    return num_pages, skipped
 
-    c.drawString(x, y, label)
-    c.save()
 
-    packet.seek(0)
-    overlay_reader = PdfReader(packet)
-    return overlay_reader.pages[0]
+def shard_page_ranges(pdf_path: Path):
+    """
+    Page ranges [(first, stop), ...] to stamp `pdf_path` in (one per
+    STAMP_WORKERS process, at least SHARD_PAGES pages each), or None if it
+    is small enough (or misnamed enough) to stamp in one piece. Misnamed
+    and already-stamped files are left whole so apply_bates_to_pdf reports
+    the mismatch or skips them.
+    """
+    parsed = parse_bates_name(pdf_path)
+    if parsed is None or parsed[2] < SHARD_MIN_PAGES or read_bates_marker(pdf_path) is not None:
+        return None
+    expected = parsed[2]
+    if get_pdf_page_count(pdf_path) != expected:
+        return None
+    size = max(SHARD_PAGES, -(-expected // STAMP_WORKERS))
+    return [(first, min(first + size, expected)) for first in range(0, expected, size)]
 
 
-def apply_bates_to_pdf(pdf_path: Path):
+def stamp_pdf_shard(pdf_path: Path, first: int, stop: int, to_letter: bool = True):
     """
-    Bates-stamp a single PDF based on filename:
-      - 'CF 0001.pdf'
-      - 'CF 0001-0008.pdf'
-      - 'CF 0001-0008 - Original Name.pdf'
+    Stamp pages [first, stop) of a Bates-named PDF into a shard file next to
+    it (see PdfFragmentWriter). Numbering is offset from the file's start
+    number exactly as in a whole-file pass. Returns (shard_path,
+    page_numbers, pages_already_letter), page_numbers being the page objects
+    in the shard, in order.
     """
-    m = BATES_NAME_PATTERN.match(pdf_path.stem)
-    if not m:
-        print(f"ℹ️  Skipping Bates (name pattern mismatch): {pdf_path.name}")
-        return
+    prefix, start, _ = parse_bates_name(pdf_path)
+    shard_path = _bates_temp_path(pdf_path, f"{first:08d}__")
 
-    prefix = m.group("prefix")
-    start = int(m.group("start"))
-    end_str = m.group("end")
+    with open(pdf_path, "rb") as f, open(shard_path, "wb") as shard:
+        reader = PdfReader(f)
 
-    reader = PdfReader(str(pdf_path))
-    num_pages = len(reader.pages)
+        def fill(writer, first, stop):
+            return _stamp_page_range(reader, writer, prefix, start, first, stop, to_letter)
 
-    expected = (int(end_str) - start + 1) if end_str else 1
-    if expected != num_pages:
-        raise SystemExit(
-            f"❌ Bates mismatch for {pdf_path.name}: "
-            f"filename implies {expected} page(s), PDF has {num_pages}."
-        )
+        out = PdfFragmentWriter(shard)
+        if LOW_MEMORY:
+            skipped = stream_pdf_pages(out, reader, fill, first, stop)
+        else:
+            writer = BatchPdfWriter()
+            skipped = fill(writer, first, stop)
+            out.add_pages(writer, source=reader)
+    return shard_path, out.page_numbers, skipped
 
-    if DRY_RUN:
-        last_num = start + num_pages - 1
-        print(
-            f"(DRY RUN) Would Bates-stamp {pdf_path.name} "
-            f"from {prefix} {start:0{DIGITS}d} to {prefix} {last_num:0{DIGITS}d}"
-        )
-        return
 
-    writer = PdfWriter()
+def assemble_pdf_shards(pdf_path: Path, shards, to_letter: bool = True):
+    """
+    Join stamped shards, [(shard_path, page_numbers), ...] in page order,
+    over `pdf_path`, then delete them.
+    """
+    tmp = _bates_temp_path(pdf_path)
+    prefix, start, _ = parse_bates_name(pdf_path)
+    pages = sum(len(page_numbers) for _, page_numbers in shards)
+    with open(tmp, "wb") as f:
+        out = StreamingPdfWriter(f)
+        for shard_path, page_numbers in shards:
+            out.add_fragment(shard_path, page_numbers)
+        out.close(bates_marker(pdf_path, prefix, start, pages))
+    os.replace(tmp, pdf_path)
+    discard_pdf_shards([shard_path for shard_path, _ in shards])
+    _print_stamped(pdf_path, to_letter)
 
-    for i, original_page in enumerate(reader.pages):
-        current_num = start + i
-        label = f"{prefix} {current_num:0{DIGITS}d}"
 
-        pw = float(original_page.mediabox.width)
-        ph = float(original_page.mediabox.height)
+def discard_pdf_shards(shard_paths):
+    for shard_path in shard_paths:
+        try:
+            shard_path.unlink()
+        except FileNotFoundError:
+            pass
 
-        reserved = min(BATES_FOOTER_BAND, ph / 3)
-        scale = min((ph - reserved) / ph, 1.0)
 
-        scaled_w = pw * scale
-        scaled_h = ph * scale
+def _stamp_pdf(pdf_path: Path, combined=None):
+    """Letter + Bates pass for one PDF. Returns (num_pages, pages_already_letter)."""
+    result = apply_bates_to_pdf(pdf_path, to_letter=True, combined=combined)
+    if result is None:
+        # No Bates range in the name: still normalize to Letter
+        if DRY_RUN:
+            result = (get_pdf_page_count(pdf_path), 0)
+        else:
+            result = reformat_pdf_to_letter_in_place(pdf_path)
+    return result
 
-        tx = (pw - scaled_w) / 2.0
-        ty = reserved + (ph - reserved - scaled_h) / 2.0
 
-        new_page = writer.add_blank_page(width=pw, height=ph)
+def _outcome(fn, *args, capture: bool = False):
+    """
+    Run fn(*args) and return (result, error, log) instead of raising.
 
-        transform = Transformation().scale(scale).translate(tx, ty)
-        new_page.merge_transformed_page(original_page, transform)
+    With capture=True the messages printed along the way are returned in
+    `log` so a worker process can hand them back to be printed in order.
+    """
+    out = io.StringIO() if capture else None
+    with contextlib.redirect_stdout(out) if capture else contextlib.nullcontext():
+        try:
+            result, error = fn(*args), None
+        except Exception as e:
+            result, error = None, f"{args[0]}: {e}"
+    return result, error, out.getvalue() if capture else ""
 
-        overlay = create_bates_overlay(label, pw, ph)
-        new_page.merge_page(overlay)
 
-    tmp = pdf_path.with_name(f"__bates__{uuid.uuid4().hex}__{pdf_path.name}")
-    with open(tmp, "wb") as f:
-        writer.write(f)
-    os.replace(tmp, pdf_path)
+def _worker_config() -> dict:
+    """Run settings a pool worker needs (see _init_stamp_worker)."""
+    return {
+        "DRY_RUN": DRY_RUN,
+        "PREFIX": PREFIX,
+        "DIGITS": DIGITS,
+        "STAMP_MODE": STAMP_MODE,
+        "LOW_MEMORY": LOW_MEMORY,
+        "COMPACT_OUTPUT": COMPACT_OUTPUT,
+        "CONVERSION_ONLY": CONVERSION_ONLY,
+        "IMAGE_MAX_DPI": IMAGE_MAX_DPI,
+    }
 
-    print(f"✅ Bates-stamped: {pdf_path.name}")
 
+def _init_stamp_worker(config: dict):
+    """Process-pool initializer: copy the run's settings into the worker."""
+    globals().update(config)
 
-def apply_bates_to_all_pdfs(root: Path):
+
+def _stamp_pdfs_in_processes(pdfs, manifest, on_done=None):
+    """
+    Stamp `pdfs` on STAMP_WORKERS processes, largest jobs first so one big
+    production does not start last and hold up the end of the run.
+
+    Except in incremental mode, PDFs of SHARD_MIN_PAGES pages or more are
+    split into page-range shards stamped side by side; when a file's
+    last shard finishes, one more job concatenates them over the original.
+
+    on_done(i, outcome) is called as soon as pdfs[i] is finished.
+    Returns outcomes in the same order as `pdfs`.
+    """
+    config = _worker_config()
+    outcomes = [None] * len(pdfs)
+
+    jobs = []       # (estimated bytes, pdf index, shard number or None, page range)
+    shards = {}     # pdf index -> [shard outcome, ...]
+    for i, pdf in enumerate(pdfs):
+        record = manifest.record(pdf)
+        size = record.size if record else 0
+        ranges = shard_page_ranges(pdf) if STAMP_MODE != "incremental" and not DRY_RUN else None
+        if not ranges:
+            jobs.append((size, i, None, None))
+            continue
+        shards[i] = [None] * len(ranges)
+        total = ranges[-1][1]
+        for k, (first, stop) in enumerate(ranges):
+            jobs.append((size * (stop - first) / total, i, k, (first, stop)))
+    jobs.sort(key=lambda job: job[0], reverse=True)
+
+    workers = min(STAMP_WORKERS, len(jobs))
+    print(f"Stamping on {workers} processes (largest files first)")
+    if shards:
+        print(f"Splitting {len(shards)} large PDF(s) into {sum(map(len, shards.values()))} page-range shards")
+
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_stamp_worker, initargs=(config,))
+    pending = {}
+    try:
+        for _, i, k, page_range in jobs:
+            if k is None:
+                future = pool.submit(_outcome, _stamp_pdf, pdfs[i], capture=True)
+            else:
+                future = pool.submit(_outcome, stamp_pdf_shard, pdfs[i], *page_range, capture=True)
+            pending[future] = (i, k)
+
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                i, k = pending.pop(future)
+                if k is None:
+                    outcomes[i] = future.result()
+                    if on_done is not None:
+                        on_done(i, outcomes[i])
+                    continue
+
+                shards[i][k] = future.result()
+                if any(outcome is None for outcome in shards[i]):
+                    continue
+                shard_paths = [result[0] for result, _, _ in shards[i] if result]
+                failed = [outcome for outcome in shards[i] if outcome[1]]
+                if failed:
+                    discard_pdf_shards(shard_paths)
+                    outcomes[i] = failed[0]
+                    if on_done is not None:
+                        on_done(i, outcomes[i])
+                    continue
+                parts = [result[:2] for result, _, _ in shards[i]]
+                skipped = sum(result[2] for result, _, _ in shards[i])
+                future = pool.submit(_outcome, _assemble_shards, pdfs[i], parts, skipped, capture=True)
+                pending[future] = (i, None)
+    except BaseException:
+        # e.g. a Bates page-count mismatch (SystemExit) in one of the workers
+        pool.shutdown(wait=True, cancel_futures=True)
+        for shard_outcomes in shards.values():
+            discard_pdf_shards([o[0][0] for o in shard_outcomes if o and o[0]])
+        raise
+    pool.shutdown()
+    return outcomes
+
+
+def _assemble_shards(pdf_path: Path, shards, skipped: int):
+    assemble_pdf_shards(pdf_path, shards, to_letter=True)
+    return sum(len(page_numbers) for _, page_numbers in shards), skipped
+
+
+def apply_bates_to_all_pdfs(root: Path, manifest=None, journal=None, combined=None):
     """
-    Reformat to Letter, then Bates-stamp all eligible PDFs.
+    Reformat to Letter and Bates-stamp all eligible PDFs (one pass each).
+
+    Each PDF's range is fixed by its name, so with STAMP_WORKERS > 1 the
+    files (and page-range shards of very large files) are stamped on a
+    process pool; messages, totals and errors are still reported in Finder
+    order.
+
+    With a journal, each file is recorded (with its output hash) as soon as
+    it is stamped, and files the journal shows as already stamped are skipped.
+
+    With `combined` (a CombinedPdfBuilder), every file is handed to it as
+    soon as it is finished, so the combined PDF is written along the way.
 
     Returns:
-        { "total_pages": int, "errors": [str, ...] }
+        {
+            "total_pages": int,
+            "errors": [str, ...],
+            "letter_skipped_pages": int,   # pages already Letter
+            "letter_skipped_files": int,   # files needing no Letter reformat
+            "already_stamped_pages": int,  # pages of files already carrying their label
+            "already_stamped_files": int,  # files left as they were
+        }
     """
+    if manifest is None:
+        manifest = TreeManifest.scan(root)
+
     print("\n--- BATES STAMP PLAN ---")
 
-    pdfs = [
-        p for p in iter_finder_order_files(root)
-        if p.is_file()
-        and p.suffix.lower() == PDF_EXT
-        and BACKUP_FOLDER_NAME not in p.parts
-    ]
+    # Combined PDFs from an earlier run are made of already-stamped pages
+    pdfs = [p for p in manifest.files() if p.suffix.lower() == PDF_EXT and not is_combined_pdf(root, p)]
 
     if not pdfs:
         print("No PDFs found for Bates stamping.")
-        return {"total_pages": 0, "errors": []}
+        return {
+            "total_pages": 0, "errors": [], "letter_skipped_pages": 0, "letter_skipped_files": 0,
+            "already_stamped_pages": 0, "already_stamped_files": 0,
+        }
 
     errors = []
 
-    # 1. Reformat all PDFs to Letter (unless DRY_RUN)
+    # Reformat to Letter and Bates-stamp in a single pass per PDF
     if DRY_RUN:
         print("\n(DRY RUN) Would reformat all PDFs to US Letter before Bates stamping.")
     else:
-        print("\n--- REFORMAT ALL PDFs TO US LETTER ---")
-        for pdf in pdfs:
-            try:
-                reformat_pdf_to_letter_in_place(pdf)
-            except Exception as e:
-                msg = f"{pdf}: {e}"
-                print(f"⚠️  Error reformatting {msg}")
-                errors.append(msg)
+        print("\n--- REFORMAT TO US LETTER + BATES STAMP ---")
 
-    # 2. Bates stamp
     total_pages = 0
-
-    for pdf in pdfs:
-        try:
-            reader = PdfReader(str(pdf))
-            total_pages += len(reader.pages)
-        except Exception:
-            pass
-
-        try:
-            apply_bates_to_pdf(pdf)
-        except Exception as e:
-            msg = f"{pdf}: {e}"
-            print(f"⚠️  Failed to Bates-stamp {msg}")
-            errors.append(msg)
+    letter_skipped_pages = 0
+    letter_skipped_files = 0
+    already_stamped_pages = 0
+    already_stamped_files = 0
+
+    def tally(pages, skipped):
+        nonlocal total_pages, letter_skipped_pages, letter_skipped_files, already_stamped_pages, already_stamped_files
+        total_pages += pages
+        if skipped is None:
+            # already carried its label (see apply_bates_to_pdf)
+            already_stamped_pages += pages
+            already_stamped_files += 1
+            return
+        letter_skipped_pages += skipped
+        if pages and skipped == pages:
+            letter_skipped_files += 1
+
+    todo = pdfs
+    if journal is not None:
+        todo = []
+        for pdf in pdfs:
+            state, result = journal.stamp_state(pdf)
+            if state == "done":
+                print(f"⏭️  Already stamped: {pdf.name}")
+                tally(*result)
+            elif state == "changed":
+                error = f"{pdf}: changed since this run stamped it; not stamped again"
+                print(f"⚠️  Failed to Bates-stamp {error}")
+                errors.append(error)
+            elif state == "interrupted":
+                error = (f"{pdf}: stamping was interrupted; put the original back "
+                         f"(see {BACKUP_FOLDER_NAME}) and resume again")
+                print(f"⚠️  Failed to Bates-stamp {error}")
+                errors.append(error)
+            else:
+                todo.append(pdf)
+                continue
+            if combined is not None:
+                combined.done(pdf)
+        journal.stamping(todo, manifest)
+
+    def finished(pdf, outcome):
+        result, error, _ = outcome
+        if journal is not None and not error:
+            journal.stamped(pdf, *result)
+        if combined is not None:
+            combined.done(pdf, stamped=not error)
+        return outcome
+
+    def stamp(pdf):
+        # Only the file the combined PDF needs next can be copied in as it is written
+        sink = combined.sink(pdf) if combined is not None else None
+        return finished(pdf, _outcome(_stamp_pdf, pdf, sink))
+
+    if STAMP_WORKERS > 1 and todo:
+        outcomes = _stamp_pdfs_in_processes(todo, manifest, on_done=lambda i, o: finished(todo[i], o))
+    else:
+        outcomes = (stamp(pdf) for pdf in todo)
+
+    size_before = size_after = 0
+    for pdf, (result, error, log) in zip(todo, outcomes):
+        if log:
+            print(log, end="")
+        if error:
+            print(f"⚠️  Failed to Bates-stamp {error}")
+            errors.append(error)
+            continue
+        tally(*result)
+        if not DRY_RUN:
+            record = manifest.record(pdf)
+            size_before += record.size if record else 0
+            manifest.refresh(pdf)
+            record = manifest.record(pdf)
+            size_after += record.size if record else 0
 
     if DRY_RUN:
         print("\n(DRY RUN) No Bates labels were actually written.")
     else:
         print("\n✅ All eligible PDFs Bates-stamped.")
+        print(f"Output size: {size_before / 2**20:.1f} MB before stamping, {size_after / 2**20:.1f} MB after.")
+    print(f"Already US Letter: {letter_skipped_pages} page(s), {letter_skipped_files} file(s) needed no reformat.")
+    if already_stamped_files:
+        print(f"Already Bates-stamped: {already_stamped_files} file(s), {already_stamped_pages} page(s) left as they were.")
 
-    return {"total_pages": total_pages, "errors": errors}
+    return {
+        "total_pages": total_pages,
+        "errors": errors,
+        "letter_skipped_pages": letter_skipped_pages,
+        "letter_skipped_files": letter_skipped_files,
+        "already_stamped_pages": already_stamped_pages,
+        "already_stamped_files": already_stamped_files,
+    }
 
 
 # ---------- Folder range + renaming ----------
 
-def collect_folder_bates_ranges(root: Path):
+def collect_folder_bates_ranges(root: Path, manifest=None):
     """
     Build a mapping: folder_path -> (min_bates, max_bates)
     based on all Bates-labeled files inside that folder (recursively).
 
     Uses current filenames (call AFTER file renames).
     """
-    folder_ranges = {}
+    if manifest is None:
+        manifest = TreeManifest.scan(root)
 
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
-        if BACKUP_FOLDER_NAME in path.parts:
-            continue
+    folder_ranges = {}
 
+    for path in manifest.files():
         m = BATES_NAME_PATTERN.match(path.stem)
-        if not m:
+        if not m or is_combined_pdf(root, path):
             continue
 
         start = int(m.group("start"))
@@ -846,13 +3632,16 @@ def collect_folder_bates_ranges(root: Path):
     return folder_ranges
 
 
-def rename_folders_with_bates(root: Path, folder_ranges):
+def rename_folders_with_bates(root: Path, folder_ranges, manifest=None):
     """
     Rename folders based on their Bates range.
 
     Uses:
       - RENAME_FOLDERS (toggle)
       - KEEP_FOLDER_NAME (toggle)
+
+    As with files (see make_bates_filename), a label from an earlier run is
+    replaced, not kept as part of the folder name.
     """
     if not folder_ranges:
         return []
@@ -885,12 +3674,14 @@ def rename_folders_with_bates(root: Path, folder_ranges):
         else:
             base = f"{PREFIX} {start:0{DIGITS}d}-{end:0{DIGITS}d}"
 
-        if KEEP_FOLDER_NAME:
-            new_name = f"{base} - {name}"
+        original = strip_bates_label(name)
+        if KEEP_FOLDER_NAME and original:
+            new_name = f"{base} - {original}"
         else:
             new_name = base
 
         if new_name == name:
+            # Already carries its range (e.g. renamed before a resumed run stopped)
             continue
 
         dst = folder.with_name(new_name)
@@ -900,6 +3691,8 @@ def rename_folders_with_bates(root: Path, folder_ranges):
 
         try:
             folder.rename(dst)
+            if manifest is not None:
+                manifest.rename_folder(folder, dst)
             print(f"📁 Renamed folder: {folder} -> {dst}")
             renames.append((str(folder), str(dst)))
         except Exception as e:
@@ -910,64 +3703,319 @@ def rename_folders_with_bates(root: Path, folder_ranges):
 
 # ---------- Combined final PDF ----------
 
-def create_combined_final_pdf(root: Path):
+def combined_pdf_name(start: int, end: int) -> str:
+    """Name of a combined PDF (or volume) covering start..end: 'CF 0001- CF 0244.pdf'."""
+    return f"{PREFIX} {start:0{DIGITS}d}- {PREFIX} {end:0{DIGITS}d}.pdf"
+
+
+def is_combined_pdf(root: Path, path: Path) -> bool:
+    """True for a combined PDF or volume written into `root` by a run."""
+    if path.parent != root or path.suffix.lower() != PDF_EXT:
+        return False
+    m = COMBINED_NAME_PATTERN.match(path.stem)
+    return m is not None and m.group("prefix") == PREFIX
+
+
+def plan_volumes(docs):
+    """
+    Split `docs`, [(start, end, path, size), ...] in Bates order, into
+    volumes. Cuts fall only between documents, so that no volume goes over
+    VOLUME_MAX_PAGES pages or VOLUME_MAX_BYTES bytes of input; a document
+    over a limit on its own gets a volume to itself.
+    """
+    volumes, current, pages, size = [], [], 0, 0
+    for doc in docs:
+        doc_pages = doc[1] - doc[0] + 1
+        if current and (
+            (VOLUME_MAX_PAGES and pages + doc_pages > VOLUME_MAX_PAGES)
+            or (VOLUME_MAX_BYTES and size + doc[3] > VOLUME_MAX_BYTES)
+        ):
+            volumes.append(current)
+            current, pages, size = [], 0, 0
+        current.append(doc)
+        pages += doc_pages
+        size += doc[3]
+    if current:
+        volumes.append(current)
+    return volumes
+
+
+def write_combined_pdf(out_path: Path, pdf_paths):
+    """
+    Concatenate `pdf_paths` into `out_path`, streaming each document's pages
+    in batches (see StreamingPdfWriter) so memory use does not grow with the
+    size of the output. Returns the bytes of repeated resources stored once.
+    """
+    # Written aside and moved into place, so an interrupted run never leaves a partial file
+    tmp = _bates_temp_path(out_path)
+    with open(tmp, "wb") as f:
+        out = StreamingPdfWriter(f)
+        for pdf_path in pdf_paths:
+            append_pdf(out, pdf_path)
+        out.close()
+    os.replace(tmp, out_path)
+    return out.shared_bytes
+
+
+def append_pdf(out: StreamingPdfWriter, pdf_path: Path):
+    """Stream every page of `pdf_path` onto the end of `out`; a file that cannot be read is skipped."""
+    written = len(out.page_numbers)
+    try:
+        with open(pdf_path, "rb") as src:
+            reader = PdfReader(src)
+            try:
+                stream_pdf_pages(out, reader, copy_pdf_pages(reader), 0, len(reader.pages))
+            finally:
+                out.forget(reader)
+    except Exception as e:
+        # Objects already written for it stay in the file, unreferenced
+        del out.page_numbers[written:]
+        print(f"⚠️  Skipping {pdf_path} while combining: {e}")
+
+
+def combined_docs(root: Path, manifest):
+    """Bates-labeled PDFs to combine, [(start, end, path, size), ...] sorted by start number."""
+    docs = []
+    for path in manifest.files():
+        if path.suffix.lower() != PDF_EXT or is_combined_pdf(root, path):
+            continue
+
+        parsed = parse_bates_name(path)
+        if parsed is None:
+            continue
+        _, s, pages = parsed
+        record = manifest.record(path)
+        docs.append((s, s + pages - 1, path, record.size if record else 0))
+    docs.sort(key=lambda doc: doc[0])
+    return docs
+
+
+def report_combined_pdfs(root: Path, manifest, written, input_size: int, shared_bytes: int):
+    """Print the stale-volume note and the size line after the combined PDF(s) are written."""
+    stale = [p.name for p in manifest.files() if is_combined_pdf(root, p) and str(p) not in written]
+    if stale:
+        print(f"ℹ️  Combined PDFs from an earlier run were left in place: {', '.join(stale)}")
+
+    output_size = sum(Path(path).stat().st_size for path in written)
+    print(
+        f"Combined size: {output_size / 2**20:.1f} MB from {input_size / 2**20:.1f} MB of "
+        f"stamped PDFs ({shared_bytes / 2**20:.1f} MB of repeated resources stored once)."
+    )
+
+
+def _report_combined_volume(out_path: Path, documents: int):
+    size = out_path.stat().st_size
+    print(f"✅ Created combined PDF: {out_path} ({size / 2**20:.1f} MB)")
+    if VOLUME_MAX_BYTES and size > VOLUME_MAX_BYTES:
+        # volumes are cut by the size of the stamped PDFs going in, not of the output
+        reason = (
+            "a single document is larger" if documents == 1
+            else f"its {documents} documents add up to less, but the combined file came out larger"
+        )
+        print(f"⚠️  {out_path.name} is over the volume size limit ({reason}).")
+
+
+def create_combined_final_pdf(root: Path, manifest=None):
     """
     Combine all Bates-labeled PDFs in order into a single PDF
     named like: 'CF 0001- CF 0244.pdf' covering the full range.
+
+    With VOLUME_MAX_PAGES / VOLUME_MAX_BYTES, the output is split between
+    documents into volumes named the same way, each covering its part of
+    the range (together they cover all of it). This is the fallback when the
+    combined output was not built while stamping (a resumed run), so the
+    files are read back from disk; with STAMP_WORKERS > 1 the volumes are
+    then written side by side on a process pool.
+
+    Returns the list of paths written (empty if there was nothing to combine).
     """
-    folder_ranges = collect_folder_bates_ranges(root)
+    if manifest is None:
+        manifest = TreeManifest.scan(root)
+
+    folder_ranges = collect_folder_bates_ranges(root, manifest)
     if root not in folder_ranges:
         print("ℹ️  No Bates range found for root; skipping combined PDF.")
-        return None
+        return []
 
     start, end = folder_ranges[root]
     if start <= 0 or end < start:
         print("ℹ️  Invalid Bates range for root; skipping combined PDF.")
-        return None
-
-    # Collect PDFs with Bates in filename, sorted by start number
-    pdf_infos = []
-    for path in iter_finder_order_files(root):
-        if not path.is_file():
-            continue
-        if path.suffix.lower() != PDF_EXT:
-            continue
-        if BACKUP_FOLDER_NAME in path.parts:
-            continue
-
-        m = BATES_NAME_PATTERN.match(path.stem)
-        if not m:
-            continue
-        s = int(m.group("start"))
-        pdf_infos.append((s, path))
+        return []
 
-    if not pdf_infos:
+    docs = combined_docs(root, manifest)
+    if not docs:
         print("ℹ️  No Bates-labeled PDFs to combine.")
-        return None
-
-    pdf_infos.sort(key=lambda t: t[0])
+        return []
 
-    out_name = f"{PREFIX} {start:0{DIGITS}d}- {PREFIX} {end:0{DIGITS}d}.pdf"
-    out_path = root / out_name
+    # Each volume runs up to where the next one starts, so numbers used by
+    # videos and other non-PDF items between them are still covered
+    volumes = plan_volumes(docs)
+    firsts = [start] + [volume[0][0] for volume in volumes[1:]]
+    lasts = [first - 1 for first in firsts[1:]] + [end]
+    jobs = [
+        (root / combined_pdf_name(first, last), [path for _, _, path, _ in volume])
+        for first, last, volume in zip(firsts, lasts, volumes)
+    ]
 
     if DRY_RUN:
-        print(f"(DRY RUN) Would create combined PDF: {out_path}")
-        return str(out_path)
+        for out_path, _ in jobs:
+            print(f"(DRY RUN) Would create combined PDF: {out_path}")
+        return [str(out_path) for out_path, _ in jobs]
+
+    if len(jobs) > 1:
+        print(f"Splitting the combined PDF into {len(jobs)} volumes")
+    if STAMP_WORKERS > 1 and len(jobs) > 1:
+        workers = min(STAMP_WORKERS, len(jobs))
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_stamp_worker, initargs=(_worker_config(),)
+        ) as pool:
+            futures = [pool.submit(_outcome, write_combined_pdf, *job, capture=True) for job in jobs]
+            outcomes = [future.result() for future in futures]
+    else:
+        outcomes = [_outcome(write_combined_pdf, *job) for job in jobs]
+
+    written = []
+    input_size = sum(doc[3] for doc in docs)
+    shared_bytes = 0
+    for (out_path, paths), (result, error, log) in zip(jobs, outcomes):
+        if log:
+            print(log, end="")
+        if error:
+            print(f"⚠️  Failed to create combined PDF {error}")
+            continue
+        shared_bytes += result
+        manifest.add(out_path)
+        written.append(str(out_path))
+        _report_combined_volume(out_path, len(paths))
 
-    writer = PdfWriter()
-    for _, pdf_path in pdf_infos:
-        try:
-            reader = PdfReader(str(pdf_path))
-            for page in reader.pages:
-                writer.add_page(page)
-        except Exception as e:
-            print(f"⚠️  Skipping {pdf_path} while combining: {e}")
+    report_combined_pdfs(root, manifest, written, input_size, shared_bytes)
+    return written
 
-    with open(out_path, "wb") as f:
-        writer.write(f)
 
-    print(f"✅ Created combined PDF: {out_path}")
-    return str(out_path)
+class CombinedPdfBuilder:
+    """
+    Writes the combined PDF (or its volumes) while the production is being
+    stamped, instead of reading every stamped file back afterwards.
+
+    Documents go in strictly in Bates order. Before stamping a file, the
+    stamping stage asks sink() for the writer to copy its pages into as
+    they are written; that only works for the document needed next, in
+    this process. Files stamped by workers, out of order, as incremental
+    updates or not at all (already stamped, failed) are streamed from disk
+    once their turn comes, as in create_combined_final_pdf.
+
+    Volumes are cut between documents as each new document arrives:
+    VOLUME_MAX_PAGES counts pages written, VOLUME_MAX_BYTES the volume's
+    size so far plus the file about to be added. Volumes are therefore
+    written one after another, in this process.
+    """
+
+    def __init__(self, root: Path, manifest, start: int, end: int, docs):
+        self.root = root
+        self.manifest = manifest
+        self.start = start
+        self.end = end
+        self.queue = deque(docs)        # documents not yet added, in Bates order
+        self.input_paths = [path for _, _, path, _ in docs]
+        self.finished = set()           # paths done stamping but not yet added
+        self.written = []
+        self.shared_bytes = 0
+        self.out = None                 # StreamingPdfWriter of the open volume
+        self.file = None
+        self.tmp = None
+        self.first = None               # first number of the open volume
+        self.documents = 0              # documents in the open volume
+        self.feeding = None             # (path, pages before it) while sink() output is in use
+
+    @classmethod
+    def plan(cls, root: Path, manifest):
+        """A builder for the PDFs in `manifest`, or None if there is nothing to combine."""
+        start, end = collect_folder_bates_ranges(root, manifest).get(root, (0, 0))
+        docs = combined_docs(root, manifest)
+        if start <= 0 or end < start or not docs:
+            return None
+        return cls(root, manifest, start, end, docs)
+
+    def sink(self, pdf_path: Path):
+        """The writer to copy `pdf_path`'s stamped pages into, or None if it is not next."""
+        if self.feeding is not None or not self.queue or self.queue[0][2] != pdf_path:
+            return None
+        self._begin(self.queue[0])
+        self.feeding = (pdf_path, len(self.out.page_numbers))
+        return self.out
+
+    def done(self, pdf_path: Path, stamped: bool = False):
+        """Record that `pdf_path` is finished and add whatever documents are now ready."""
+        if self.feeding is not None and self.feeding[0] == pdf_path:
+            _, written = self.feeding
+            self.feeding = None
+            doc = self.queue.popleft()
+            if not stamped or len(self.out.page_numbers) - written != doc[1] - doc[0] + 1:
+                # Not (fully) copied while stamping: take the file as it is on disk
+                del self.out.page_numbers[written:]
+                append_pdf(self.out, pdf_path)
+        else:
+            self.finished.add(pdf_path)
+        while self.feeding is None and self.queue and self.queue[0][2] in self.finished:
+            doc = self.queue.popleft()
+            self.finished.discard(doc[2])
+            self._begin(doc)
+            append_pdf(self.out, doc[2])
+
+    def close(self):
+        """Add any documents not handed over yet, finish the last volume and return the paths written."""
+        while self.queue:
+            doc = self.queue.popleft()
+            self._begin(doc)
+            append_pdf(self.out, doc[2])
+        self._finish(self.end)
+
+        input_size = 0
+        for path in self.input_paths:
+            record = self.manifest.record(path)
+            input_size += record.size if record else 0
+        report_combined_pdfs(self.root, self.manifest, self.written, input_size, self.shared_bytes)
+        return self.written
+
+    def discard(self):
+        """Drop the volume being written (the run is stopping)."""
+        if self.file is not None:
+            self.file.close()
+            self.tmp.unlink(missing_ok=True)
+            self.out = self.file = None
+
+    def _begin(self, doc):
+        """Make sure a volume with room for `doc` is open."""
+        doc_start, doc_end, path, _ = doc
+        if self.out is not None and self.out.page_numbers and (
+            (VOLUME_MAX_PAGES and len(self.out.page_numbers) + doc_end - doc_start + 1 > VOLUME_MAX_PAGES)
+            or (VOLUME_MAX_BYTES and self.file.tell() + path.stat().st_size > VOLUME_MAX_BYTES)
+        ):
+            # Each volume runs up to where the next one starts (see create_combined_final_pdf)
+            self._finish(doc_start - 1)
+        if self.out is None:
+            if not self.written:
+                print("\n--- COMBINED PDF (written while stamping) ---")
+            self.first = self.start if not self.written else doc_start
+            # Written aside and moved into place, so an interrupted run never leaves a partial file
+            self.tmp = _bates_temp_path(self.root / combined_pdf_name(self.first, self.end))
+            self.file = open(self.tmp, "wb")
+            self.out = StreamingPdfWriter(self.file)
+            self.documents = 0
+        self.documents += 1
+
+    def _finish(self, last: int):
+        if self.out is None:
+            return
+        self.out.close()
+        self.file.close()
+        out_path = self.root / combined_pdf_name(self.first, last)
+        os.replace(self.tmp, out_path)
+        self.shared_bytes += self.out.shared_bytes
+        self.out = self.file = None
+        self.manifest.add(out_path)
+        self.written.append(str(out_path))
+        _report_combined_volume(out_path, self.documents)
 
 
 # ---------- Public entrypoint used by GUI/CLI ----------
@@ -985,6 +4033,21 @@ def run_pipeline(
     number_videos_at_end: bool = True,
     combine_final: bool = False,
     conversion_only: bool = False,
+    scan_workers: int = 4,
+    use_scan_index: bool = True,
+    page_count_workers: int = 4,
+    stamp_mode: str = "direct",
+    stamp_workers: int = 1,
+    low_memory: bool = False,
+    resume: bool = False,
+    compact_output: bool = True,
+    volume_max_pages: int = None,
+    volume_max_bytes: int = None,
+    convert_workers: int = 4,
+    image_max_dpi: int = 600,
+    image_memory_budget: int = 1024 * 2**20,
+    docx_backend: str = "auto",
+    docx_workers: int = 2,
 ):
     """
     Run full pipeline and return a summary dict:
@@ -995,11 +4058,21 @@ def run_pipeline(
         "renamed": [(src, dst), ...],
         "skipped": [str, ...],
         "errors": [str, ...],
+        "letter_skipped_pages": int,   # pages already Letter, not reformatted
+        "letter_skipped_files": int,   # files with every page already Letter
+        "already_stamped_files": int,  # files already carrying their label, left alone
+        "aborted": True,               # only when the run stopped before renaming anything
     }
+
+    Real runs keep a journal in the root folder; with resume=True a run
+    that was interrupted continues from it instead of starting over.
     """
     global ROOT_FOLDER, PREFIX, DIGITS, START_COUNTER, DRY_RUN
     global BACKUP_BEFORE_BATES, KEEP_ORIGINAL_NAME, RENAME_FOLDERS
     global KEEP_FOLDER_NAME, NUMBER_VIDEOS_AT_END, COMBINE_FINAL, CONVERSION_ONLY
+    global SCAN_WORKERS, USE_SCAN_INDEX, PAGE_COUNT_WORKERS, STAMP_MODE, STAMP_WORKERS
+    global LOW_MEMORY, RESUME, COMPACT_OUTPUT, VOLUME_MAX_PAGES, VOLUME_MAX_BYTES, CONVERT_WORKERS
+    global IMAGE_MAX_DPI, IMAGE_MEMORY_BUDGET, DOCX_BACKEND, DOCX_WORKERS
 
     ROOT_FOLDER = root_folder
     PREFIX = prefix
@@ -1013,6 +4086,25 @@ def run_pipeline(
     NUMBER_VIDEOS_AT_END = number_videos_at_end
     COMBINE_FINAL = combine_final
     CONVERSION_ONLY = conversion_only
+    SCAN_WORKERS = max(1, scan_workers)
+    USE_SCAN_INDEX = use_scan_index
+    PAGE_COUNT_WORKERS = max(1, page_count_workers)
+    if stamp_mode not in STAMP_MODES:
+        raise ValueError(f"Unknown stamp mode: {stamp_mode} (expected one of {', '.join(STAMP_MODES)})")
+    STAMP_MODE = stamp_mode
+    if docx_backend not in DOCX_BACKENDS:
+        raise ValueError(f"Unknown DOCX backend: {docx_backend} (expected one of {', '.join(DOCX_BACKENDS)})")
+    DOCX_BACKEND = docx_backend
+    DOCX_WORKERS = max(1, docx_workers)
+    STAMP_WORKERS = max(1, stamp_workers)
+    CONVERT_WORKERS = max(1, convert_workers)
+    LOW_MEMORY = low_memory
+    RESUME = resume
+    COMPACT_OUTPUT = compact_output
+    VOLUME_MAX_PAGES = volume_max_pages or None
+    VOLUME_MAX_BYTES = volume_max_bytes or None
+    IMAGE_MAX_DPI = image_max_dpi or None
+    IMAGE_MEMORY_BUDGET = image_memory_budget or None
 
     root = Path(ROOT_FOLDER)
     if not root.is_dir():
@@ -1025,11 +4117,69 @@ def run_pipeline(
         print(f"Keep original folder name after Bates: {KEEP_FOLDER_NAME}")
     print(f"Number videos at end: {NUMBER_VIDEOS_AT_END}")
     print(f"Create combined final PDF: {COMBINE_FINAL}")
+    if COMBINE_FINAL and (VOLUME_MAX_PAGES or VOLUME_MAX_BYTES):
+        limits = [f"{VOLUME_MAX_PAGES} pages" if VOLUME_MAX_PAGES else None,
+                  f"{VOLUME_MAX_BYTES / 2**20:g} MB" if VOLUME_MAX_BYTES else None]
+        print(f"Combined volume limit: {', '.join(l for l in limits if l)}")
     print(f"Conversion-only mode: {CONVERSION_ONLY}")
+    print(f"Scan threads: {SCAN_WORKERS}")
+    print(f"Page-count index: {USE_SCAN_INDEX}")
+    print(f"Page-count threads: {PAGE_COUNT_WORKERS}")
+    print(f"Stamp mode: {STAMP_MODE}")
+    print(f"Stamp processes: {STAMP_WORKERS}")
+    print(f"Conversion processes: {CONVERT_WORKERS}")
+    print(f"DOCX converter: {DOCX_BACKEND} ({DOCX_WORKERS} worker(s))")
+    print(f"Image limit: {f'{IMAGE_MAX_DPI} dpi' if IMAGE_MAX_DPI else 'full resolution'}, "
+          f"{f'{IMAGE_MEMORY_BUDGET / 2**20:g} MB' if IMAGE_MEMORY_BUDGET else 'unlimited'} decoding at once")
+    print(f"Low-memory mode: {LOW_MEMORY}")
+    print(f"Compact output: {COMPACT_OUTPUT}")
+    print(f"Resume interrupted run: {RESUME}")
+
+    # Real runs record each finished step so an interrupted run can be resumed
+    journal = None
+    if not DRY_RUN:
+        settings = {
+            "prefix": PREFIX,
+            "digits": DIGITS,
+            "start_counter": START_COUNTER,
+            "backup_before_bates": BACKUP_BEFORE_BATES,
+            "keep_original_name": KEEP_ORIGINAL_NAME,
+            "rename_folders": RENAME_FOLDERS,
+            "keep_original_folder_name": KEEP_FOLDER_NAME,
+            "number_videos_at_end": NUMBER_VIDEOS_AT_END,
+            "combine_final": COMBINE_FINAL,
+            "conversion_only": CONVERSION_ONLY,
+        }
+        journal = RunJournal.open(root, settings, RESUME)
+        if journal.finished():
+            print("✅ Nothing to resume: the last run finished.")
+            return journal.summary()
+
+    # Every return ends the journal; only an exception (a crash, Ctrl-C, a
+    # page-count mismatch) leaves it open for --resume
+    summary = _run_pipeline_steps(root, journal)
+    if journal is not None:
+        if summary.get("aborted"):
+            # stopped before changing anything it would need to resume
+            journal.discard()
+        else:
+            journal.finish(summary)
+    return summary
+
+
+def _run_pipeline_steps(root: Path, journal):
+    """The stages of run_pipeline, with the run's settings already applied; returns its summary."""
+    # Walk the tree once; every stage below reads and updates this manifest
+    manifest = TreeManifest.scan(root)
+    print(f"Files found: {len(manifest)}")
+
+    if journal is not None and journal.resumed:
+        recover_interrupted_files(root, manifest)
 
     # Backup originals once at the very start (if enabled, non-dry-run)
-    if BACKUP_BEFORE_BATES and not DRY_RUN:
-        backup_originals(root)
+    if BACKUP_BEFORE_BATES and not DRY_RUN and not journal.done("backup"):
+        backup_originals(root, manifest)
+        journal.record("backup")
 
     # === CONVERSION ONLY MODE ===
     if CONVERSION_ONLY:
@@ -1038,10 +4188,13 @@ def run_pipeline(
         skipped_list = []
 
         # Run all conversions (images, HTML, TXT, DOCX)
-        img_conv, img_err = convert_images_in_tree(root, delete_original=not DRY_RUN)
-        html_conv, html_err = convert_htmls_in_tree(root, delete_original=not DRY_RUN)
-        txt_conv, txt_err = convert_txts_in_tree(root, delete_original=not DRY_RUN)
-        docx_conv, docx_err = convert_docx_in_tree(root)
+        converted = convert_tree(
+            root, ("image", "html", "txt", "docx"), delete_original=not DRY_RUN, manifest=manifest, journal=journal
+        )
+        img_conv, img_err = converted["image"]
+        html_conv, html_err = converted["html"]
+        txt_conv, txt_err = converted["txt"]
+        docx_conv, docx_err = converted["docx"]
 
         renamed_list.extend(img_conv)
         renamed_list.extend(html_conv)
@@ -1054,11 +4207,10 @@ def run_pipeline(
         error_list.extend(docx_err)
 
         # Reformat all PDFs to Letter
-        pdfs = [
-            p for p in iter_finder_order_files(root)
-            if p.is_file() and p.suffix.lower() == PDF_EXT
-            and BACKUP_FOLDER_NAME not in p.parts
-        ]
+        pdfs = [p for p in manifest.files() if p.suffix.lower() == PDF_EXT]
+
+        letter_skipped_pages = 0
+        letter_skipped_files = 0
 
         if DRY_RUN:
             print("\n(DRY RUN) Would reformat all PDFs to US Letter (conversion-only mode).")
@@ -1066,7 +4218,12 @@ def run_pipeline(
             print("\n--- REFORMAT ALL PDFs TO US LETTER (conversion-only mode) ---")
             for pdf in pdfs:
                 try:
-                    reformat_pdf_to_letter_in_place(pdf)
+                    pages, skipped = reformat_pdf_to_letter_in_place(pdf)
+                    letter_skipped_pages += skipped
+                    if skipped == pages:
+                        letter_skipped_files += 1
+                    else:
+                        manifest.refresh(pdf)
                 except Exception as e:
                     msg = f"{pdf}: {e}"
                     print(f"⚠️  Error reformatting {msg}")
@@ -1077,53 +4234,97 @@ def run_pipeline(
 
         print("\n✅ Conversion-only pipeline complete (no renaming / no Bates).")
 
-        return {
+        summary = {
             "total_files": total_files,
             "total_pages": total_pages,
             "renamed": renamed_list,
             "skipped": skipped_list,
             "errors": error_list,
+            "letter_skipped_pages": letter_skipped_pages,
+            "letter_skipped_files": letter_skipped_files,
         }
+        return summary
 
     # === FULL PIPELINE (with renaming / Bates) ===
 
-    # 0. Auto-convert images, HTML, TXT (DOCX handled in plan_items)
-    image_conversions, image_errors = convert_images_in_tree(root, delete_original=not DRY_RUN)
-    html_conversions, html_errors = convert_htmls_in_tree(root, delete_original=not DRY_RUN)
-    txt_conversions, txt_errors = convert_txts_in_tree(root, delete_original=not DRY_RUN)
-
-    # 1. Block unsupported file types (.doc/.eml/.msg)
-    blocking = find_blocking_files(root)
-    if blocking:
-        print("\n❌ Blocked file types detected (.doc/.eml/.msg). Remove or handle these before running:")
-        for p in blocking:
-            print(f" - {p}")
-        return {
-            "total_files": 0,
-            "total_pages": 0,
-            "renamed": image_conversions + html_conversions + txt_conversions,
-            "skipped": [str(p) for p in blocking],
-            "errors": ["Blocked file types detected. Run aborted."]
-                      + image_errors + html_errors + txt_errors,
-        }
-
-    # 2. Build logical items
-    items = plan_items(root)
-    if not items:
-        print("No eligible files found to process.")
-        return {
-            "total_files": 0,
-            "total_pages": 0,
-            "renamed": image_conversions + html_conversions + txt_conversions,
-            "skipped": [],
-            "errors": ["No eligible files found to process."]
-                      + image_errors + html_errors + txt_errors,
-        }
-
-    items = reorder_items_for_videos(items)
-
-    # 3. Build rename operations
-    operations, _ = build_renames(items)
+    if journal is not None and journal.done("plan"):
+        # Conversions and planning finished before the interruption
+        operations, total_files = journal.plan()
+        image_conversions = journal.conversions("image")
+        html_conversions = journal.conversions("html")
+        txt_conversions = journal.conversions("txt")
+        image_errors, html_errors, txt_errors = [], [], []
+        print(f"\n⏩ Using the recorded rename plan ({len(operations)} file(s)).")
+    else:
+        # 0. Auto-convert images, HTML, TXT (DOCX converted in plan_items)
+        converted = convert_tree(
+            root, ("image", "html", "txt"), delete_original=not DRY_RUN, manifest=manifest, journal=journal
+        )
+        image_conversions, image_errors = converted["image"]
+        html_conversions, html_errors = converted["html"]
+        txt_conversions, txt_errors = converted["txt"]
+
+        # 1. Block unsupported file types (.doc/.eml/.msg)
+        blocking = find_blocking_files(root, manifest)
+        if blocking:
+            print("\n❌ Blocked file types detected (.doc/.eml/.msg). Remove or handle these before running:")
+            for p in blocking:
+                print(f" - {p}")
+            return {
+                "aborted": True,
+                "total_files": 0,
+                "total_pages": 0,
+                "renamed": image_conversions + html_conversions + txt_conversions,
+                "skipped": [str(p) for p in blocking],
+                "errors": ["Blocked file types detected. Run aborted."]
+                          + image_errors + html_errors + txt_errors,
+            }
+
+        # 2. Build logical items (page counts cached across runs in the scan index)
+        index = ScanIndex.open(root) if USE_SCAN_INDEX else None
+        try:
+            planned_images = {Path(src): Path(dst) for src, dst in image_conversions} if DRY_RUN else None
+            items = plan_items(root, manifest, index, planned_images, verify=not DRY_RUN)
+        finally:
+            if index is not None:
+                print(f"Page-count index: {index.hits} cached, {index.misses} read")
+                index.close()
+        if not items:
+            print("No eligible files found to process.")
+            return {
+                "aborted": True,
+                "total_files": 0,
+                "total_pages": 0,
+                "renamed": image_conversions + html_conversions + txt_conversions,
+                "skipped": [],
+                "errors": ["No eligible files found to process."]
+                          + image_errors + html_errors + txt_errors,
+            }
+
+        items = reorder_items_for_videos(items)
+
+        # 3. Build rename operations
+        operations, _ = build_renames(items)
+        total_files = len(items)
+
+        # Already-stamped files can only keep the range they carry
+        renumbered = find_renumbered_stamped_pdfs(operations)
+        if renumbered:
+            print("\n❌ Already Bates-stamped PDFs would be renumbered. "
+                  f"Restore their originals from {BACKUP_FOLDER_NAME} first:")
+            for path, stamped, planned in renumbered:
+                print(f" - {path} (stamped {stamped}, planned {planned})")
+            return {
+                "aborted": True,
+                "total_files": 0,
+                "total_pages": 0,
+                "renamed": image_conversions + html_conversions + txt_conversions,
+                "skipped": [str(path) for path, _, _ in renumbered],
+                "errors": ["Already-stamped PDFs would be renumbered. Run aborted."]
+                          + image_errors + html_errors + txt_errors,
+            }
+        if journal is not None:
+            journal.record_plan(operations, total_files)
 
     renamed_list = []
     renamed_list.extend(image_conversions)
@@ -1136,10 +4337,10 @@ def run_pipeline(
     error_list.extend(image_errors)
     error_list.extend(html_errors)
     error_list.extend(txt_errors)
-    total_files = len(items)
     total_pages = 0
-
-    combined_path = None
+    letter_skipped_pages = 0
+    letter_skipped_files = 0
+    already_stamped_files = 0
 
     if DRY_RUN:
         print("\n🔎 Dry run enabled — no files or folders will be modified.")
@@ -1152,32 +4353,66 @@ def run_pipeline(
         if COMBINE_FINAL:
             print("Combined final PDF option is enabled, but only simulated in dry run.")
     else:
-        apply_renames(operations)
+        if not journal.done("renames"):
+            apply_renames(operations, manifest)
+            journal.record("renames")
 
         # Optional folder rename based on Bates ranges (uses renamed filenames)
         if RENAME_FOLDERS:
-            folder_ranges = collect_folder_bates_ranges(root)
-            folder_renames = rename_folders_with_bates(root, folder_ranges)
+            if journal.done("folders"):
+                folder_renames = [tuple(pair) for pair in journal.last("folders")["renames"]]
+            else:
+                folder_ranges = collect_folder_bates_ranges(root, manifest)
+                folder_renames = rename_folders_with_bates(root, folder_ranges, manifest)
+                journal.record("folders", renames=folder_renames)
             renamed_list.extend(folder_renames)
 
-        bates_result = apply_bates_to_all_pdfs(root)
+        # The combined PDF is written as the files are stamped, unless stamping already finished
+        combined = None
+        if COMBINE_FINAL and not journal.done("bates"):
+            combined = CombinedPdfBuilder.plan(root, manifest)
+
+        if journal.done("bates"):
+            bates_result = journal.last("bates")["result"]
+        else:
+            try:
+                bates_result = apply_bates_to_all_pdfs(root, manifest, journal, combined)
+                combined_paths = combined.close() if combined is not None else None
+            except BaseException:
+                if combined is not None:
+                    combined.discard()
+                raise
+            journal.record("bates", result=bates_result)
+            if combined is not None:
+                journal.record("combined", paths=combined_paths)
         total_pages = bates_result.get("total_pages", 0)
         error_list.extend(bates_result.get("errors", []))
+        letter_skipped_pages = bates_result.get("letter_skipped_pages", 0)
+        letter_skipped_files = bates_result.get("letter_skipped_files", 0)
+        already_stamped_files = bates_result.get("already_stamped_files", 0)
 
         if COMBINE_FINAL:
-            combined_path = create_combined_final_pdf(root)
-            if combined_path:
+            if journal.done("combined"):
+                combined_paths = journal.last("combined")["paths"]
+            else:
+                combined_paths = create_combined_final_pdf(root, manifest)
+                journal.record("combined", paths=combined_paths)
+            for combined_path in combined_paths:
                 renamed_list.append(("COMBINED", combined_path))
 
     print("\n✅ All steps complete.")
 
-    return {
+    summary = {
         "total_files": total_files,
         "total_pages": total_pages,
         "renamed": renamed_list,
         "skipped": skipped_list,
         "errors": error_list,
+        "letter_skipped_pages": letter_skipped_pages,
+        "letter_skipped_files": letter_skipped_files,
+        "already_stamped_files": already_stamped_files,
     }
+    return summary
 
 
 # ---------- CLI wrapper ----------
@@ -1191,6 +4426,7 @@ def parse_args_or_prompt():
             Examples:
               python3 core.py /path/to/folder --dry-run
               python3 core.py /path/to/folder --prefix DEF --digits 5 --start 1001
+              python3 core.py /path/to/folder --resume
             """
         ),
     )
@@ -1226,11 +4462,110 @@ def parse_args_or_prompt():
         action="store_true",
         help="Create a single combined PDF for the full Bates range",
     )
+    parser.add_argument(
+        "--volume-pages",
+        type=int,
+        default=None,
+        help="Split the combined PDF into volumes of at most this many pages (cut between documents)",
+    )
+    parser.add_argument(
+        "--volume-size",
+        type=float,
+        default=None,
+        metavar="MB",
+        help="Split the combined PDF into volumes of at most this many MB of stamped PDFs "
+             "(cut between documents)",
+    )
     parser.add_argument(
         "--conversion-only",
         action="store_true",
         help="Conversion-only mode: convert/format only (no renaming, no Bates)",
     )
+    parser.add_argument(
+        "--no-index",
+        action="store_true",
+        help="Do not cache page counts between runs (kept in the per-user cache directory)",
+    )
+    parser.add_argument(
+        "--scan-workers",
+        type=int,
+        default=SCAN_WORKERS,
+        help=f"Threads used to list folders while scanning (default: {SCAN_WORKERS})",
+    )
+    parser.add_argument(
+        "--count-workers",
+        type=int,
+        default=PAGE_COUNT_WORKERS,
+        help=f"Threads used to count PDF pages while planning (default: {PAGE_COUNT_WORKERS})",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=STAMP_WORKERS,
+        help=f"Processes used to Bates-stamp PDFs in parallel (default: {STAMP_WORKERS})",
+    )
+    parser.add_argument(
+        "--convert-workers",
+        type=int,
+        default=CONVERT_WORKERS,
+        help=f"Processes used to convert images, HTML and TXT files to PDF (default: {CONVERT_WORKERS})",
+    )
+    parser.add_argument(
+        "--docx-backend",
+        choices=DOCX_BACKENDS,
+        default=DOCX_BACKEND,
+        help="auto: Word via docx2pdf on macOS/Windows, else LibreOffice; "
+             "docx2pdf: Microsoft Word, one file at a time; libreoffice: headless soffice, kept "
+             "running between files when LibreOffice's Python bridge (uno) is importable, "
+             f"else started once per file (default: {DOCX_BACKEND})",
+    )
+    parser.add_argument(
+        "--docx-workers",
+        type=int,
+        default=DOCX_WORKERS,
+        help=f"LibreOffice workers converting DOCX files side by side; docx2pdf always uses one "
+             f"(default: {DOCX_WORKERS})",
+    )
+    parser.add_argument(
+        "--image-max-dpi",
+        type=int,
+        default=IMAGE_MAX_DPI,
+        help=f"Scale images down to at most this resolution at Letter size, 0 = keep every pixel "
+             f"(default: {IMAGE_MAX_DPI})",
+    )
+    parser.add_argument(
+        "--image-memory",
+        type=float,
+        default=IMAGE_MEMORY_BUDGET / 2**20,
+        metavar="MB",
+        help="Decoded image data the conversion processes may hold at once, 0 = no limit "
+             f"(default: {IMAGE_MEMORY_BUDGET / 2**20:g})",
+    )
+    parser.add_argument(
+        "--low-memory",
+        action="store_true",
+        help=f"Write PDFs {LOW_MEMORY_BATCH_PAGES} pages at a time to keep memory flat on huge exhibits (slower)",
+    )
+    parser.add_argument(
+        "--no-compact",
+        action="store_true",
+        help="Write stamped/combined PDFs without object streams or resource deduplication",
+    )
+    parser.add_argument(
+        "--stamp-mode",
+        choices=STAMP_MODES,
+        default=STAMP_MODE,
+        help="direct: keep page content as-is and wrap it (fast); "
+             "merge: re-encode pages through pypdf merging; "
+             "incremental: like direct, but append an update to each file instead of rewriting it "
+             f"(default: {STAMP_MODE})",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help=f"Continue an interrupted run from {JOURNAL_NAME} in the root folder "
+             "(use the same options as the interrupted run)",
+    )
 
     args = parser.parse_args()
 
@@ -1248,6 +4583,21 @@ def parse_args_or_prompt():
             not args.videos_inline,             # number_videos_at_end
             args.combine_final,                 # combine_final
             args.conversion_only,               # conversion_only
+            args.scan_workers,                  # scan_workers
+            not args.no_index,                  # use_scan_index
+            args.count_workers,                 # page_count_workers
+            args.stamp_mode,                    # stamp_mode
+            args.workers,                       # stamp_workers
+            args.low_memory,                    # low_memory
+            args.resume,                        # resume
+            not args.no_compact,                # compact_output
+            args.volume_pages,                  # volume_max_pages
+            int(args.volume_size * 2**20) if args.volume_size else None,  # volume_max_bytes
+            args.convert_workers,               # convert_workers
+            args.image_max_dpi,                 # image_max_dpi
+            int(args.image_memory * 2**20),     # image_memory_budget
+            args.docx_backend,                  # docx_backend
+            args.docx_workers,                  # docx_workers
         )
 
     # Interactive fallback
@@ -1270,6 +4620,12 @@ def parse_args_or_prompt():
     dry_in = input("Dry run only? (y/N): ").strip().lower()
     dry_run = dry_in == "y"
 
+    resume = False
+    previous = RunJournal.load(Path(root))
+    if not dry_run and previous is not None and previous.done("run") and not previous.finished():
+        resume_in = input("The last run in this folder did not finish. Resume it? (Y/n): ").strip().lower()
+        resume = resume_in != "n"
+
     conv_only_in = input("Conversion-only mode (no renaming / no Bates)? (y/N): ").strip().lower()
     conversion_only = conv_only_in == "y"
 
@@ -1313,6 +4669,7 @@ def parse_args_or_prompt():
         print(f"Keep original folder name after Bates: {keep_original_folder_name}")
     print(f"Number videos at end: {number_videos_at_end}")
     print(f"Create combined final PDF: {combine_final}")
+    print(f"Resume interrupted run: {resume}")
     print("----------------------\n")
 
     return (
@@ -1328,6 +4685,21 @@ def parse_args_or_prompt():
         number_videos_at_end,
         combine_final,
         conversion_only,
+        SCAN_WORKERS,
+        USE_SCAN_INDEX,
+        PAGE_COUNT_WORKERS,
+        STAMP_MODE,
+        STAMP_WORKERS,
+        LOW_MEMORY,
+        resume,
+        COMPACT_OUTPUT,
+        VOLUME_MAX_PAGES,
+        VOLUME_MAX_BYTES,
+        CONVERT_WORKERS,
+        IMAGE_MAX_DPI,
+        IMAGE_MEMORY_BUDGET,
+        DOCX_BACKEND,
+        DOCX_WORKERS,
     )
 
 
@@ -1345,6 +4717,21 @@ if __name__ == "__main__":
         number_videos_at_end,
         combine_final,
         conversion_only,
+        scan_workers,
+        use_scan_index,
+        page_count_workers,
+        stamp_mode,
+        stamp_workers,
+        low_memory,
+        resume,
+        compact_output,
+        volume_max_pages,
+        volume_max_bytes,
+        convert_workers,
+        image_max_dpi,
+        image_memory_budget,
+        docx_backend,
+        docx_workers,
     ) = parse_args_or_prompt()
 
     run_pipeline(
@@ -1360,4 +4747,19 @@ if __name__ == "__main__":
         number_videos_at_end=number_videos_at_end,
         combine_final=combine_final,
         conversion_only=conversion_only,
+        scan_workers=scan_workers,
+        use_scan_index=use_scan_index,
+        page_count_workers=page_count_workers,
+        stamp_mode=stamp_mode,
+        stamp_workers=stamp_workers,
+        low_memory=low_memory,
+        resume=resume,
+        compact_output=compact_output,
+        volume_max_pages=volume_max_pages,
+        volume_max_bytes=volume_max_bytes,
+        convert_workers=convert_workers,
+        image_max_dpi=image_max_dpi,
+        image_memory_budget=image_memory_budget,
+        docx_backend=docx_backend,
+        docx_workers=docx_workers,
     )
@@ -1,6 +1,7 @@
 import os
 import sys
 import json
+import multiprocessing
 import ssl
 import zipfile
 import threading
@@ -11,10 +12,11 @@ from tkinter import ttk, filedialog, messagebox
 
 # Import your pipeline + version
 try:
-    from core import run_pipeline, APP_VERSION
+    from core import run_pipeline, APP_VERSION, DOCX_BACKENDS
 except ImportError:
     run_pipeline = None
     APP_VERSION = "dev"
+    DOCX_BACKENDS = ("auto",)
 
 
 class BatesGUI(tk.Tk):
@@ -133,6 +135,98 @@ class BatesGUI(tk.Tk):
             command=self.on_conversion_only_toggle,
         ).grid(row=9, column=0, columnspan=3, sticky="w", pady=(10, 0))
 
+        # ===== Performance =====
+        perf_y = 10
+        ttk.Label(form, text="Scan threads:").grid(row=perf_y, column=0, sticky="w", pady=(10, 0))
+        self.scan_workers_var = tk.StringVar(value="4")
+        ttk.Entry(form, textvariable=self.scan_workers_var, width=5).grid(
+            row=perf_y, column=1, sticky="w", pady=(10, 0)
+        )
+
+        ttk.Label(form, text="Page-count threads:").grid(
+            row=perf_y, column=1, sticky="w", padx=(60, 0), pady=(10, 0)
+        )
+        self.count_workers_var = tk.StringVar(value="4")
+        ttk.Entry(form, textvariable=self.count_workers_var, width=5).grid(
+            row=perf_y, column=1, sticky="w", padx=(190, 0), pady=(10, 0)
+        )
+
+        ttk.Label(form, text="Stamp processes:").grid(row=perf_y + 1, column=0, sticky="w", pady=(2, 0))
+        self.stamp_workers_var = tk.StringVar(value="1")
+        ttk.Entry(form, textvariable=self.stamp_workers_var, width=5).grid(
+            row=perf_y + 1, column=1, sticky="w", pady=(2, 0)
+        )
+
+        ttk.Label(form, text="Convert processes:").grid(
+            row=perf_y + 1, column=1, sticky="w", padx=(60, 0), pady=(2, 0)
+        )
+        self.convert_workers_var = tk.StringVar(value="4")
+        ttk.Entry(form, textvariable=self.convert_workers_var, width=5).grid(
+            row=perf_y + 1, column=1, sticky="w", padx=(190, 0), pady=(2, 0)
+        )
+
+        self.use_index_var = tk.BooleanVar(value=True)
+        ttk.Checkbutton(
+            form,
+            text="Cache page counts between runs (speeds up repeat dry runs)",
+            variable=self.use_index_var,
+        ).grid(row=perf_y + 2, column=0, columnspan=3, sticky="w", pady=(2, 0))
+
+        self.low_memory_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            form,
+            text="Low-memory mode (for very large scanned exhibits; slower)",
+            variable=self.low_memory_var,
+        ).grid(row=perf_y + 3, column=0, columnspan=3, sticky="w", pady=(2, 0))
+
+        self.resume_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(
+            form,
+            text="Resume an interrupted run (use the same options as before)",
+            variable=self.resume_var,
+        ).grid(row=perf_y + 4, column=0, columnspan=3, sticky="w", pady=(2, 0))
+
+        ttk.Label(form, text="Combined volume limit:").grid(row=perf_y + 5, column=0, sticky="w", pady=(2, 0))
+        self.volume_mb_var = tk.StringVar(value="")
+        ttk.Entry(form, textvariable=self.volume_mb_var, width=7).grid(
+            row=perf_y + 5, column=1, sticky="w", pady=(2, 0)
+        )
+        ttk.Label(form, text="MB").grid(row=perf_y + 5, column=1, sticky="w", padx=(70, 0), pady=(2, 0))
+        self.volume_pages_var = tk.StringVar(value="")
+        ttk.Entry(form, textvariable=self.volume_pages_var, width=7).grid(
+            row=perf_y + 5, column=1, sticky="w", padx=(100, 0), pady=(2, 0)
+        )
+        ttk.Label(form, text="pages (blank = one file)").grid(
+            row=perf_y + 5, column=1, sticky="w", padx=(170, 0), pady=(2, 0)
+        )
+
+        ttk.Label(form, text="Image limit:").grid(row=perf_y + 6, column=0, sticky="w", pady=(2, 0))
+        self.image_dpi_var = tk.StringVar(value="600")
+        ttk.Entry(form, textvariable=self.image_dpi_var, width=7).grid(
+            row=perf_y + 6, column=1, sticky="w", pady=(2, 0)
+        )
+        ttk.Label(form, text="dpi").grid(row=perf_y + 6, column=1, sticky="w", padx=(70, 0), pady=(2, 0))
+        self.image_memory_var = tk.StringVar(value="1024")
+        ttk.Entry(form, textvariable=self.image_memory_var, width=7).grid(
+            row=perf_y + 6, column=1, sticky="w", padx=(100, 0), pady=(2, 0)
+        )
+        ttk.Label(form, text="MB decoding at once (blank = no limit)").grid(
+            row=perf_y + 6, column=1, sticky="w", padx=(170, 0), pady=(2, 0)
+        )
+
+        ttk.Label(form, text="DOCX converter:").grid(row=perf_y + 7, column=0, sticky="w", pady=(2, 0))
+        self.docx_backend_var = tk.StringVar(value="auto")
+        ttk.Combobox(
+            form, textvariable=self.docx_backend_var, values=DOCX_BACKENDS, state="readonly", width=11
+        ).grid(row=perf_y + 7, column=1, sticky="w", pady=(2, 0))
+        self.docx_workers_var = tk.StringVar(value="2")
+        ttk.Entry(form, textvariable=self.docx_workers_var, width=5).grid(
+            row=perf_y + 7, column=1, sticky="w", padx=(120, 0), pady=(2, 0)
+        )
+        ttk.Label(form, text="LibreOffice processes").grid(
+            row=perf_y + 7, column=1, sticky="w", padx=(170, 0), pady=(2, 0)
+        )
+
         # ===== Buttons =====
         buttons = ttk.Frame(container)
         buttons.pack(fill="x", pady=(0, 5))
@@ -244,6 +338,9 @@ class BatesGUI(tk.Tk):
         videos_at_end = self.videos_at_end_var.get()
         combine_final = self.combine_final_var.get()
         conversion_only = self.conversion_only_var.get()
+        use_index = self.use_index_var.get()
+        low_memory = self.low_memory_var.get()
+        resume = self.resume_var.get()
 
         if not root or not os.path.isdir(root):
             messagebox.showerror("Invalid folder", "Please select a valid root folder.")
@@ -256,10 +353,35 @@ class BatesGUI(tk.Tk):
         try:
             digits = int(self.digits_var.get())
             start = int(self.start_var.get())
+            scan_workers = int(self.scan_workers_var.get())
+            count_workers = int(self.count_workers_var.get())
+            stamp_workers = int(self.stamp_workers_var.get())
+            convert_workers = int(self.convert_workers_var.get())
+            docx_workers = int(self.docx_workers_var.get())
+        except ValueError:
+            messagebox.showerror(
+                "Invalid input",
+                "Digits, Starting #, thread and process counts must be whole numbers."
+            )
+            return
+
+        try:
+            volume_mb = float(self.volume_mb_var.get()) if self.volume_mb_var.get().strip() else None
+            volume_pages = int(self.volume_pages_var.get()) if self.volume_pages_var.get().strip() else None
         except ValueError:
             messagebox.showerror(
                 "Invalid input",
-                "Digits and Starting # must be whole numbers."
+                "Combined volume limits must be numbers (MB) and whole numbers (pages), or blank."
+            )
+            return
+
+        try:
+            image_dpi = int(self.image_dpi_var.get()) if self.image_dpi_var.get().strip() else None
+            image_mb = float(self.image_memory_var.get()) if self.image_memory_var.get().strip() else None
+        except ValueError:
+            messagebox.showerror(
+                "Invalid input",
+                "Image limits must be a whole number (dpi) and a number (MB), or blank."
             )
             return
 
@@ -284,8 +406,19 @@ class BatesGUI(tk.Tk):
                 self.log(f"Append original folder name after Bates: {keep_folder_name}")
             self.log(f"Number videos at end: {videos_at_end}")
             self.log(f"Create combined final PDF: {combine_final}")
+            if combine_final and (volume_mb or volume_pages):
+                self.log(f"Combined volume limit: {volume_mb or '-'} MB, {volume_pages or '-'} pages")
         else:
             self.log("Renaming, Bates stamping, folder renaming, and combined PDF are DISABLED.")
+        self.log(f"Scan threads: {scan_workers}, Page-count threads: {count_workers}")
+        if not conversion_only:
+            self.log(f"Stamp processes: {stamp_workers}")
+        self.log(f"Convert processes: {convert_workers}")
+        self.log(f"DOCX converter: {self.docx_backend_var.get()} ({docx_workers} LibreOffice processes)")
+        self.log(f"Image limit: {image_dpi or '-'} dpi, {image_mb or '-'} MB decoding at once")
+        self.log(f"Cache page counts between runs: {use_index}")
+        self.log(f"Low-memory mode: {low_memory}")
+        self.log(f"Resume interrupted run: {resume}")
         self.log("Starting pipeline...\n")
 
         self.set_running_state(True)
@@ -305,6 +438,19 @@ class BatesGUI(tk.Tk):
                 videos_at_end,
                 combine_final,
                 conversion_only,
+                scan_workers,
+                use_index,
+                count_workers,
+                stamp_workers,
+                low_memory,
+                resume,
+                volume_mb,
+                volume_pages,
+                convert_workers,
+                image_dpi,
+                image_mb,
+                self.docx_backend_var.get(),
+                docx_workers,
             ),
             daemon=True,
         )
@@ -324,6 +470,19 @@ class BatesGUI(tk.Tk):
         videos_at_end,
         combine_final,
         conversion_only,
+        scan_workers,
+        use_index,
+        count_workers,
+        stamp_workers,
+        low_memory,
+        resume,
+        volume_mb,
+        volume_pages,
+        convert_workers,
+        image_dpi,
+        image_mb,
+        docx_backend,
+        docx_workers,
     ):
         try:
             summary = run_pipeline(
@@ -339,6 +498,19 @@ class BatesGUI(tk.Tk):
                 number_videos_at_end=videos_at_end,
                 combine_final=combine_final,
                 conversion_only=conversion_only,
+                scan_workers=scan_workers,
+                use_scan_index=use_index,
+                page_count_workers=count_workers,
+                stamp_workers=stamp_workers,
+                low_memory=low_memory,
+                resume=resume,
+                volume_max_pages=volume_pages,
+                volume_max_bytes=int(volume_mb * 2**20) if volume_mb else None,
+                convert_workers=convert_workers,
+                image_max_dpi=image_dpi,
+                image_memory_budget=int(image_mb * 2**20) if image_mb else None,
+                docx_backend=docx_backend,
+                docx_workers=docx_workers,
             )
             self.after(0, self.display_summary, summary)
         except Exception as e:
@@ -360,7 +532,13 @@ class BatesGUI(tk.Tk):
         errors = summary.get("errors", [])
 
         self.log(f"Total items processed: {total_files}")
-        self.log(f"Total pages (PDFs): {total_pages}\n")
+        self.log(f"Total pages (PDFs): {total_pages}")
+        self.log(
+            f"Already US Letter (not reformatted): "
+            f"{summary.get('letter_skipped_pages', 0)} page(s), "
+            f"{summary.get('letter_skipped_files', 0)} file(s)"
+        )
+        self.log(f"Already Bates-stamped (left as they were): {summary.get('already_stamped_files', 0)} file(s)\n")
 
         if renamed:
             self.log("Renamed / Generated items:")
@@ -495,6 +673,8 @@ class BatesGUI(tk.Tk):
 
 
 def main():
+    # Stamp worker processes re-launch the frozen app; let them run as workers
+    multiprocessing.freeze_support()
     app = BatesGUI()
     app.mainloop()
 